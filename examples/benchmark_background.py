@@ -0,0 +1,39 @@
+# This example measures how long the GUI thread is blocked per pan/zoom step on a line of 100M samples, with the decimation on the GUI thread and in a worker thread (background=True).
+# Run with QT_QPA_PLATFORM=offscreen to benchmark without a display; pass the number of samples to use less memory, e.g. `python benchmark_background.py 2e7`.
+import sys
+import time
+import numpy as np
+import pyqtplotlib as qtplt
+from PyQt5.QtWidgets import QApplication
+
+num_points = int(float(sys.argv[1])) if len(sys.argv) > 1 else 100_000_000
+app = QApplication([])
+x = np.arange(num_points, dtype=np.float64)
+y = np.cumsum(np.random.default_rng(0).normal(size=num_points).astype(np.float32))
+
+# a zoom out followed by pans over a quarter of the data
+views = [(0, num_points)] + [(x0, x0 + num_points // 4) for x0 in np.linspace(0, 0.75 * num_points, 30)]
+
+for background in [False, True]:
+    fig, ax = qtplt.subplots(1, 1)
+    fig.resize(1200, 600)
+    fig.show()
+    line = ax.plot(x, y, decimate='minmax', background=background)
+    app.processEvents()
+    line.wait_for_background()
+
+    blocked = []
+    t0 = time.perf_counter()
+    for x0, x1 in views:
+        ax.set_xlim(x0, x1)
+        t = time.perf_counter()
+        app.processEvents()  # the redraw that follows the view change
+        blocked.append(time.perf_counter() - t)
+    t_views = time.perf_counter() - t0
+    line.wait_for_background()
+    t_detail = time.perf_counter() - t0
+
+    print(f"background={background!s:5}: GUI blocked per step median {1e3 * np.median(blocked):7.1f} ms, "
+          f"max {1e3 * np.max(blocked):7.1f} ms; {len(views)} steps in {t_views:.2f} s, "
+          f"final detail after {t_detail:.2f} s")
+    fig.close()
@@ -0,0 +1,33 @@
+# This example measures how long a 6x6 dashboard with 200 items per axes takes to build and show, with and without fig.batch_update().
+# Run with QT_QPA_PLATFORM=offscreen to benchmark without a display.
+import contextlib
+import time
+import numpy as np
+import pyqtplotlib as qtplt
+from PyQt5 import QtWidgets
+
+app = QtWidgets.QApplication([])
+x = np.arange(100.)
+
+def build(axs):
+    for ax in axs.flat:
+        for i in range(100):
+            ax.plot(x, np.sin(x / 10 + i), label=f'trace {i}')
+            ax.axvline(i, color='k')
+        ax.legend()
+        ax.set_xlim(0, 100)
+
+for batch in [False, True]:
+    fig, axs = qtplt.subplots(6, 6)
+    fig.setGeometry(100, 100, 1600, 1000)
+    fig.show()
+    app.processEvents()
+
+    t0 = time.perf_counter()
+    with fig.batch_update() if batch else contextlib.nullcontext():
+        build(axs)
+    t_build = time.perf_counter() - t0
+    app.processEvents()  # first frame
+    t_total = time.perf_counter() - t0
+    print(f'batch_update={batch!s:5s}: build {t_build:5.2f} s, build and first frame {t_total:5.2f} s')
+    fig.close()
@@ -0,0 +1,25 @@
+# This example measures the time per line when adding up to 20k styled lines, which should stay constant as lines accumulate.
+# Run with QT_QPA_PLATFORM=offscreen to benchmark without a display.
+import time
+import numpy as np
+import pyqtplotlib as qtplt
+from PyQt5 import QtWidgets
+
+app = QtWidgets.QApplication([])
+num_lines = 20_000
+report_every = 5_000
+
+fig, ax = qtplt.subplots(1, 1)
+ax.setAutoVisible(y=False)
+ax.disableAutoRange()  # measure the styling and adding of lines, not the auto-ranging
+x = np.arange(10.)
+styles = [dict(), dict(ls='--', lw=2), dict(alpha=0.5), dict(color='k', ls=':')]
+
+t0 = t_prev = time.perf_counter()
+for i in range(1, num_lines + 1):
+    ax.plot(x, x * 0 + i, **styles[i % len(styles)])
+    if i % report_every == 0:
+        t = time.perf_counter()
+        print(f'lines {i - report_every:6d} to {i:6d}: {(t - t_prev) / report_every * 1e6:6.1f} us per line')
+        t_prev = t
+print(f'{num_lines} lines added in {time.perf_counter() - t0:.2f} s')
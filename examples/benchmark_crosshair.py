@@ -0,0 +1,56 @@
+# This example measures the linked crosshair (fig.enable_crosshair()) of a 16-channel figure with 5M samples per channel: the update of the line and the 16 readouts per frame, against a linear scan of every trace per mouse move.
+# Run with QT_QPA_PLATFORM=offscreen to benchmark without a display. Mouse moves arrive in bursts of 8 per frame, but only one crosshair update per frame is computed.
+import time
+import numpy as np
+import pyqtplotlib as qtplt
+from PyQt5.QtCore import QPointF
+from PyQt5.QtWidgets import QApplication
+
+app = QApplication([])
+num_channels, num_samples = 16, 5_000_000
+rng = np.random.default_rng(0)
+x = np.arange(num_samples) / 1000.0
+
+fig, axs = qtplt.subplots(num_channels, 1, sharex=True)
+fig.resize(1200, 1600)
+for i, ax in enumerate(axs.flat):
+    y = np.cumsum(rng.normal(size=num_samples).astype(np.float32))
+    ax.plot(x, y, decimate='minmax', label=f'channel {i}')
+fig.show()
+for _ in range(3):
+    app.processEvents()
+    time.sleep(0.05)
+
+t = time.perf_counter()
+crosshair = fig.enable_crosshair()
+t_enable = time.perf_counter() - t
+
+vb = axs[8, 0].getViewBox()
+(x0, x1), (y0, y1) = vb.viewRange()
+moves = [vb.mapViewToScene(QPointF(x0 + f * (x1 - x0), (y0 + y1) / 2)) for f in np.linspace(0.05, 0.95, 200)]
+scene = axs[8, 0].plot_item.scene()
+
+updates = []
+set_x = crosshair.set_x
+crosshair.set_x = lambda x: (updates.append(time.perf_counter()), set_x(x), updates.append(time.perf_counter()))
+t = time.perf_counter()
+for i, pos in enumerate(moves):
+    scene.sigMouseMoved.emit(pos)
+    if i % 8 == 7:  # about 8 mouse moves per frame
+        time.sleep(1 / 60)
+        app.processEvents()  # update and paint
+t_moves = time.perf_counter() - t
+per_update = np.diff(updates)[::2]
+
+# what each mouse move costs without the lookups: a scan of every trace
+lines = [ax.plot_item.dataItems[0] for ax in axs.flat]
+t = time.perf_counter()
+for pos in moves[:20]:
+    mouse_x = vb.mapSceneToView(pos).x()
+    values = [line.yData[np.argmin(np.abs(line.xData - mouse_x))] for line in lines]
+t_scan = (time.perf_counter() - t) / 20
+
+print(f"crosshair enabled in {1e3 * t_enable:.0f} ms (sorted-x check of {num_channels} channels)")
+print(f"{len(per_update)} updates for {len(moves)} mouse moves, {1e3 * np.median(per_update):.2f} ms median and "
+      f"{1e3 * per_update.max():.2f} ms max per update ({1e3 * t_moves / len(moves) * 8:.0f} ms per frame with painting); "
+      f"a linear scan of the traces takes {1e3 * t_scan:.0f} ms per mouse move")
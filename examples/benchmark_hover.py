@@ -0,0 +1,51 @@
+# This example measures the snapping hover readout (set_hover_mode('snap')) on axes with three 10M-point curves and a 100k-point scatter plot: the first readout, which builds the indices, and the following ones, zoomed out and zoomed in.
+# Run with QT_QPA_PLATFORM=offscreen to benchmark without a display; mouse moves arrive much faster than frames, but only one readout per frame is computed.
+import time
+import numpy as np
+import pyqtplotlib as qtplt
+from pyqtplotlib.pltwrapper import hover
+from PyQt5.QtCore import QPointF
+from PyQt5.QtWidgets import QApplication
+
+app = QApplication([])
+num_points = 10_000_000
+rng = np.random.default_rng(0)
+x = np.arange(num_points, dtype=float)
+
+fig, ax = qtplt.subplots(1, 1)
+fig.resize(1000, 700)
+for i in range(3):
+    ax.plot(x, np.cumsum(rng.normal(size=num_points)) + 3000 * i, decimate='minmax', label=f'curve {i}')
+ax.scatter(rng.uniform(0, num_points, 100_000), rng.normal(3000, 2000, 100_000), s=3)
+ax.set_hover_mode('snap')
+fig.show()
+app.processEvents()
+vb = ax.getViewBox()
+
+
+def readouts(num_moves=200, moves_per_frame=8):
+    """Seconds per snap lookup for `num_moves` mouse moves along the view, `moves_per_frame` between two frames."""
+    (x0, x1), (y0, y1) = vb.viewRange()
+    positions = [vb.mapViewToScene(QPointF(x0 + f * (x1 - x0), (y0 + y1) / 2)) for f in np.linspace(0.05, 0.95, num_moves)]
+    times = []
+    nearest_point = hover.nearest_point
+    hover.nearest_point = lambda *args: (times.append(time.perf_counter()), nearest_point(*args),
+                                         times.append(time.perf_counter()))[1]
+    for i, pos in enumerate(positions):
+        ax.plot_item.scene().sigMouseMoved.emit(pos)
+        if i % moves_per_frame == moves_per_frame - 1:
+            time.sleep(1 / 60)
+            app.processEvents()  # readout and paint
+    hover.nearest_point = nearest_point
+    return np.diff(times)[::2]
+
+
+t = time.perf_counter()
+ax._hoveredEvent(vb.mapViewToScene(QPointF(num_points / 2, 3000)))
+print(f"first readout (builds the indices): {1e3 * (time.perf_counter() - t):7.1f} ms")
+for name, xlim in [('zoomed out', (0, num_points)), ('zoomed in', (4_000_000, 4_010_000))]:
+    ax.set_xlim(*xlim)
+    app.processEvents()
+    per_readout = readouts()
+    print(f"{name:10s}: {len(per_readout)} readouts for 200 mouse moves in 25 frames, "
+          f"{1e3 * np.median(per_readout):6.2f} ms median, {1e3 * per_readout.max():6.2f} ms max per snap lookup")
@@ -0,0 +1,36 @@
+# This example measures the statistics of a rectangular region of a 16k x 16k image as an ROI is dragged over it: with a NumPy reduction over the region, and from the integral images of ImageStatsPlot.
+# Pass the image size to use less memory, e.g. `python benchmark_image_stats.py 4096`. No window is opened.
+import sys
+import time
+import numpy as np
+from pyqtplotlib.interaction.integral_image import IntegralImage
+
+size = int(sys.argv[1]) if len(sys.argv) > 1 else 16384
+rng = np.random.default_rng(0)
+image = np.empty((size, size), dtype=np.float32)
+for r in range(0, size, 1024):
+    image[r:r + 1024] = 1000 + rng.normal(size=(min(1024, size - r), size))
+
+t = time.perf_counter()
+integral = IntegralImage(image)
+t_build = time.perf_counter() - t
+
+# an ROI of a quarter of the image dragged diagonally, one position per mouse move
+w = size // 2
+moves = [(int(p), int(p) + w, int(p), int(p) + w) for p in np.linspace(0, size - w - 1, 50)]
+
+t = time.perf_counter()
+for r0, r1, c0, c1 in moves:
+    region = image[r0:r1, c0:c1]
+    expected = region.mean(dtype=np.float64), region.std(dtype=np.float64)
+t_numpy = (time.perf_counter() - t) / len(moves)
+
+t = time.perf_counter()
+for r0, r1, c0, c1 in moves:
+    stats = integral.stats(r0, r1, c0, c1)
+t_integral = (time.perf_counter() - t) / len(moves)
+assert np.allclose((stats['mean'], stats['std']), expected, rtol=1e-6)
+
+print(f"{size} x {size} image: integral images ({integral.block} x {integral.block} blocks, "
+      f"{integral.tables.nbytes / 2**20:.0f} MB) built in {t_build:.1f} s; per ROI move {1e3 * t_numpy:8.2f} ms "
+      f"with NumPy, {1e3 * t_integral:6.3f} ms from the integral images")
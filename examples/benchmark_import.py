@@ -0,0 +1,53 @@
+# This example measures the startup time of pyqtplotlib in fresh processes and fails (exit code 1) when a step exceeds its time budget.
+# Run with QT_QPA_PLATFORM=offscreen to benchmark without a display; pass a factor to scale the budgets on slow machines, e.g. `python benchmark_import.py 2`.
+import subprocess
+import sys
+
+repeats = 5
+
+# (description, code run after the timer has started, budget in seconds of the best run)
+steps = [
+    ('import pyqtplotlib', 'import pyqtplotlib as qtplt', 0.05),
+    ('first access to qtplt.subplots', 'import pyqtplotlib as qtplt; qtplt.subplots', 0.5),
+    ('first figure shown', '\n'.join([
+        'import numpy as np',
+        'import pyqtplotlib as qtplt',
+        'from PyQt5.QtWidgets import QApplication',
+        'app = QApplication([])',
+        'fig, axs = qtplt.subplots(1, 2)',
+        'axs[0, 0].plot(np.arange(100))',
+        'axs[0, 1].imshow(np.random.rand(100, 100), cmap="viridis")',
+        'fig.show()',
+        'app.processEvents()',
+    ]), 1.0),
+]
+
+timer = '''
+import sys, time
+t0 = time.perf_counter()
+{code}
+print(time.perf_counter() - t0, 'matplotlib' in sys.modules)
+'''
+
+
+def measure(code):
+    """Best time of `repeats` fresh processes, and whether matplotlib was imported."""
+    times = []
+    for _ in range(repeats):
+        result = subprocess.run([sys.executable, '-c', timer.format(code=code)],
+                                capture_output=True, text=True, check=True)
+        seconds, matplotlib = result.stdout.split()[-2:]
+        times.append(float(seconds))
+    return min(times), matplotlib == 'True'
+
+
+if __name__ == '__main__':
+    factor = float(sys.argv[1]) if len(sys.argv) > 1 else 1.0
+    failed = False
+    for description, code, budget in steps:
+        seconds, matplotlib = measure(code)
+        over_budget = seconds > budget * factor
+        failed |= over_budget or matplotlib
+        print(f'{description:32s} {seconds:6.3f} s (budget {budget * factor:5.2f} s)'
+              f'{"  OVER BUDGET" if over_budget else ""}{"  imported matplotlib" if matplotlib else ""}')
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,55 @@
+# This example measures how fast plot_many draws a matrix of 10,000 traces x 2,000 samples, compared to one plot call per trace.
+# Run with QT_QPA_PLATFORM=offscreen to benchmark without a display.
+import time
+import numpy as np
+import pyqtplotlib as qtplt
+from PyQt5 import QtWidgets
+
+app = QtWidgets.QApplication([])
+num_traces, num_samples = 10_000, 2_000
+x = np.arange(num_samples, dtype=float)
+Y = np.cumsum(np.random.randn(num_traces, num_samples).astype(np.float32), axis=1) + 10 * np.arange(num_traces)[:, None]
+
+fig, ax = qtplt.subplots(1, 1)
+fig.setGeometry(100, 100, 1200, 800)
+fig.show()
+app.processEvents()
+
+t0 = time.perf_counter()
+traces = ax.plot_many(x, Y, colors=np.arange(num_traces), cmap='viridis', highlight=num_traces // 2)
+ax.autoRange()
+ax.grab()  # render the first frame
+print(f'plot_many: {num_traces} traces, first frame after {time.perf_counter() - t0:.2f} s')
+
+vb = ax.getPlotItem().getViewBox()
+num_frames = 30
+t0 = time.perf_counter()
+for i in range(num_frames):
+    vb.setXRange(10 * i, num_samples - 10 * i, padding=0)
+    ax.grab()
+print(f'plot_many: {num_frames / (time.perf_counter() - t0):.1f} frames/s while zooming the overview')
+
+time.sleep(traces.rest_interval / 1000)
+app.processEvents()
+t0 = time.perf_counter()
+ax.grab()
+print(f'plot_many: overview re-rendered in {time.perf_counter() - t0:.2f} s once the view rests')
+
+vb.setRange(xRange=(500, 700), yRange=(50_000, 50_500), padding=0)
+ax.grab()
+time.sleep(traces.rest_interval / 1000)
+app.processEvents()
+t0 = time.perf_counter()
+for i in range(num_frames):
+    vb.setXRange(500 + i, 700 + i, padding=0)
+    ax.grab()
+print(f'plot_many: {num_frames / (time.perf_counter() - t0):.1f} frames/s while panning a zoomed-in view')
+fig.close()
+
+num_loop = 1_000
+fig, ax = qtplt.subplots(1, 1)
+t0 = time.perf_counter()
+for y in Y[:num_loop]:
+    ax.plot(x, y)
+ax.grab()
+print(f'plot in a loop: {num_loop} traces, first frame after {time.perf_counter() - t0:.2f} s')
@@ -0,0 +1,38 @@
+# This example measures how long selecting the points inside an ROI takes on 20M points: with a boolean mask over all points, and with the spatial indices that ROIAxesWidget.set_data builds.
+# Pass the number of points to use less memory, e.g. `python benchmark_roi.py 2e6`. No window is opened.
+import sys
+import time
+import numpy as np
+from pyqtplotlib.interaction.spatial_index import GridIndex, SortedIndex
+
+num_points = int(float(sys.argv[1])) if len(sys.argv) > 1 else 20_000_000
+rng = np.random.default_rng(0)
+x = rng.uniform(0, 100, num_points)
+y = np.sin(x) + rng.normal(scale=0.5, size=num_points)
+
+# regions of growing size, as while an ROI is dragged open
+regions = [(40, 40 + w, -0.5, -0.5 + w / 20) for w in np.geomspace(0.1, 20, 20)]
+
+
+def timed(function, repeat=3):
+    t = time.perf_counter()
+    for _ in range(repeat):
+        result = function()
+    return (time.perf_counter() - t) / repeat, result
+
+
+for name, build, query, full in [
+        ('linear', lambda: SortedIndex(x), lambda index, r: index.query(r[0], r[1]),
+         lambda r: np.flatnonzero((x > r[0]) & (x < r[1]))),
+        ('rect', lambda: GridIndex(x, y), lambda index, r: index.query(*r),
+         lambda r: np.flatnonzero((x > r[0]) & (x < r[1]) & (y > r[2]) & (y < r[3])))]:
+    t_build, index = timed(build, repeat=1)
+    t_full = t_indexed = 0
+    for region in regions:
+        t, expected = timed(lambda: full(region))
+        t_full += t
+        t, found = timed(lambda: query(index, region))
+        t_indexed += t
+        assert len(found) == len(expected)
+    print(f"{name:6s}: index built in {t_build:5.2f} s; per ROI update {1e3 * t_full / len(regions):7.2f} ms "
+          f"with a full mask, {1e3 * t_indexed / len(regions):7.2f} ms with the index")
@@ -0,0 +1,40 @@
+# This example compares construction time and memory use of a 10x10 subplots grid with one widget per axes and with all axes in a single scene.
+# Run with QT_QPA_PLATFORM=offscreen to benchmark without a display. Each mode runs in a fresh process.
+import resource
+import subprocess
+import sys
+import time
+
+nrows, ncols = 10, 10
+
+
+def max_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # kB on Linux
+
+
+def run(single_scene):
+    import numpy as np
+    import pyqtplotlib as qtplt
+    from PyQt5 import QtWidgets
+
+    app = QtWidgets.QApplication([])
+    rss0 = max_rss_mb()
+    t0 = time.perf_counter()
+    fig, axs = qtplt.subplots(nrows, ncols, single_scene=single_scene)
+    t_build = time.perf_counter() - t0
+    for ax in axs.flat:
+        ax.plot(np.random.rand(100))
+    fig.setGeometry(100, 100, 1600, 1200)
+    fig.show()
+    app.processEvents()  # first frame
+    t_total = time.perf_counter() - t0
+    print(f'single_scene={single_scene!s:5s}: build {t_build:5.2f} s, with one line per axes and first frame '
+          f'{t_total:5.2f} s, memory {max_rss_mb() - rss0:6.1f} MB')
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        run(sys.argv[1] == 'scene')
+    else:
+        for mode in ['widgets', 'scene']:
+            subprocess.run([sys.executable, __file__, mode])
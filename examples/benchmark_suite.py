@@ -0,0 +1,247 @@
+# This example is a benchmark suite for the plotting hot paths: it times each call and the first rendered frame at several data sizes, saves the results as JSON and compares them with a baseline.
+# Run offscreen, e.g. `QT_QPA_PLATFORM=offscreen python benchmark_suite.py --output new.json --baseline old.json` (`--baseline` alone compares with benchmark_suite_baseline.json); see `--help` for the cases and sizes.
+import argparse
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+
+# Each case prepares its data outside of the timer and returns the timed call (and a list
+# in which the call puts the figures it creates, to be closed afterwards). `size` is the
+# number of points (pixels for imshow, lines for vlines/hlines, axes for subplots).
+
+def case_plot(fig, ax, size, rng):
+    x, y = np.arange(size, dtype=float), np.cumsum(rng.normal(size=size))
+    return lambda: ax.plot(x, y)
+
+
+def case_plot_decimated(fig, ax, size, rng):
+    x, y = np.arange(size, dtype=float), np.cumsum(rng.standard_normal(size, dtype=np.float32))
+    return lambda: ax.plot(x, y, decimate='minmax')
+
+
+def case_scatter(fig, ax, size, rng):
+    x, y, c = rng.normal(size=size), rng.normal(size=size), rng.random(size)
+    return lambda: ax.scatter(x, y, c=c, cmap='viridis')
+
+
+def case_imshow(fig, ax, size, rng):
+    side = int(round(np.sqrt(size)))
+    image = rng.random((side, side), dtype=np.float32)
+    return lambda: ax.imshow(image, cmap='viridis')
+
+
+def case_fill_between(fig, ax, size, rng):
+    # a band around a random walk, like a confidence interval (white noise would make
+    # almost every edge cross each scanline, which is far slower to fill)
+    x, y = np.arange(size, dtype=float), np.cumsum(rng.normal(size=size))
+    return lambda: ax.fill_between(x, y - 1, y + 1)
+
+
+def case_vlines(fig, ax, size, rng):
+    x, y = rng.random(size), rng.random(size)
+    return lambda: ax.vlines(x, 0, y)
+
+
+def case_hlines(fig, ax, size, rng):
+    y, x = rng.random(size), rng.random(size)
+    return lambda: ax.hlines(y, 0, x)
+
+
+def case_subplots(fig, ax, size, rng):
+    import pyqtplotlib as qtplt
+    nrows = int(np.sqrt(size))
+    ncols = size // nrows
+    figures = []
+
+    def call():
+        fig, _ = qtplt.subplots(nrows, ncols, single_scene=True)
+        fig.resize(1200, 900)
+        fig.show()
+        figures.append(fig)
+    return call, figures
+
+
+def case_hover(fig, ax, size, rng):
+    from PyQt5.QtCore import QPointF
+    ax.plot(np.arange(size, dtype=float), np.cumsum(rng.normal(size=size)))
+    scene = ax.getPlotItem().scene()
+    rect = ax.getPlotItem().sceneBoundingRect()
+    positions = [QPointF(rect.left() + f * rect.width(), rect.center().y()) for f in np.linspace(0.1, 0.9, 100)]
+
+    def call():  # time per mouse move, averaged over 100 moves
+        t0 = time.perf_counter()
+        for pos in positions:
+            scene.sigMouseMoved.emit(pos)
+        return (time.perf_counter() - t0) / len(positions)
+    return call
+
+
+def case_export_png(fig, ax, size, rng):
+    ax.plot(np.arange(size, dtype=float), np.cumsum(rng.normal(size=size)))
+    return lambda: fig.savefig(os.path.join(tempfile.gettempdir(), 'benchmark_suite.png'))
+
+
+def case_export_svg(fig, ax, size, rng):
+    ax.plot(np.arange(size, dtype=float), np.cumsum(rng.normal(size=size)))
+    return lambda: fig.savefig(os.path.join(tempfile.gettempdir(), 'benchmark_suite.svg'))
+
+
+# name: (function, largest size run by default, whether the first frame is measured)
+CASES = {
+    'plot': (case_plot, 1e7, True),
+    'plot_decimated': (case_plot_decimated, 1e8, True),
+    'scatter': (case_scatter, 1e7, True),
+    'imshow': (case_imshow, 1e8, True),
+    'fill_between': (case_fill_between, 1e7, True),
+    'vlines': (case_vlines, 1e6, True),
+    'hlines': (case_hlines, 1e6, True),
+    'subplots': (case_subplots, 100, True),
+    'hover': (case_hover, 1e7, False),
+    'export_png': (case_export_png, 1e7, False),
+    'export_svg': (case_export_svg, 1e7, False),
+}
+SUBPLOTS_SIZES = [4, 16, 64, 100]
+# reference results of the default run, for `--baseline` (see 'meta' in the file for the machine)
+REFERENCE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_suite_baseline.json')
+
+
+def run_case(app, name, size, repeats):
+    """Best call time and time to first frame (s) of `repeats` runs, each in a new figure."""
+    import pyqtplotlib as qtplt
+    from PyQt5.QtCore import QEvent, QObject
+    from pyqtplotlib.pltwrapper.axes import Axes
+
+    function, _, first_frame = CASES[name]
+    call_times, frame_times = [], []
+    for repeat in range(repeats):
+        rng = np.random.default_rng(repeat)
+        fig, ax = qtplt.subplots(1, 1)
+        fig.resize(800, 600)
+        fig.show()
+        app.processEvents()
+        call = function(fig, ax, int(size), rng)
+        call, figures = call if isinstance(call, tuple) else (call, [])
+        app.processEvents()
+
+        t0 = time.perf_counter()
+        seconds = call()
+        t1 = time.perf_counter()
+        app.processEvents()  # the first frame is painted when the event loop runs
+        t2 = time.perf_counter()
+        # a case may time its call itself and return the seconds (hover: time per event)
+        call_times.append(seconds if isinstance(seconds, float) else t1 - t0)
+        frame_times.append(t2 - t0)
+
+        for f in figures + [fig]:
+            # free the data now, so that a repeat does not hold the data of the previous one
+            for obj in f.findChildren(QObject) + [f]:
+                if isinstance(obj, Axes):
+                    obj.dispose()
+            f.close()
+            f.deleteLater()
+        app.sendPostedEvents(None, QEvent.DeferredDelete)
+        del call, figures, fig, ax, seconds  # (the item returned by the call holds the data)
+        gc.collect()
+    return min(call_times), min(frame_times) if first_frame else None
+
+
+def metadata():
+    import pyqtgraph
+    from PyQt5.QtCore import QT_VERSION_STR
+    try:
+        revision = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                  cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        revision = ''
+    return {
+        'date': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'revision': revision,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count(),
+        'qt': QT_VERSION_STR,
+        'pyqtgraph': pyqtgraph.__version__,
+        'numpy': np.__version__,
+        'qpa_platform': os.environ.get('QT_QPA_PLATFORM', ''),
+    }
+
+
+def compare(results, baseline, tolerance, noise):
+    """Print the change of each timing against the baseline; return the number of regressions."""
+    reference = {(r['case'], r['size']): r for r in baseline['results']}
+    regressions = 0
+    print(f"\nComparison with the baseline of {baseline['meta'].get('date', '?')} "
+          f"(revision {baseline['meta'].get('revision') or '?'}):")
+    for result in results:
+        old = reference.get((result['case'], result['size']))
+        if old is None:
+            continue
+        for key in ['call_s', 'first_frame_s']:
+            if result[key] is None or old.get(key) is None:
+                continue
+            ratio = result[key] / old[key] if old[key] > 0 else float('inf')
+            regression = ratio > 1 + tolerance and result[key] - old[key] > noise
+            regressions += regression
+            print(f"  {result['case']:15s} {result['size']:>11d} {key:14s} {old[key]:10.3g} s -> "
+                  f"{result[key]:10.3g} s  x{ratio:5.2f}{'  REGRESSION' if regression else ''}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the plotting hot paths of pyqtplotlib.')
+    parser.add_argument('--cases', nargs='+', choices=list(CASES), default=list(CASES))
+    parser.add_argument('--sizes', nargs='+', type=float, default=[1e3, 1e4, 1e5, 1e6, 1e7, 1e8],
+                        help='data sizes (default: 1e3 to 1e8); sizes above the limit of a case are skipped')
+    parser.add_argument('--no-limits', action='store_true', help='run every case at every size')
+    parser.add_argument('--repeats', type=int, default=3, help='runs per case and size; the best is kept')
+    parser.add_argument('--output', help='JSON file to save the results to')
+    parser.add_argument('--baseline', nargs='?', const=REFERENCE,
+                        help='JSON file of earlier results to compare with (without a file: the reference '
+                             'results next to this script)')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='relative slowdown reported as a regression (default: 0.2)')
+    parser.add_argument('--noise', type=float, default=0.002,
+                        help='smaller slowdowns in seconds are never regressions (default: 0.002)')
+    args = parser.parse_args()
+
+    from PyQt5.QtWidgets import QApplication
+    app = QApplication.instance() or QApplication([])
+
+    results = []
+    print(f"{'case':15s} {'size':>11s} {'call':>12s} {'first frame':>12s}")
+    for name in args.cases:
+        _, max_size, _ = CASES[name]
+        sizes = SUBPLOTS_SIZES if name == 'subplots' else args.sizes
+        for size in sizes:
+            if size > max_size and not args.no_limits:
+                continue
+            call_s, first_frame_s = run_case(app, name, size, args.repeats)
+            results.append({'case': name, 'size': int(size), 'call_s': call_s, 'first_frame_s': first_frame_s})
+            frame = '' if first_frame_s is None else f'{first_frame_s:10.3g} s'
+            print(f'{name:15s} {int(size):11d} {call_s:10.3g} s {frame:>12s}', flush=True)
+
+    report = {'meta': metadata(), 'results': results}
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=1)
+    regressions = 0
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance, args.noise)
+        print(f'{regressions} regression(s)')
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
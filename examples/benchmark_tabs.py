@@ -0,0 +1,70 @@
+# This example measures the startup time and the redraw load of a window with 15 instrument tabs, each a 2x2 figure of live lines fed by a producer thread: widgets built up front with all tabs updating (as before), and built from factories with the hidden tabs suspended.
+# Run with QT_QPA_PLATFORM=offscreen to benchmark without a display. In the second case every tab is visited once, so that both windows feed the same 60 lines.
+import threading
+import time
+import numpy as np
+import pyqtplotlib as qtplt
+from pyqtplotlib.windows import TabsWindow
+from PyQt5.QtWidgets import QApplication
+
+app = QApplication([])
+num_tabs, seconds, chunk = 15, 3.0, 100
+
+for lazy in [False, True]:
+    feeds, redraws = [], []
+
+    def instrument():
+        fig, axs = qtplt.subplots(2, 2)
+        for ax in axs.flat:
+            feed = ax.feed(maxlen=5000)
+            line = feed.stream.line
+
+            def set_data(*args, line=line):
+                t = time.perf_counter()
+                type(line).setData(line, *args)
+                redraws.append(time.perf_counter() - t)
+            line.setData = set_data
+            feeds.append(feed)
+        return fig
+
+    t0 = time.perf_counter()
+    modules = [instrument if lazy else instrument() for _ in range(num_tabs)]
+    window = TabsWindow(modules, module_names=[f"Instrument {i + 1}" for i in range(num_tabs)])
+    window.resize(1200, 800)
+    window.show()
+    app.processEvents()
+    t_startup = time.perf_counter() - t0
+    if lazy:
+        for i in list(range(1, num_tabs)) + [0]:
+            window.tab_widget.setCurrentIndex(i)
+            app.processEvents()
+    else:
+        for i in range(num_tabs):  # hidden tabs keep updating, as before they were suspended
+            for ax in window.module_widget(i).axs.flat:
+                ax.resume_updates()
+
+    running = True
+
+    def produce():
+        x = 0
+        while running:
+            for feed in feeds:
+                feed.put(np.arange(x, x + chunk), np.random.normal(size=chunk))
+            x += chunk
+            time.sleep(5e-3)
+    thread = threading.Thread(target=produce)
+    thread.start()
+    del redraws[:]
+    t0 = time.perf_counter()
+    while time.perf_counter() - t0 < seconds:
+        app.processEvents()
+        time.sleep(2e-3)
+    running = False
+    thread.join()
+
+    print(f"lazy={lazy!s:5}: startup {1e3 * t_startup:6.0f} ms, "
+          f"{len(redraws) / seconds:6.0f} line redraws per second taking {100 * sum(redraws) / seconds:5.1f} % of the time")
+    for i in reversed(range(window.tab_widget.count())):
+        window.close_tab(i)
+    window.close()
+    app.processEvents()
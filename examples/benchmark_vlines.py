@@ -0,0 +1,43 @@
+# This example measures how fast vlines/hlines draw 100k event markers, with a single color and with one color per line.
+# Run with QT_QPA_PLATFORM=offscreen to benchmark without a display.
+import time
+import numpy as np
+import pyqtplotlib as qtplt
+from PyQt5 import QtWidgets
+
+app = QtWidgets.QApplication([])
+num_lines = 100_000
+num_frames = 30
+
+def frame_rate(ax, num_frames):
+    """Pan the view and render `num_frames` frames, return the frames per second."""
+    vb = ax.getPlotItem().getViewBox()
+    (x0, x1), _ = vb.viewRange()
+    t0 = time.perf_counter()
+    for i in range(num_frames):
+        shift = (x1 - x0) * 0.01 * i
+        vb.setXRange(x0 + shift, x1 + shift, padding=0)
+        ax.grab()  # render the frame
+    return num_frames / (time.perf_counter() - t0)
+
+events = np.sort(np.random.rand(num_lines) * 1000)
+cases = {
+    'vlines, one color': lambda ax: ax.vlines(events, 0, 1, color='k'),
+    'vlines, colors from cmap': lambda ax: ax.vlines(events, 0, 1, colors=np.random.rand(num_lines), cmap='plasma'),
+    'hlines, named colors': lambda ax: ax.hlines(np.random.rand(num_lines), 0, 1000, colors=['r', 'g', 'b', 'k'] * (num_lines // 4)),
+}
+
+for name, draw in cases.items():
+    fig, ax = qtplt.subplots(1, 1)
+    fig.setGeometry(100, 100, 1200, 800)
+    fig.show()
+    app.processEvents()
+
+    t0 = time.perf_counter()
+    draw(ax)
+    ax.autoRange()
+    ax.grab()
+    t_first = time.perf_counter() - t0
+    print(f'{name:28s} {num_lines} lines: first frame {t_first * 1e3:6.1f} ms, '
+          f'{frame_rate(ax, num_frames):5.1f} frames/s while panning')
+    fig.close()
@@ -0,0 +1,29 @@
+# This example renders 200 report figures to PNG files without a display, in one process and with a process pool, and prints the throughput.
+# The figures are built by `build_report`, which must be defined at the top level so that worker processes can import it.
+import os
+import tempfile
+import numpy as np
+import pyqtplotlib as qtplt
+from pyqtplotlib.pltwrapper.export import export_figures
+
+
+def build_report(seed):
+    rng = np.random.default_rng(seed)
+    fig, axs = qtplt.subplots(2, 2)
+    fig.resize(1000, 700)
+    axs[0, 0].plot(np.cumsum(rng.normal(size=5000)), label='signal')
+    axs[0, 0].legend()
+    axs[0, 1].scatter(rng.random(2000), rng.random(2000), c=rng.random(2000), cmap='plasma')
+    axs[1, 0].imshow(rng.random((200, 300)), cmap='viridis')
+    axs[1, 1].fill_between(np.arange(100), rng.random(100))
+    axs[1, 1].set_title(f'report {seed}')
+    return fig
+
+
+if __name__ == '__main__':
+    num_figures = 200
+    with tempfile.TemporaryDirectory() as outdir:
+        specs = [dict(filename=os.path.join(outdir, f'report_{i:04d}.png'), seed=i) for i in range(num_figures)]
+        for processes in [1, os.cpu_count()]:
+            print(f'{processes} worker process(es):', end=' ')
+            report = export_figures(build_report, specs, processes=processes, chunksize=4, verbose=True)
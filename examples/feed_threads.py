@@ -0,0 +1,39 @@
+# This example streams data from 4 acquisition threads into 4 lines through thread-safe feeds, and prints the feed counters every second.
+# Each thread writes 100 chunks of 100 samples per second; the GUI thread merges the pending chunks into one update per line and frame.
+import threading
+import time
+import numpy as np
+import pyqtplotlib as qtplt
+from PyQt5 import QtCore, QtWidgets
+
+app = QtWidgets.QApplication([])
+fig, axs = qtplt.subplots(2, 2)
+feeds = [ax.feed(maxlen=20000, policy='drop_oldest', label=f'channel {i}') for i, ax in enumerate(axs.flat)]
+running = True
+
+
+def acquire(feed, rate=10000, chunk=100):
+    t = 0
+    while running:
+        x = (t + np.arange(chunk)) / rate
+        feed.put(x, np.sin(2 * np.pi * x) + 0.1 * np.random.randn(chunk))
+        t += chunk
+        time.sleep(chunk / rate)
+
+
+def report():
+    for i, feed in enumerate(feeds):
+        stats = feed.stats()
+        print(f"channel {i}: {stats['received_samples']} samples, {stats['flushes']} updates, "
+              f"queue depth {stats['queue_depth']}, dropped {stats['dropped_samples']}")
+
+
+threads = [threading.Thread(target=acquire, args=(feed,), daemon=True) for feed in feeds]
+for thread in threads:
+    thread.start()
+timer = QtCore.QTimer()
+timer.timeout.connect(report)
+timer.start(1000)
+fig.show()
+app.exec_()
+running = False
@@ -1,2 +1,22 @@
-from .pltwrapper import subplots
-from .pltwrapper.subplots import share_axes
+# The plotting functions are imported on first use, so that importing the package is
+# fast and does not load Qt and pyqtgraph (see examples/benchmark_import.py)
+_lazy_attributes = {
+    'subplots': 'pyqtplotlib.pltwrapper',
+    'share_axes': 'pyqtplotlib.pltwrapper.subplots',
+}
+_lazy_submodules = ('pltwrapper', 'windows', 'interaction')
+
+
+def __getattr__(name):
+    import importlib
+    if name in _lazy_submodules:
+        return importlib.import_module(f'{__name__}.{name}')  # also sets the attribute of the package
+    if name not in _lazy_attributes:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_lazy_attributes[name]), name)
+    globals()[name] = value  # later lookups do not go through __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_lazy_attributes) | set(_lazy_submodules))
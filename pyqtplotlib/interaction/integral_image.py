@@ -0,0 +1,121 @@
+#%%
+"""
+Integral images (summed-area tables) for the statistics of rectangular regions of an image
+in constant time, e.g. while an ROI is dragged over it (see `ImageStatsPlot`).
+"""
+import numpy as np
+
+
+def _block_sums(values, block):
+    """Sums over the blocks of `block` x `block` elements of a 2D array whose shape is a multiple of `block`."""
+    num_rows, num_cols = values.shape
+    column_sums = values.reshape(num_rows, num_cols // block, block).sum(axis=2)
+    return column_sums.reshape(num_rows // block, block, num_cols // block).sum(axis=1)
+
+
+class IntegralImage:
+    """
+    Summed-area tables of the values, their squares and (for floating point images, whose
+    NaNs are ignored) the number of finite values of a 2D image.
+
+    The tables are built once, band by band, so that images larger than the memory (e.g.
+    `MemmapImageSource`s) can be used. Each table entry holds the sum over all pixels above
+    and to the left of it, so the sums over any rectangle take 4 lookups per table.
+
+    For large images the tables are computed over blocks of `block` x `block` pixels to
+    limit their memory (3 float64 tables of a 16k x 16k image would take 6 GB). The blocks
+    inside a rectangle are then summed from the tables in constant time, and the strips of
+    less than `block` pixels along its edges are summed from the image.
+
+    Parameters:
+    - data: 2D array (or memmap), or an `ImageSource`
+    - block: size of the blocks (default: the smallest that keeps the tables within
+             `max_table_bytes`; 1 for images of up to about 4k x 4k pixels)
+    - max_table_bytes: memory budget of the tables when `block` is None
+    """
+
+    def __init__(self, data, block=None, max_table_bytes=1 << 29):
+        if len(data.shape) != 2:
+            raise ValueError("Region statistics need a 2D image.")
+        self.data = data
+        self.shape = num_rows, num_cols = tuple(data.shape)
+        first = self._read(slice(0, min(num_rows, 64)), slice(0, num_cols))
+        self.ignore_nan = np.issubdtype(first.dtype, np.floating)
+        # the values are shifted by about their mean, which keeps the sums of squares and
+        # thus the variance accurate for data with a large offset (e.g. camera frames)
+        self.offset = float(np.nanmean(first)) if np.isfinite(first).any() else 0.0
+
+        num_tables = 3 if self.ignore_nan else 2
+        if block is None:
+            block = 1
+            while num_tables * 8 * (num_rows // block + 1) * (num_cols // block + 1) > max_table_bytes:
+                block += 1
+        self.block = block
+        block_rows, block_cols = num_rows // block, num_cols // block
+
+        tables = np.zeros((num_tables, block_rows + 1, block_cols + 1))
+        band = max(1, (1 << 22) // max(block * num_cols, 1))  # block rows per band (~32 MB)
+        for r0 in range(0, block_rows, band):
+            r1 = min(r0 + band, block_rows)
+            values = np.array(self._read(slice(r0 * block, r1 * block), slice(0, block_cols * block)),
+                              dtype=np.float64)
+            values -= self.offset
+            if self.ignore_nan:
+                finite = np.isfinite(values)
+                if finite.all():
+                    tables[2, r0 + 1:r1 + 1, 1:] = block * block
+                else:
+                    tables[2, r0 + 1:r1 + 1, 1:] = _block_sums(finite, block)
+                    values[~finite] = 0.0
+            tables[0, r0 + 1:r1 + 1, 1:] = _block_sums(values, block)
+            np.square(values, out=values)
+            tables[1, r0 + 1:r1 + 1, 1:] = _block_sums(values, block)
+        np.cumsum(tables, axis=1, out=tables)
+        np.cumsum(tables, axis=2, out=tables)
+        self.tables = tables
+
+    def _read(self, rows, cols):
+        if hasattr(self.data, 'read'):
+            return self.data.read(rows, cols)  # ImageSource
+        return np.asarray(self.data[rows, cols])
+
+    def _direct_moments(self, r0, r1, c0, c1):
+        """(count, sum, sum of squares) of the shifted values of data[r0:r1, c0:c1], from the image."""
+        values = np.asarray(self._read(slice(r0, r1), slice(c0, c1)), dtype=np.float64) - self.offset
+        if self.ignore_nan:
+            values = values[np.isfinite(values)]
+        return np.array([values.size, values.sum(), np.square(values).sum()])
+
+    def _moments(self, r0, r1, c0, c1):
+        b = self.block
+        R0, R1 = -(-r0 // b), r1 // b
+        C0, C1 = -(-c0 // b), c1 // b
+        if R0 >= R1 or C0 >= C1:
+            return self._direct_moments(r0, r1, c0, c1)
+        t = self.tables
+        sums = t[:, R1, C1] - t[:, R0, C1] - t[:, R1, C0] + t[:, R0, C0]
+        moments = np.array([sums[2] if self.ignore_nan else (R1 - R0) * (C1 - C0) * b * b, sums[0], sums[1]])
+        for strip in [(r0, R0 * b, c0, c1), (R1 * b, r1, c0, c1),
+                      (R0 * b, R1 * b, c0, C0 * b), (R0 * b, R1 * b, C1 * b, c1)]:
+            if strip[0] < strip[1] and strip[2] < strip[3]:
+                moments += self._direct_moments(*strip)
+        return moments
+
+    def stats(self, r0, r1, c0, c1):
+        """
+        Statistics of the pixels data[r0:r1, c0:c1] (clipped to the image).
+
+        Returns:
+        - dict with 'count' (number of pixels, without NaNs), 'sum', 'mean' and 'std'
+        """
+        num_rows, num_cols = self.shape
+        r0, r1 = int(np.clip(r0, 0, num_rows)), int(np.clip(r1, 0, num_rows))
+        c0, c1 = int(np.clip(c0, 0, num_cols)), int(np.clip(c1, 0, num_cols))
+        if r0 >= r1 or c0 >= c1:
+            return dict(count=0, sum=0.0, mean=np.nan, std=np.nan)
+        count, shifted_sum, shifted_squares = self._moments(r0, r1, c0, c1)
+        if count == 0:
+            return dict(count=0, sum=0.0, mean=np.nan, std=np.nan)
+        shifted_mean = shifted_sum / count
+        return dict(count=int(count), sum=shifted_sum + self.offset * count, mean=shifted_mean + self.offset,
+                    std=np.sqrt(max(shifted_squares / count - shifted_mean**2, 0.0)))
@@ -6,10 +6,13 @@ from PyQt5 import QtCore, QtWidgets, QtGui
 from pyqtplotlib.pltwrapper import AxesWidget
 
 class ROIAxesWidget(pg.PlotWidget):
+    hide_roi_on_release = True  # the ROI is only shown while it is drawn
+
     def __init__(self, parent=None, roi_type='rect'):
         super().__init__(parent)
 
         self.data = None
+        self.index = None  # SortedIndex ('linear') or GridIndex ('rect') of the data
         self.scatter = None
         self.mask = None
         self.roi_type = roi_type
@@ -33,19 +36,47 @@ class ROIAxesWidget(pg.PlotWidget):
         # Hide ROI until Ctrl is pressed
         self.roi.hide()
         self.ePressed = False
+        self.shiftPressed = False
         self.roiStart = None
 
-        # Connect ROI event with additional argument using lambda
-        self.roi.sigRegionChangeFinished.connect(lambda: self.onROIChanged())
+        # While the ROI is drawn, it is moved at every mouse move; onROIChanged is called
+        # when the mouse is released
+        self.roi.sigRegionChanged.connect(lambda: self.onROIMoved())
 
     def set_data(self, x, y, **plot_kwargs):
+        from pyqtplotlib.interaction.spatial_index import GridIndex, SortedIndex
+
         self.data = (np.array(x), np.array(y))
+        self.index = SortedIndex(self.data[0]) if self.roi_type == 'linear' else GridIndex(*self.data)
         if self.scatter is None:
             self.scatter = self.plot(x, y, **plot_kwargs)
         else:
             self.scatter.setData(x, y)
         return self.scatter
 
+    def roi_bounds(self):
+        """(x1, x2) of a 'linear' ROI, (x1, x2, y1, y2) of a 'rect' ROI."""
+        if self.roi_type == 'rect':
+            bounds = self.roi.parentBounds()
+            return bounds.left(), bounds.right(), bounds.top(), bounds.bottom()
+        return tuple(sorted(self.roi.getRegion()))
+
+    def roi_indices(self):
+        """Indices of the data points (strictly) inside the ROI, found with the spatial index."""
+        return self.index.query(*self.roi_bounds())
+
+    def roi_contains(self, x, y):
+        """Boolean mask of the points (x, y) inside the ROI."""
+        bounds = self.roi_bounds()
+        inside = (x > bounds[0]) & (x < bounds[1])
+        if self.roi_type == 'rect':
+            inside &= (y > bounds[2]) & (y < bounds[3])
+        return inside
+
+    def onROIMoved(self):
+        """Override to give live feedback. This method is called whenever the ROI moves, e.g. while it is drawn."""
+        pass
+
     def onROIChanged(self):
         """Override to add custom functionality. This method is called when the ROI is changed."""
         pass
@@ -84,7 +115,7 @@ class ROIAxesWidget(pg.PlotWidget):
         if self.roiStart is not None:
             currentPos = self.plotItem.vb.mapSceneToView(event.pos())
             if self.roi_type == 'rect':
-                self.roi.setSize(currentPos - self.roiStart)
+                self.roi.setSize(currentPos - self.roiStart, finish=False)
             elif self.roi_type == 'linear':
                 self.roi.setRegion([self.roiStart.x(), currentPos.x()])
         else:
@@ -92,7 +123,10 @@ class ROIAxesWidget(pg.PlotWidget):
 
     def mouseReleaseEvent(self, event):
         if event.button() == QtCore.Qt.LeftButton:
-            self.roi.hide()
+            if self.roiStart is not None:
+                self.onROIChanged()
+            if self.hide_roi_on_release:
+                self.roi.hide()
             self.roiStart = None
         super().mouseReleaseEvent(event)
 
@@ -148,36 +182,165 @@ This will allow the base class (here: AxesWidget) to be enhanced with additional
 
 class ExcludeSelectionPlot(AxesWidget, ROIAxesWidget):
     def __init__(self, parent=None, roi_type='rect'):
-        """Plot widget with an ROI that can be used to exclude data points from the plot."""
+        """
+        Plot widget with an ROI that can be used to exclude data points from the plot.
+
+        The points inside the ROI are looked up in the spatial index of the data (see
+        `ROIAxesWidget.set_data`), so the excluded points are shown live while the ROI is
+        drawn, at most once per frame. Each selection is recorded as the indices of the
+        points it changed, so it can be undone with `undo` (Ctrl+Z).
+        """
+        from pyqtplotlib.pltwrapper.timing import FrameThrottle
+
         super().__init__(parent=parent, roi_type=roi_type)
 
         self.mask = None
+        self._excluded = None  # indices of the excluded points, as shown by roi_data
+        self._history = []  # (indices of the points that changed, their new state)
         self.roi_data = self.plot([], [], color='r', marker='o', label='ROI')
         self.set_title('Select a region to exclude by holding "e" and dragging the mouse.\nDrag with "Shift+e" to invert the selection.')
-            
-    def onROIChanged(self, inverted=False):
+
+        self._preview_throttle = FrameThrottle(self._show_preview, defer=True, parent=self)
+
+    def set_data(self, x, y, **plot_kwargs):
+        scatter = super().set_data(x, y, **plot_kwargs)
+        self.mask = None
+        self._excluded = None
+        self._history = []
+        self.roi_data.setData([], [])
+        return scatter
+
+    def onROIMoved(self):
+        if self.roiStart is not None and self.data is not None:
+            self._preview_throttle.request()
+
+    def _show_preview(self):
+        """Show the excluded points as they would be if the ROI was released now."""
+        if self.roiStart is None:
+            return
         x, y = self.data
-        if self.roi_type == 'rect':
-            bounds = self.roi.parentBounds()
-            x1, y1, x2, y2 = bounds.left(), bounds.top(), bounds.right(), bounds.bottom()
-            mask = (x > x1) & (x < x2) & (y > y1) & (y < y2)
-        elif self.roi_type == 'linear':
-            x1, x2 = self.roi.getRegion()
-            mask = (x > x1) & (x < x2)
-        self.update_mask(mask, inverted=inverted)
+        excluded = self._excluded if self._excluded is not None else np.empty(0, dtype=int)
+        if self.shiftPressed:
+            excluded = excluded[~self.roi_contains(x[excluded], y[excluded])]
+        else:
+            selected = self.roi_indices()
+            if self.mask is not None:
+                selected = selected[~self.mask[selected]]
+            excluded = np.concatenate([excluded, selected])
+        self.roi_data.setData(x[excluded], y[excluded])
+
+    def onROIChanged(self, inverted=None):
+        self._preview_throttle.cancel()
+        if self.data is None:
+            return
+        if inverted is None:
+            inverted = self.shiftPressed
+        self.update_mask(self.roi_indices(), inverted=inverted)
 
     def update_mask(self, mask, inverted=False):
+        """
+        Exclude the points selected by `mask` (a boolean mask or indices), or include them
+        again if `inverted`.
+        """
         x, y = self.data
 
         if self.mask is None:
             self.mask = np.zeros_like(x, dtype=bool)
-        if not inverted:
-            self.mask[mask] = True
-        else:
-            self.mask[mask] = False
+        indices = np.flatnonzero(mask) if np.asarray(mask).dtype == bool else np.asarray(mask)
+        changed = indices[self.mask[indices] == inverted]
+        if len(changed):
+            self._history.append((changed, not inverted))
+        self.mask[changed] = not inverted
+        self._update_excluded()
+
+    def undo(self):
+        """Undo the last selection; return False if there is nothing to undo."""
+        if not self._history:
+            return False
+        changed, state = self._history.pop()
+        self.mask[changed] = not state
+        self._update_excluded()
+        return True
+
+    def _update_excluded(self):
+        x, y = self.data
+        self._excluded = np.flatnonzero(self.mask)
+        self.roi_data.setData(x[self._excluded], y[self._excluded])
+
+    def keyPressEvent(self, event):
+        if event.key() == QtCore.Qt.Key_Z and event.modifiers() & QtCore.Qt.ControlModifier:
+            self.undo()
+        super().keyPressEvent(event)
+
+class ImageStatsPlot(AxesWidget, ROIAxesWidget):
+    """
+    Image with a rectangular ROI whose statistics (count, sum, mean, std) are shown live
+    while it is drawn, moved or resized. They are computed in constant time from the
+    integral images built once by `set_image` (see `IntegralImage`), however large the
+    image and the ROI.
+
+    Signals:
+    - sigStatsChanged(dict): the statistics of the ROI, whenever it changes
+    """
+
+    sigStatsChanged = QtCore.pyqtSignal(object)
+    hide_roi_on_release = False  # the ROI stays, to be moved and resized
+
+    def __init__(self, parent=None):
+        super().__init__(parent=parent, roi_type='rect')
+
+        self.image = None
+        self.integral = None
+        self.stats = None  # statistics of the ROI
+        self._extent = None
+        self.stats_text = pg.TextItem(anchor=(0, 1))
+        self.stats_text.hide()
+        self.addItem(self.stats_text, ignoreBounds=True)
+        self.set_title('Select a region by holding "e" and dragging the mouse; drag it or its handles to move or resize it.')
+
+    def set_image(self, data, extent=None, block=None, **imshow_kwargs):
+        """
+        Display the image with `imshow` and build its integral images.
+
+        Parameters:
+        - data: 2D array (or memmap), or an `ImageSource`
+        - extent: (left, right, bottom, top) as in `imshow`
+        - block: block size of the integral images (see `IntegralImage`)
+        - **imshow_kwargs: passed to `imshow`
+        """
+        from pyqtplotlib.interaction.integral_image import IntegralImage
+
+        self.integral = IntegralImage(data, block=block)
+        num_rows, num_cols = self.integral.shape
+        self._extent = extent if extent is not None else (0, num_cols, 0, num_rows)
+        if self.image is not None:
+            self.removeItem(self.image)
+        self.image = self.imshow(data, extent=extent, **imshow_kwargs)
+        self.image.setZValue(-1)  # below the ROI and the statistics
+        return self.image
+
+    def region_stats(self, x1, x2, y1, y2):
+        """Statistics of the pixels whose centers are in the region x1 <= x < x2, y1 <= y < y2 (view coordinates)."""
+        num_rows, num_cols = self.integral.shape
+        left, right, bottom, top = self._extent
+        c0, c1 = sorted(np.ceil((np.array([x1, x2]) - left) * num_cols / (right - left) - 0.5))
+        r0, r1 = sorted(np.ceil((np.array([y1, y2]) - bottom) * num_rows / (top - bottom) - 0.5))
+        return self.integral.stats(r0, r1, c0, c1)
+
+    def onROIMoved(self):
+        if self.integral is None or not self.roi.isVisible():
+            return
+        x1, x2, y1, y2 = self.roi_bounds()
+        self.stats = self.region_stats(x1, x2, y1, y2)
+        self.stats_text.setText("n = {count}\nsum = {sum:.6g}\nmean = {mean:.6g}\nstd = {std:.6g}".format(**self.stats))
+        self.stats_text.setPos(x1, y2)
+        self.stats_text.show()
+        self.sigStatsChanged.emit(self.stats)
+
+    def onROIChanged(self):
+        self.onROIMoved()
+
 
-        self.roi_data.setData(x[self.mask], y[self.mask])
-        
 if __name__ == "__main__":
 
     from PyQt5.QtWidgets import QApplication, QMainWindow
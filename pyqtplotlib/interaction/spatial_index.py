@@ -0,0 +1,100 @@
+#%%
+"""
+Spatial indices of point sets, to find the points inside a region (e.g. an ROI) without
+testing every point: `SortedIndex` for x-intervals and `GridIndex` for rectangles.
+Both select the points strictly inside the region, and never select points with NaN
+coordinates. Queries return the indices of the points in an arbitrary order.
+"""
+import numpy as np
+
+
+def _index_dtype(n):
+    return np.int32 if n < 2**31 else np.int64
+
+
+class SortedIndex:
+    """
+    Points sorted by x. A query for x1 < x < x2 takes two binary searches and returns a
+    slice of the sort order: O(log n) plus the number of points found, without a copy.
+
+    Parameters:
+    - x: x-coordinates of the points
+    """
+
+    def __init__(self, x):
+        x = np.asarray(x)
+        self.order = np.argsort(x).astype(_index_dtype(len(x)), copy=False)
+        self.sorted_x = x[self.order]
+
+    def __len__(self):
+        return len(self.order)
+
+    def query(self, x1, x2):
+        """Indices of the points with x1 < x < x2."""
+        start = np.searchsorted(self.sorted_x, x1, side='right')
+        stop = np.searchsorted(self.sorted_x, x2, side='left')
+        return self.order[start:max(start, stop)]
+
+
+class GridIndex:
+    """
+    Points binned into a uniform grid of cells, stored cell by cell (cells of a column are
+    contiguous). A query for a rectangle takes one slice of the cells per column that it
+    overlaps and only tests the points of these cells against the rectangle, so its cost
+    grows with the number of points near the rectangle instead of all points.
+
+    Parameters:
+    - x, y: coordinates of the points
+    - points_per_cell: average number of points per cell, which sets the grid size
+    - max_cells: maximal number of cells along each axis (at most 46340)
+    """
+
+    def __init__(self, x, y, points_per_cell=8, max_cells=4096):
+        self.x = x = np.asarray(x)
+        self.y = y = np.asarray(y)
+        if x.shape != y.shape:
+            raise ValueError("x and y must have the same shape.")
+        finite = np.isfinite(x) & np.isfinite(y)
+        num_finite = int(np.count_nonzero(finite))
+        self.shape = (0, 0)
+        if num_finite == 0:
+            self.order = np.empty(0, dtype=_index_dtype(0))
+            self.starts = np.zeros(1, dtype=np.int64)
+            return
+
+        self.x_range = (x[finite].min(), x[finite].max())
+        self.y_range = (y[finite].min(), y[finite].max())
+        num_cells = int(np.clip(np.sqrt(num_finite / points_per_cell), 1, max_cells))
+        self.shape = (num_cells, num_cells)
+
+        cell = self._cells(x, 0) * num_cells + self._cells(y, 1)  # fits int32 for max_cells <= 46340
+        cell[~finite] = num_cells * num_cells  # behind the last cell, never queried
+        self.order = np.argsort(cell).astype(_index_dtype(len(x)), copy=False)
+        counts = np.bincount(cell, minlength=num_cells * num_cells + 1)
+        self.starts = np.concatenate([[0], np.cumsum(counts)])
+
+    def __len__(self):
+        return len(self.x)
+
+    def _cells(self, values, axis):
+        """Column (axis 0) or row (axis 1) of the cells containing `values`."""
+        low, high = self.x_range if axis == 0 else self.y_range
+        num_cells = self.shape[axis]
+        scale = num_cells / (high - low) if high > low else 0.0
+        cells = np.floor((np.asarray(values, dtype=np.float64) - low) * scale)
+        return np.clip(np.nan_to_num(cells), 0, num_cells - 1).astype(np.int32)
+
+    def query(self, x1, x2, y1, y2):
+        """Indices of the points with x1 < x < x2 and y1 < y < y2."""
+        if self.shape == (0, 0) or not (x1 < x2 and y1 < y2) \
+                or x2 < self.x_range[0] or x1 > self.x_range[1] \
+                or y2 < self.y_range[0] or y1 > self.y_range[1]:
+            return self.order[:0]
+        column0, column1 = map(int, self._cells([x1, x2], 0))
+        row0, row1 = map(int, self._cells([y1, y2], 1))
+        num_rows = self.shape[1]
+        candidates = np.concatenate([
+            self.order[self.starts[column * num_rows + row0]:self.starts[column * num_rows + row1 + 1]]
+            for column in range(column0, column1 + 1)])
+        x, y = self.x[candidates], self.y[candidates]
+        return candidates[(x > x1) & (x < x2) & (y > y1) & (y < y2)]
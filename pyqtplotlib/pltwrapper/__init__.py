@@ -1,3 +1,3 @@
-from .axes import AxesWidget
+from .axes import AxesWidget, AxesItem
 from .subplots import Subplots, subplots
 from .figure import Figure
\ No newline at end of file
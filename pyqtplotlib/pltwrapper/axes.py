@@ -1,9 +1,11 @@
 #%%
 import pyqtgraph as pg
 import sys
-from PyQt5.QtWidgets import QApplication, QMainWindow, QLabel, QGraphicsItem
-from PyQt5.QtCore import Qt, QPointF
-from matplotlib import pyplot as plt
+from PyQt5.QtWidgets import QApplication, QMainWindow, QLabel, QGraphicsItem, QGraphicsPathItem
+from PyQt5.QtGui import QPainterPath, QColor
+from PyQt5.QtCore import Qt, QObject, QPointF, QRectF, QLineF
+
+from pyqtplotlib.pltwrapper.styles import style_cache
 
 pg.setConfigOption('background', 'w')
 pg.setConfigOption('leftButtonPan', False)
@@ -14,28 +16,628 @@ class MovableTextItem(pg.TextItem):
         super(MovableTextItem, self).__init__(*args, **kwargs)
         self.setFlag(QGraphicsItem.ItemIsMovable)
         
-class AxesWidget(pg.PlotWidget):
-    
-    def __init__(self, parent=None,  **kwargs):
-        super().__init__(parent=parent, **kwargs)
-        
-        self.setParent(parent)
-        self.plotItem.showGrid(True, True, 0.7)
+class ArrayScatterPlotItem(pg.ScatterPlotItem):
+    """
+    ScatterPlotItem with a vectorized path for large point clouds.
+
+    pyqtgraph resolves the pen, brush and symbol-atlas entry of every spot
+    individually in Python. With `setArrayData`, the per-point brushes are given as
+    indices into a small table of shared QBrush objects, and per-point sizes are
+    reduced to their distinct values. The atlas is then queried once per distinct
+    (size, brush) style and the result is broadcast to all spots with numpy indexing.
+    Spots added or styled through the generic ScatterPlotItem API use the regular
+    per-point path.
+
+    From `bulk_threshold` points on, the spots are kept as plain arrays (coordinates
+    and style codes) and drawn by a bulk path: pyqtgraph's record array of the spots,
+    with several Python objects per spot, is only built when it is used (e.g. by
+    `points`, or by styling the spots individually). Of the opaque spots that fall on
+    the same device pixel with the same size, only the last one is drawn, since it
+    covers the others up to their sub-pixel offsets; the remaining spots are drawn
+    with a single `drawPixmapFragments` call.
+    """
+
+    bulk_threshold = 1 << 18
+
+    def __init__(self, *args, **kwargs):
+        self._style_codes = None   # style code of each spot, or None for the generic path
+        self._style_sizes = [None]
+        self._style_brushes = [None]
+        self._bulk = None    # (x, y) of the spots while their record array is not built
+        self._coords = None  # (x, y) returned by getData
+        self._bulk_rects = None  # atlas rects of the style codes, for the bulk path
+        self._bulk_bounds = [None, None]  # ranges of x and y, for the bulk path
+        self._jobs = None  # LatestJob of `setArrayData(..., background=True)`
+        super().__init__(*args, **kwargs)
+
+    @property
+    def data(self):
+        """pyqtgraph's record array of the spots (built on first use for bulk point clouds)."""
+        if self._bulk is not None:
+            x, y = self._bulk
+            self._bulk = None
+            self._data = self._record_array(x, y, self._style_sizes, self._style_brushes, self._style_codes)
+            self.updateSpots()
+        return self._data
+
+    @data.setter
+    def data(self, data):
+        self._bulk = None
+        self._coords = None
+        self._data = data
+
+    def _release_record_array(self, bulk):
+        """
+        Go back to the bulk path after the record array was built for a temporary use
+        (e.g. an export); `bulk` is the (x, y) of the bulk spots before. Nothing changes
+        if the spots or their styles have been replaced since.
+        """
+        if self._bulk is None and self._coords is bulk and self._style_codes is not None:
+            self._bulk = bulk
+            self._data = self._data[:0]
+            self.update()
+
+    def setArrayData(self, x, y, size=None, brush_table=None, brush_index=None, background=False):
+        """
+        Replace the data with arrays of coordinates and vectorized styles.
+
+        Parameters:
+        - x, y: 1D arrays of coordinates
+        - size: scalar (default size of all spots) or array with one size per spot
+        - brush_table: sequence of QBrush objects shared between spots, or None for the default brush
+        - brush_index: integer array with the index into `brush_table` of each spot, or a
+                       function that returns it (called in the worker thread with `background`)
+        - background: prepare the spots in a worker thread (see `LatestJob`) and show them
+                      when they are ready; the current spots stay visible until then
+        """
+        import numpy as np
+
+        if np.isscalar(size) and size is not None:
+            self.setSize(size, update=False)
+        if not background:
+            self._set_array_data(self._array_data(x, y, size, brush_table, brush_index))
+            return
+        if self._jobs is None:
+            from pyqtplotlib.pltwrapper.workers import LatestJob
+            self._jobs = LatestJob(self._set_array_data, parent=self)
+        self._jobs.submit(self._array_data, x, y, size, brush_table, brush_index)
+
+    def wait_for_background(self, timeout=None):
+        """Wait until the spots prepared in the background are shown; return False on timeout."""
+        return True if self._jobs is None else self._jobs.wait(timeout)
+
+    @staticmethod
+    def _array_data(x, y, size, brush_table, brush_index, checkpoint=None):
+        """The coordinates, style tables and style codes of the spots, without touching the item."""
+        import numpy as np
+
+        x, y = np.asarray(x).ravel(), np.asarray(y).ravel()
+        num_points = len(x)
+
+        if size is None or np.isscalar(size):
+            sizes, size_index = [None], np.zeros(num_points, dtype=np.intp)
+        else:
+            sizes, size_index = np.unique(np.asarray(size, dtype=float), return_inverse=True)
+            sizes = sizes.tolist()
+            size_index = size_index.ravel()
+
+        if callable(brush_index):
+            brush_index = brush_index()
+        if brush_table is None:
+            brush_table, brush_index = [None], np.zeros(num_points, dtype=np.intp)
+        brush_table = list(brush_table)
+        brush_index = np.asarray(brush_index, dtype=np.intp).ravel()
+        if checkpoint is not None:
+            checkpoint()
+        return x, y, sizes, brush_table, size_index * len(brush_table) + brush_index
+
+    def _record_array(self, x, y, sizes, brush_table, codes):
+        """pyqtgraph's record array of the spots."""
+        import numpy as np
+
+        # np.empty initializes the object fields of the record array element by element,
+        # which dominates for millions of spots; fill them column-wise instead
+        data = np.zeros(len(x), dtype=self._data.dtype)
+        for name, (field_dtype, _) in data.dtype.fields.items():
+            if field_dtype == object and name != 'brush':
+                data[name] = None
+        if brush_table[0] is None:
+            data['brush'] = None
+        else:
+            brushes = np.empty(len(brush_table), dtype=object)
+            brushes[:] = brush_table
+            data['brush'] = brushes[codes % len(brush_table)]
+        data['x'] = x
+        data['y'] = y
+        data['size'] = -1 if sizes[0] is None else np.take(sizes, codes // len(brush_table))
+        data['visible'] = True
+        return data
+
+    def _set_array_data(self, prepared):
+        x, y, sizes, brush_table, codes = prepared
+        self.clear()
+        self._style_sizes, self._style_brushes = sizes, brush_table
+        self._style_codes = codes
+        self._bulk_rects = None
+        if len(x) >= self.bulk_threshold and self.opts['pxMode'] and self.opts['useCache']:
+            self._bulk = self._coords = (x, y)
+            self._bulk_bounds = [None, None]
+            self._bulk_style_rects()  # adds the styles to the atlas, which sets the maximal spot size
+        else:
+            self.data = self._record_array(x, y, sizes, brush_table, codes)
+            self.updateSpots()
+
+        self.prepareGeometryChange()
+        self.informViewBoundsChanged()
+        self.bounds = [None, None]
+        self.invalidate()
+        self.sigPlotChanged.emit(self)
+
+    def getData(self):
+        # the same arrays until the spots change (`hover` caches its index by them)
+        if self._coords is None:
+            self._coords = super().getData()
+        return self._coords
+
+    def addPoints(self, *args, **kargs):
+        # Points added through the generic API carry their own per-point styles
+        self._style_codes = None
+        super().addPoints(*args, **kargs)
+
+    def setBrush(self, *args, **kargs):
+        self._drop_style_codes(args)
+        super().setBrush(*args, **kargs)
+
+    def setPen(self, *args, **kargs):
+        self._drop_style_codes(args)
+        super().setPen(*args, **kargs)
+
+    def setSize(self, size, *args, **kargs):
+        self._drop_style_codes((size,))
+        super().setSize(size, *args, **kargs)
+
+    def setSymbol(self, symbol, *args, **kargs):
+        self._drop_style_codes((symbol,))
+        super().setSymbol(symbol, *args, **kargs)
+
+    def _drop_style_codes(self, args):
+        """Fall back to the generic path once per-point styles are set individually."""
+        import numpy as np
+
+        if len(args) == 1 and isinstance(args[0], (np.ndarray, list)):
+            self.data  # build the record array from the style codes first
+            self._style_codes = None
+
+    def _atlas_rects(self, codes):
+        """Atlas rects (x, y, w, h) of the style codes: one atlas lookup per distinct style."""
+        opts = self.opts
+        num_brushes = len(self._style_brushes)
+        styles = []
+        for code in codes:
+            size = self._style_sizes[code // num_brushes]
+            brush = self._style_brushes[code % num_brushes]
+            styles.append((opts['symbol'], opts['size'] if size is None else size,
+                           opts['pen'], opts['brush'] if brush is None else brush))
+        return self.fragmentAtlas[styles]
+
+    def updateSpots(self, dataSet=None):
+        import numpy as np
+
+        if dataSet is None:
+            dataSet = self.data
+
+        codes = self._style_codes
+        if codes is None or len(codes) != len(dataSet) or len(dataSet) != len(self.data) \
+                or not (self.opts['pxMode'] and self.opts['useCache']) or self.opts['hoverable']:
+            return super().updateSpots(dataSet)
+
+        mask = dataSet['sourceRect']['w'] == 0
+        if np.any(mask):
+            if not np.all(mask):
+                codes = codes[mask]
+            num_codes = len(self._style_sizes) * len(self._style_brushes)
+            if num_codes <= len(codes):
+                present = np.flatnonzero(np.bincount(codes, minlength=num_codes))
+                inverse = np.zeros(num_codes, dtype=np.intp)
+                inverse[present] = np.arange(len(present))
+                inverse = inverse[codes]
+            else:
+                present, inverse = np.unique(codes, return_inverse=True)
+
+            coords = np.array(self._atlas_rects(present.tolist()), dtype=dataSet['sourceRect'].dtype)
+            rects = dataSet['sourceRect']
+            for field in rects.dtype.names:
+                if len(codes) == len(dataSet):
+                    rects[field] = coords[field][inverse]
+                else:
+                    rects[field][mask] = coords[field][inverse]
+
+            self._maybeRebuildAtlas()
+
+        self._updateMaxSpotSizes(data=dataSet)
+        self.invalidate()
+
+    def _bulk_style_rects(self):
+        """Atlas rects of all style codes (rows of codes without spots are 0), for the bulk path."""
+        import numpy as np
+
+        if self._bulk_rects is None:
+            num_codes = len(self._style_sizes) * len(self._style_brushes)
+            present = np.flatnonzero(np.bincount(self._style_codes, minlength=num_codes))
+            rects = np.zeros((num_codes, 4))
+            if len(present):
+                rects[present] = self._atlas_rects(present.tolist())
+            self._bulk_rects = rects
+            self._updateMaxSpotSizes()
+        return self._bulk_rects
+
+    def _bulk_opaque_codes(self):
+        """Whether the spots of each style code are opaque (solid pen and brush)."""
+        import numpy as np
+
+        def opaque(brush):
+            return brush.style() == Qt.SolidPattern and brush.color().alpha() == 255
+
+        pen = pg.mkPen(self.opts['pen'])
+        pen_opaque = pen.style() == Qt.NoPen or opaque(pen.brush())
+        brushes = [opaque(pg.mkBrush(self.opts['brush'] if brush is None else brush)) and pen_opaque
+                   for brush in self._style_brushes]
+        return np.tile(brushes, len(self._style_sizes))
+
+    def dataBounds(self, ax, frac=1.0, orthoRange=None):
+        import numpy as np
+
+        if self._bulk is None:
+            return super().dataBounds(ax, frac, orthoRange)
+        d, d2 = self._bulk if ax == 0 else self._bulk[::-1]
+        if orthoRange is not None:
+            d = d[(d2 >= orthoRange[0]) & (d2 <= orthoRange[1])]
+        elif frac >= 1.0:
+            # pyqtgraph drops `self.bounds` whenever the view changes; the range of the data is kept
+            if self._bulk_bounds[ax] is None:
+                self._bulk_bounds[ax] = (np.fmin.reduce(d), np.fmax.reduce(d))  # NaNs ignored
+            return (None, None) if np.isnan(self._bulk_bounds[ax][0]) else self._bulk_bounds[ax]
+        d = d[np.isfinite(d)]
+        if d.size == 0:
+            return (None, None)
+        if frac >= 1.0:
+            return (d.min(), d.max())
+        return np.percentile(d, [50 * (1 - frac), 50 * (1 + frac)])
+
+    def paint(self, p, option, widget):
+        import numpy as np
+
+        if self._bulk is None or self._exportOpts is not False or self.opts['hoverable'] \
+                or not (self.opts['pxMode'] and self.opts['useCache']):
+            return super().paint(p, option, widget)
+
+        if self.opts.get('compositionMode') is not None:
+            p.setCompositionMode(self.opts['compositionMode'])
+        dpr = self.fragmentAtlas.devicePixelRatio()
+        if widget is not None and widget.devicePixelRatioF() != dpr:
+            dpr = widget.devicePixelRatioF()
+            self.fragmentAtlas.setDevicePixelRatio(dpr)
+            self.fragmentAtlas.clear()
+            self._bulk_rects = None
+        rects = self._bulk_style_rects()
+
+        # spot centers in device pixels relative to the view (padded by the largest spot),
+        # and the pixels containing them
+        x, y = self._bulk
+        t = p.transform()
+        view = t.mapRect(self.viewRect())
+        pad = self._maxSpotPxWidth / 2 + 1
+        left, top = np.floor(view.left() - pad), np.floor(view.top() - pad)
+        num_cols, num_rows = int(view.width() + 2 * pad) + 2, int(view.height() + 2 * pad) + 2
+        px = x * t.m11()
+        px += t.m31() - left
+        py = y * t.m22()
+        py += t.m32() - top
+        if t.m21() or t.m12():
+            px += y * t.m21()
+            py += x * t.m12()
+        with np.errstate(invalid='ignore'):
+            cols, rows = px.astype(np.intp), py.astype(np.intp)  # NaN and inf are out of range
+        indices = np.flatnonzero((cols >= 0) & (cols < num_cols) & (rows >= 0) & (rows < num_rows))
+
+        opaque = self._bulk_opaque_codes()
+        num_sizes = len(self._style_sizes)
+        if opaque.any() and num_sizes * num_rows * num_cols <= 1 << 26:
+            # the last opaque spot of each (device pixel, size) covers the earlier ones
+            codes = self._style_codes[indices]
+            covering = opaque[codes]
+            candidates = indices[covering]
+            keys = rows[candidates] * num_cols + cols[candidates]
+            if num_sizes > 1:
+                keys += codes[covering] // len(self._style_brushes) * (num_rows * num_cols)
+            owner = np.full(num_sizes * num_rows * num_cols, -1, dtype=np.intp)
+            np.maximum.at(owner, keys, candidates)
+            indices = np.concatenate([indices[~covering], owner[owner >= 0]])
+            indices.sort()  # drawing order
+
+        fragments = self._pixmapFragments
+        fragments.resize(len(indices))
+        frags = fragments.ndarray()
+        frags[:, 0] = px[indices] + left
+        frags[:, 1] = py[indices] + top
+        frags[:, 2:6] = rects[self._style_codes[indices]]
+        frags[:, 6:10] = [1 / dpr, 1 / dpr, 0.0, 1.0]
+        p.resetTransform()
+        p.drawPixmapFragments(*fragments.drawargs(), self.fragmentAtlas.pixmap)
+
+
+class FillBetweenPathItem(QGraphicsPathItem):
+    """
+    Filled area between two curves, drawn as a single QPainterPath.
+
+    The outline of every filled segment (forward along y2, back along y1) is assembled
+    with numpy and converted to one path with `pg.arrayToQPath`, so the cost does not
+    depend on the number of Python calls per point. All segments selected by `where`
+    are subpaths of the same path, i.e. one scene item per call of `fill_between`.
+    """
+
+    def __init__(self, x, y1, y2=0, where=None):
+        super().__init__()
+        self.update(x, y1, y2, where)
+
+    def update(self, x=None, y1=None, y2=0, where=None):
+        """
+        Replace the filled area in place. Without data (or with only a QRectF), schedule
+        a repaint as `QGraphicsItem.update` does.
+
+        Parameters:
+        - x: 1D array of x values
+        - y1, y2: 1D arrays or scalars (boundaries of the area)
+        - where: Optional boolean mask (fill only where True)
+        """
+        import numpy as np
+
+        if y1 is None:
+            if x is None:
+                return super().update()
+            return super().update(x)
+
+        x = np.asarray(x, dtype=float)
+        y1 = np.broadcast_to(np.asarray(y1, dtype=float), x.shape)
+        y2 = np.broadcast_to(np.asarray(y2, dtype=float), x.shape)
+
+        mask = np.isfinite(x) & np.isfinite(y1) & np.isfinite(y2)
+        if where is not None:
+            mask &= np.asarray(where, dtype=bool)
+
+        # Contiguous runs of the mask: [starts[k], ends[k])
+        padded = np.concatenate([[False], mask, [False]])
+        edges = np.flatnonzero(padded[1:] != padded[:-1])
+        starts, ends = edges[::2], edges[1::2]
+        lengths = ends - starts
+        if len(starts) == 0:
+            self.setPath(QPainterPath())
+            return
+
+        # Outline of segment k: its points along y2, then backwards along y1
+        forward = np.flatnonzero(mask)
+        segment = np.repeat(np.arange(len(starts)), lengths)
+        offsets = 2 * (np.cumsum(lengths) - lengths)
+        position = forward - starts[segment]
+        out_forward = offsets[segment] + position
+        out_backward = out_forward + lengths[segment]
+        backward = ends[segment] - 1 - position
+
+        num_out = 2 * len(forward)
+        xs, ys = np.empty(num_out), np.empty(num_out)
+        xs[out_forward], ys[out_forward] = x[forward], y2[forward]
+        xs[out_backward], ys[out_backward] = x[backward], y1[backward]
+
+        # Break the path after the last point of every outline
+        connect = np.ones(num_out, dtype=np.int32)
+        connect[offsets + 2 * lengths - 1] = 0
+
+        path = pg.arrayToQPath(xs, ys, connect=connect, finiteCheck=False)
+        path.setFillRule(Qt.WindingFill)
+        self.setPath(path)
+
+
+class SegmentsItem(pg.GraphicsObject):
+    """
+    Collection of disconnected straight line segments drawn by a single item.
+
+    Runs of consecutive segments with the same pen are copied into Qt line arrays with
+    numpy, and each array is drawn with a single `QPainter.drawLines` call, so drawing
+    does not involve one Python call or scene item per segment. With `max_pen_runs` or
+    more changes of pen (e.g. colors mapped from random values), the segments are grouped
+    by pen instead: the segments of a pen are then drawn over those of the pens before
+    it in the table, whatever their order.
+
+    Drawing many long lines is limited by the number of pixels written. Whenever the
+    view changes, segments whose end points fall on the same device pixels as a later
+    segment with an opaque pen of the same width and line style are therefore skipped,
+    since they would be painted over anyway; e.g. 100k full-height vlines are reduced to
+    at most one line per pixel column. Segments under translucent ones are always drawn.
+    Antialiasing is off by default: it is of little use for the axis-aligned lines of
+    vlines/hlines and makes drawing many segments an order of magnitude slower.
+    """
+
+    max_pen_runs = 256
+
+    def __init__(self, pen=None, antialias=False):
+        super().__init__()
+        self._antialias = antialias
+        self._pens = [pg.mkPen(pen)]
+        self._segments = None    # (x0, y0, x1, y1, pen index) of the finite segments
+        self._lines = None       # (device transform key, [(pen, QLineF array), ...])
+        self._bounds = None
+        self._data_rect = QRectF()
+
+    def setData(self, x0, y0, x1, y1, pens=None, pen_index=None):
+        """
+        Replace the segments (x0[i], y0[i]) -> (x1[i], y1[i]).
+
+        Parameters:
+        - x0, y0, x1, y1: 1D arrays (or scalars) of segment end points
+        - pens: sequence of QPen objects shared between segments (default: the item's pen)
+        - pen_index: integer array with the index into `pens` of each segment
+        """
+        import numpy as np
+
+        x0, y0, x1, y1 = np.broadcast_arrays(*(np.asarray(a, dtype=float).ravel() for a in (x0, y0, x1, y1)))
+        if pens is not None:
+            self._pens = [pg.mkPen(pen) for pen in pens]
+        if pen_index is None or len(self._pens) == 1:
+            pen_index = np.zeros(len(x0), dtype=np.intp)
+        else:
+            pen_index = np.broadcast_to(np.asarray(pen_index, dtype=np.intp), x0.shape)
+
+        finite = np.isfinite(x0) & np.isfinite(y0) & np.isfinite(x1) & np.isfinite(y1)
+        if not finite.all():
+            x0, y0, x1, y1, pen_index = (a[finite] for a in (x0, y0, x1, y1, pen_index))
+        self._segments = (x0, y0, x1, y1, pen_index)
+        self._lines = None
+
+        if len(x0):
+            self._bounds = ((min(x0.min(), x1.min()), max(x0.max(), x1.max())),
+                            (min(y0.min(), y1.min()), max(y0.max(), y1.max())))
+            (xmin, xmax), (ymin, ymax) = self._bounds
+            self._data_rect = QRectF(xmin, ymin, xmax - xmin, ymax - ymin)
+        else:
+            self._bounds = None
+            self._data_rect = QRectF()
+
+        self.prepareGeometryChange()
+        self.informViewBoundsChanged()
+        self.update()
+
+    def setPen(self, *args, **kwargs):
+        """Draw all segments with a single pen."""
+        self._pens = [pg.mkPen(*args, **kwargs)]
+        if self._segments is not None:
+            self._segments = self._segments[:4] + (self._segments[4] * 0,)
+        self._lines = None
+        self.update()
+
+    def pens(self):
+        return list(self._pens)
+
+    def __len__(self):
+        return 0 if self._segments is None else len(self._segments[0])
+
+    def dataBounds(self, ax, frac=1.0, orthoRange=None):
+        if self._bounds is None:
+            return (None, None)
+        return self._bounds[ax]
+
+    def pixelPadding(self):
+        return max((pen.widthF() for pen in self._pens if pen.isCosmetic()), default=0) / 2 + 1
+
+    def boundingRect(self):
+        if self._bounds is None:
+            return QRectF()
+        px, py = self.pixelVectors()
+        pad = self.pixelPadding()
+        px = 0 if px is None else px.length() * pad
+        py = 0 if py is None else py.length() * pad
+        return self._data_rect.adjusted(-px, -py, px, py)
+
+    def viewTransformChanged(self):
+        # The pixel padding of the bounding rect depends on the zoom level
+        self.prepareGeometryChange()
+        super().viewTransformChanged()
+
+    def _visible_lines(self, transform):
+        """Runs (or groups) of segments with the same pen, without those hidden under a later segment."""
+        import numpy as np
+        from pyqtgraph.Qt import internals
+
+        x0, y0, x1, y1, pen_index = self._segments
+        order = np.arange(len(x0))
+        opaque = np.array([pen.color().alpha() == 255 and pen.brush().style() == Qt.SolidPattern
+                           for pen in self._pens])
+        if len(x0) > 1000 and transform.m12() == 0 and transform.m21() == 0 and opaque.any():
+            # Device pixels of both end points, packed into one integer key (15 bits per
+            # coordinate). Pens of the same width and line style draw the same pixels along
+            # the same footprint, so if the last of such segments is opaque, it covers the others
+            sx, sy, dx, dy = transform.m11(), transform.m22(), transform.m31(), transform.m32()
+            key = np.zeros(len(x0), dtype=np.int64)
+            for a, scale, offset in ((x0, sx, dx), (y0, sy, dy), (x1, sx, dx), (y1, sy, dy)):
+                pixel = np.rint(a * scale + offset)
+                np.clip(pixel, -(1 << 14), (1 << 14) - 1, out=pixel)
+                key <<= 15
+                key |= (pixel + (1 << 14)).astype(np.int64)
+            shapes = {}
+            shape = np.array([shapes.setdefault((pen.widthF(), pen.style(), pen.capStyle(), pen.isCosmetic()),
+                                                len(shapes)) for pen in self._pens])[pen_index]
+            if len(shapes) == 1 and opaque.all():
+                _, last = np.unique(key[::-1], return_index=True)
+                order = np.sort(len(x0) - 1 - last)
+            else:
+                sort = np.lexsort((key, shape))  # stable: the last segment ends each group
+                key, shape = key[sort], shape[sort]
+                first = np.append(True, (key[1:] != key[:-1]) | (shape[1:] != shape[:-1]))
+                last = np.append(first[1:], True)
+                covered = opaque[pen_index[sort[last]]][np.cumsum(first) - 1]
+                order = np.sort(sort[last | ~covered])
+
+        # Consecutive segments with the same pen are drawn together, in their order; with
+        # too many changes of pen, all segments of a pen are drawn together instead
+        pens = pen_index[order]
+        bounds = np.flatnonzero(pens[1:] != pens[:-1]) + 1
+        if len(bounds) >= self.max_pen_runs:
+            order = order[np.argsort(pens, kind='stable')]
+            pens = pen_index[order]
+            bounds = np.flatnonzero(pens[1:] != pens[:-1]) + 1
+
+        groups = []
+        for sel in np.split(order, bounds):
+            if len(sel) == 0:
+                continue
+            lines = internals.PrimitiveArray(QLineF, 4)
+            lines.resize(len(sel))
+            memory = lines.ndarray()
+            memory[:, 0], memory[:, 1], memory[:, 2], memory[:, 3] = x0[sel], y0[sel], x1[sel], y1[sel]
+            groups.append((self._pens[pen_index[sel[0]]], lines))
+        return groups
+
+    def paint(self, painter, *args):
+        if self._segments is None:
+            return
+        transform = painter.deviceTransform()
+        key = (transform.m11(), transform.m12(), transform.m21(), transform.m22(),
+               transform.m31(), transform.m32())
+        if self._lines is None or self._lines[0] != key:
+            self._lines = (key, self._visible_lines(transform))
+
+        painter.setRenderHint(painter.RenderHint.Antialiasing, self._antialias)
+        for pen, lines in self._lines[1]:
+            painter.setPen(pen)
+            painter.drawLines(*lines.drawargs())
+
+
+class Axes:
+    """
+    Matplotlib-like plotting methods on top of a pyqtgraph PlotItem (`self.plot_item`).
+
+    Shared by `AxesWidget`, a widget per axes, and `AxesItem`, axes in a graphics scene
+    shared with other axes. Subclasses create `plot_item` and `hover_label`, then call
+    `_init_axes`.
+    """
+
+    def _init_axes(self):
+        self._batch_depth = 0  # nesting depth of `Figure.batch_update`
+        self._batch_legends = []
+        self.profiler = None  # AxesProfiler while profiling is enabled
+        self._streams = []  # StreamLines of `stream` and `feed`
+        self._updates_suspended = False
+        self._hover_mode = 'position'
+        self._hover_radius = 10
+        self._hover_marker = None  # marker of the point the readout snapped to
+        self._hover_pos = None  # scene position of the last mouse move
+        self._hover_throttle = None  # FrameThrottle of the readout, created on the first mouse move
+        self.plot_item.showGrid(True, True, 0.7)
         self.set_xlabel('X-axis')
         self.set_ylabel('Y-axis')
         self.set_title('')
 
-        self.hover_label = QLabel(self)
-        self.hover_label.setAlignment(Qt.AlignCenter)
-        self.hover_label.setGeometry(0, 0, 150, 15)
-        
-
         self.setMouseEnabled(x=True, y=True)
-        self.setAntialiasing(True)
 
-        self.plot_item = self.getPlotItem()
-        self.plot_item.scene().sigMouseMoved.connect(self._hoveredEvent)
-        
         # Get the ViewBox
         vb = self.plot_item.getViewBox()
 
@@ -50,21 +652,206 @@ class AxesWidget(pg.PlotWidget):
 
 
         self._apply_matplotlib_color_cycle()
+        # Number of lines (PlotDataItems) of the axes, which is the index of the default
+        # color of the next line: counted as items are added and removed, so that a removed
+        # line's color is reused, without walking all items for each new line
+        self._cycle_index = 0
+        self.plot_item.addItem = self._add_item
+        self.plot_item.removeItem = self._remove_item
+        if 'addItem' in self.__dict__:  # copied from the PlotItem by pg.PlotWidget
+            self.addItem, self.removeItem = self._add_item, self._remove_item
+
+        # pyqtgraph rebuilds the parameter list of the 'Average' menu from all curves
+        # whenever a curve is added, which makes adding N lines O(N^2); rebuild it only
+        # when the menu is shown or averaging is enabled
+        self.plot_item.updateParamList = self._update_param_list
+        self.plot_item.ctrlMenu.aboutToShow.connect(
+            lambda: pg.PlotItem.updateParamList(self.plot_item))
         
         self.figure = None
 
 
 
+    def _begin_batch_update(self):
+        """
+        Defer auto-ranging and legend relayout until `_end_batch_update`.
+        Calls nest; see `Figure.batch_update`.
+        """
+        self._batch_depth += 1
+        if self._batch_depth > 1:
+            return
+        vb = self.getViewBox()
+        vb.updateAutoRange = vb.queueUpdateAutoRange  # only mark the auto-range as outdated
+        if self.plot_item.legend is not None:
+            self._defer_legend(self.plot_item.legend)
+
+    def _end_batch_update(self):
+        self._batch_depth -= 1
+        if self._batch_depth > 0:
+            return
+        vb = self.getViewBox()
+        del vb.updateAutoRange
+        if vb._autoRangeNeedsUpdate:
+            vb.updateAutoRange()
+        for legend in self._batch_legends:
+            del legend.updateSize
+            legend.updateSize()
+        self._batch_legends = []
+
+    def _defer_legend(self, legend):
+        # LegendItem.updateSize walks all entries each time an entry is added
+        legend.updateSize = lambda: None
+        self._batch_legends.append(legend)
+
+    def suspend_updates(self):
+        """
+        Stop redrawing the live lines of the axes (`stream`, `feed`), e.g. while the axes
+        are hidden in a tab; their samples are still buffered.
+        """
+        self._updates_suspended = True
+        for stream in self._streams:
+            stream.suspend()
+
+    def resume_updates(self):
+        """Redraw the live lines again; the samples that arrived meanwhile are drawn in one step."""
+        self._updates_suspended = False
+        self._begin_batch_update()  # a single auto-range for all lines
+        try:
+            for stream in self._streams:
+                stream.resume()
+        finally:
+            self._end_batch_update()
+
+    def dispose(self):
+        """
+        Free the plot data of the axes before they are deleted: stop profiling, close the
+        feeds, cancel the background jobs of the items, leave the shared ranges and remove
+        all items.
+        """
+        from pyqtplotlib.pltwrapper.sharing import shared_group
+        from pyqtplotlib.pltwrapper.stream import DataFeed
+        from pyqtplotlib.pltwrapper.workers import LatestJob
+
+        self.disable_profiling()
+        for stream in self._streams:
+            stream.suspend()
+            for feed in stream.findChildren(DataFeed):
+                feed.close()
+        self._streams = []
+        vb = self.getViewBox()
+        for axis in ('x', 'y'):
+            group = shared_group(vb, axis)
+            if group is not None:
+                group.remove(vb)
+        for item in vb.addedItems:
+            if isinstance(item, QObject):
+                for jobs in item.findChildren(LatestJob):
+                    jobs.cancel()
+        self.plot_item.clear()
+
+    def enable_profiling(self, overlay=False, name=None, max_events=100000):
+        """
+        Start recording the rendering of the axes: frame and paint times, frames per
+        second, update latency and items drawn (see `AxesProfiler.stats`). Profiling adds
+        no overhead while it is disabled.
+
+        Parameters:
+        - overlay: show the statistics on the axes
+        - name: name of the axes in saved profiles (default: the title)
+        - max_events: number of recorded frames, paints and updates kept
+
+        Returns:
+        - the `AxesProfiler`, also available as `self.profiler`; save its data with
+          `profiler.save('profile.json')` or `profiler.save('trace.json', format='chrome')`
+        """
+        from pyqtplotlib.pltwrapper.profiling import AxesProfiler
+        if self.profiler is None:
+            self.profiler = AxesProfiler(self, name=name, overlay=overlay, max_events=max_events)
+        return self.profiler
+
+    def disable_profiling(self):
+        """Stop profiling and remove the instrumentation; return the profiler with the recorded data."""
+        profiler, self.profiler = self.profiler, None
+        if profiler is not None:
+            profiler.remove()
+        return profiler
+
+    def _add_item(self, item, *args, **kwargs):
+        num_items = len(self.plot_item.items)
+        pg.PlotItem.addItem(self.plot_item, item, *args, **kwargs)
+        if isinstance(item, pg.PlotDataItem) and len(self.plot_item.items) > num_items:
+            self._cycle_index += 1
+
+    def _remove_item(self, item):
+        num_items = len(self.plot_item.items)
+        pg.PlotItem.removeItem(self.plot_item, item)
+        if isinstance(item, pg.PlotDataItem) and len(self.plot_item.items) < num_items:
+            self._cycle_index -= 1
+
+    def _update_param_list(self):
+        if self.plot_item.ctrl.averageGroup.isChecked():
+            pg.PlotItem.updateParamList(self.plot_item)
+
+    def set_hover_mode(self, mode='snap', radius=10):
+        """
+        Choose what the hover label shows.
+
+        Parameters:
+        - mode: 'position' for the mouse position, or 'snap' for the data point of the
+                lines and scatter plots nearest to the mouse (marked on the axes) or, if
+                there is none within `radius`, the value of the image pixel under the mouse
+                (see `pyqtplotlib.pltwrapper.hover`)
+        - radius: maximal distance in pixels of the point to snap to
+        """
+        if mode not in ('position', 'snap'):
+            raise ValueError(f"Unknown hover mode: '{mode}' (expected 'position' or 'snap')")
+        self._hover_mode = mode
+        self._hover_radius = radius
+        if mode == 'position' and self._hover_marker is not None:
+            self._hover_marker.hide()
+
     def _hoveredEvent(self, pos):
-        """Update hover label with data coordinates."""
+        """Update the hover label for the mouse position, at most once per frame."""
         # to be implemented: hide if mouse is outside the plot
         # if not self.plot_item.sceneBoundingRect().contains(pos):
         #     self.hover_label.hide()
         # else:
             # self.hover_label.show()
-        data_pos = self.plot_item.getViewBox().mapSceneToView(pos)
-        self.hover_label.setText(
-            "({:.3g}, {:.3g})".format(data_pos.x(), data_pos.y()))
+        self._hover_pos = pos
+        if self._hover_throttle is None:
+            from pyqtplotlib.pltwrapper.timing import FrameThrottle
+            self._hover_throttle = FrameThrottle(self._update_hover, parent=self)
+        self._hover_throttle.request()
+
+    def _update_hover(self):
+        import numpy as np
+        from pyqtplotlib.pltwrapper import hover
+
+        data_pos = self.plot_item.getViewBox().mapSceneToView(self._hover_pos)
+        x, y = data_pos.x(), data_pos.y()
+        text = "({:.3g}, {:.3g})".format(x, y)
+        point = None
+        if self._hover_mode == 'snap':
+            point = hover.nearest_point(self, x, y, self._hover_radius)
+            if point is not None:
+                item, px, py = point
+                name = item.name() if hasattr(item, 'name') else None
+                text = "{}({:.6g}, {:.6g})".format(f"{name}: " if name else "", px, py)
+                if self._hover_marker is None:
+                    self._hover_marker = pg.ScatterPlotItem(size=10, pen=pg.mkPen('k', width=1.5), brush=None)
+                    self._hover_marker.setZValue(1e9)
+                    self.addItem(self._hover_marker, ignoreBounds=True)
+                self._hover_marker.setData([px], [py])
+                self._hover_marker.show()
+            else:
+                pixel = hover.pixel_value(self, x, y)
+                if pixel is not None:
+                    _, row, col, value = pixel
+                    text = "({:.3g}, {:.3g}) [{}, {}]: {}".format(
+                        x, y, row, col, np.array2string(np.asarray(value), precision=4))
+        if point is None and self._hover_marker is not None:
+            self._hover_marker.hide()
+        self.hover_label.setText(text)
 
     def get_xy_data(self, item_index=0):
         """Retrieve x and y data from the plot for a given index."""
@@ -75,8 +862,21 @@ class AxesWidget(pg.PlotWidget):
             print(f"No item at index {item_index}.")
             return [], []
 
-    def plot(self, *args, **kwargs):
-        """Plot data with arguments similar to Matplotlib."""
+    def plot(self, *args, decimate=None, background=False, **kwargs):
+        """
+        Plot data with arguments similar to Matplotlib.
+
+        Parameters:
+        - decimate: None, 'minmax' or 'lttb'. If set, only the visible x-window of the data
+                    is drawn, decimated to the pixel width of the view and updated whenever
+                    the view changes (see `DecimatedPlotDataItem`). Requires monotonic x.
+        - background: decimate (or read the `LineSource`) in a worker thread, so that the
+                      GUI stays responsive during pan and zoom; the detail of a new view
+                      appears when it is ready. Implies decimate='minmax' if not set.
+
+        Instead of x and y arrays, a `LineSource` (e.g. `MemmapLineSource('data.npy')`) can be
+        passed as the only positional argument to plot data that does not fit into memory.
+        """
         
         kwargs_pen = {}
         kwargs_pen.update(self._handle_color(kwargs))
@@ -87,16 +887,101 @@ class AxesWidget(pg.PlotWidget):
         else:
             kwargs_pen.update(linestyle_pen)
             kwargs_pen.update(self._handle_linewidth(kwargs))
-            pen = pg.mkPen(**kwargs_pen)
+            pen = style_cache.pen(**kwargs_pen)
         
         # ... other handle methods which do not comncern the pen ...
         kwargs = self._handle_marker(kwargs, kwargs_pen)
         kwargs = self._handle_legend_label(kwargs)
         
-        plot_item = self.plot_item.plot(*args, **kwargs, pen=pen)
+        from pyqtplotlib.pltwrapper.datasource import LineSource, DataSourcePlotDataItem
+        if args and isinstance(args[0], LineSource):
+            # Out-of-core data: only the visible window is read from the source
+            plot_item = DataSourcePlotDataItem(*args, decimate=decimate or 'minmax', background=background,
+                                               **kwargs, pen=pen)
+            self.plot_item.addItem(plot_item)
+        elif decimate is None and not background:
+            plot_item = self.plot_item.plot(*args, **kwargs, pen=pen)
+        else:
+            from pyqtplotlib.pltwrapper.decimation import DecimatedPlotDataItem
+            plot_item = DecimatedPlotDataItem(*args, decimate=decimate or 'minmax', background=background,
+                                              **kwargs, pen=pen)
+            self.plot_item.addItem(plot_item)
         return plot_item
+
+    def plot_many(self, x, Y, colors=None, cmap='viridis', vmin=None, vmax=None, highlight=None, **kwargs):
+        """
+        Plot the rows of a 2D array as traces over a shared x-axis, through a single item.
+
+        Parameters:
+        - x: 1D array of x values (one per column of Y), or None for 0, 1, 2, ...
+        - Y: 2D array of shape (traces, samples)
+        - colors: color of the traces; a single color, a sequence of color names (one per
+                trace), or a numeric array (one value per trace) mapped through `cmap`
+                (normalized to vmin, vmax)
+        - highlight: index of a trace drawn on top with a thicker pen (see `TracesItem.setHighlight`)
+        - kwargs: line properties (e.g. color, linestyle, linewidth, alpha, antialias)
+
+        Returns:
+        - TracesItem
+        """
+        from pyqtplotlib.pltwrapper.traces import TracesItem
+
+        antialias = kwargs.pop('antialias', False)
+        pens, pen_index = self._pens_for_colors(colors, cmap, vmin, vmax, kwargs)
+        item = TracesItem(x, Y, pens=pens, pen_index=pen_index, antialias=antialias)
+        if highlight is not None:
+            item.setHighlight(highlight)
+        self.addItem(item)
+        return item
+
+    def stream(self, maxlen=10000, max_fps=None, dtype=float, **kwargs):
+        """
+        Create a line for live data, backed by preallocated ring buffers.
+
+        Parameters:
+        - maxlen: number of most recent samples that are kept and displayed
+        - max_fps: maximal number of redraws per second (default: refresh rate of the screen)
+        - dtype: dtype of the x and y buffers
+        - **kwargs: style arguments passed to `plot` (color, linestyle, label, decimate, ...)
+
+        Returns:
+        - StreamLine with `append(x, y)` and `extend(xs, ys)` methods. The line is redrawn
+          at most once per frame, however often samples are added.
+        """
+        import numpy as np
+        from pyqtplotlib.pltwrapper.stream import StreamLine
+
+        line = self.plot(np.empty(0), np.empty(0), **kwargs)
+        stream = StreamLine(line, maxlen, dtype=dtype, max_fps=max_fps)
+        if self._updates_suspended:
+            stream.suspend()
+        self._streams.append(stream)
+        return stream
+
+    def feed(self, maxlen=10000, max_pending=None, policy='drop_oldest', max_fps=None, dtype=float, **kwargs):
+        """
+        Create a line for live data produced in other threads (see `DataFeed`).
+
+        Parameters:
+        - maxlen: number of most recent samples that are kept and displayed
+        - max_pending: maximal number of samples waiting for the GUI thread (default: maxlen)
+        - policy: what to do when `max_pending` is reached: 'drop_oldest' pending samples,
+                  'drop_newest' (reject the new chunk) or 'block' the producer
+        - max_fps: maximal number of redraws per second (default: refresh rate of the screen)
+        - dtype: dtype of the x and y buffers
+        - **kwargs: style arguments passed to `plot`
+
+        Returns:
+        - DataFeed with a thread-safe `put(xs, ys)` method and `stats()` counters; the
+          line is updated with all pending chunks at most once per frame. Its `stream`
+          attribute is the underlying `StreamLine`.
+        """
+        from pyqtplotlib.pltwrapper.stream import DataFeed
+
+        stream = self.stream(maxlen=maxlen, max_fps=max_fps, dtype=dtype, **kwargs)
+        return DataFeed(stream, max_pending=max_pending, policy=policy, max_fps=max_fps)
     
-    def scatter(self, x, y, c=None, s=10, cmap='viridis', vmin=None, vmax=None, **kwargs):
+    def scatter(self, x, y, c=None, s=10, cmap='viridis', vmin=None, vmax=None, background=False, **kwargs):
         """
         Create a scatter plot on the AxesWidget, similar to matplotlib.pyplot.scatter.
 
@@ -106,40 +991,36 @@ class AxesWidget(pg.PlotWidget):
         - s: size of points (single value or array of values)
         - cmap: colormap name or matplotlib colormap
         - vmin, vmax: normalization range for colormap when 'c' is numeric
+        - background: colormap and prepare the points in a worker thread; the scatter plot
+                      is added empty and filled in when the points are ready
         - **kwargs: passed to pyqtgraph.ScatterPlotItem
         """
 
-        from pyqtgraph import ScatterPlotItem
         import numpy as np
-        import matplotlib.cm as cm
-        import matplotlib.colors as mcolors
+        from functools import partial
 
         x = np.asarray(x)
         y = np.asarray(y)
 
-        if np.isscalar(s):
-            sizes = np.full_like(x, s, dtype=float)
-        else:
-            sizes = np.asarray(s)
-
-        # Handle color
-        brushes = None
+        # Handle color: a single default brush, or a small table of shared brushes
+        # with one index per point
+        brush, brush_table, brush_index = None, None, None
         if c is None:
             # Use default marker color
             kwargs_brush = self._handle_color({})
-            color = kwargs_brush.get('color', 'w')  # fallback to white
-            brushes = [color] * len(x)
-        elif isinstance(c, (str, tuple)) or (isinstance(c, np.ndarray) and c.ndim == 1 and np.issubdtype(c.dtype, np.str_)):
-            # Single or array of color names
-            brushes = c if np.iterable(c) else [c] * len(x)
+            brush = style_cache.brush(kwargs_brush.get('color', 'w'))  # fallback to white
+        elif isinstance(c, (str, tuple)):
+            # Single color for all points
+            brush = style_cache.brush(c)
+        elif isinstance(c, np.ndarray) and c.ndim == 1 and np.issubdtype(c.dtype, np.str_) \
+                or isinstance(c, list) and len(c) and isinstance(c[0], str):
+            # Array of color names: one shared brush per distinct name
+            names, brush_index = np.unique(np.asarray(c), return_inverse=True)
+            brush_table = [style_cache.brush(name) for name in names]
         else:
-            # Numeric array mapped to colormap
-            c = np.asarray(c)
-            norm = mcolors.Normalize(vmin=vmin if vmin is not None else np.min(c),
-                                    vmax=vmax if vmax is not None else np.max(c))
-            colormap = cm.get_cmap(cmap)
-            rgba_colors = colormap(norm(c))
-            brushes = [tuple((color[:3] * 255).astype(int)) for color in rgba_colors]
+            # Numeric array mapped to colormap, when the points are prepared
+            brush_table = _cmap_brush_table(cmap)
+            brush_index = partial(_cmap_indices, c, vmin, vmax)
 
         # Allow marker shape (symbol) and legend
         kwargs_pen = {}
@@ -147,10 +1028,11 @@ class AxesWidget(pg.PlotWidget):
         kwargs_pen.update(self._handle_linestyle(kwargs))
         kwargs_pen.update(self._handle_linewidth(kwargs))
 
-        spots = [{'pos': (x_, y_), 'size': s_, 'brush': b}
-                for x_, y_, s_, b in zip(x, y, sizes, brushes)]
-
-        scatter_item = ScatterPlotItem(spots=spots, **kwargs_pen)
+        scatter_item = ArrayScatterPlotItem(**kwargs_pen)
+        if brush is not None:
+            scatter_item.setBrush(brush)
+        scatter_item.setArrayData(x, y, size=s, brush_table=brush_table, brush_index=brush_index,
+                                  background=background)
         self.addItem(scatter_item)
         return scatter_item
 
@@ -166,7 +1048,7 @@ class AxesWidget(pg.PlotWidget):
         kwargs_pen.update(self._handle_color(kwargs))
         kwargs_pen.update(self._handle_linestyle(kwargs))
         kwargs_pen.update(self._handle_linewidth(kwargs))
-        pen = pg.mkPen(**kwargs_pen)
+        pen = style_cache.pen(**kwargs_pen)
 
         if ymin is not None and ymax is not None:
             # Finite vertical line segment
@@ -190,7 +1072,7 @@ class AxesWidget(pg.PlotWidget):
         kwargs_pen.update(self._handle_color(kwargs))
         kwargs_pen.update(self._handle_linestyle(kwargs))
         kwargs_pen.update(self._handle_linewidth(kwargs))
-        pen = pg.mkPen(**kwargs_pen)
+        pen = style_cache.pen(**kwargs_pen)
 
         if xmin is not None and xmax is not None:
             # Finite horizontal line segment
@@ -202,49 +1084,82 @@ class AxesWidget(pg.PlotWidget):
         self.addItem(line)
         return line
     
-    def vlines(self, x, ymin, ymax, **kwargs):
+    def vlines(self, x, ymin, ymax, colors=None, cmap='viridis', vmin=None, vmax=None, **kwargs):
         """
-        Draw vertical lines at each x from ymin to ymax.
+        Draw vertical lines at each x from ymin to ymax, as a single SegmentsItem.
+        With many lines whose colors alternate, the lines are drawn color by color rather
+        than in their order, which changes which color is on top where lines overlap (see
+        `SegmentsItem`).
 
         Parameters:
         - x: scalar or array-like of x positions
         - ymin, ymax: scalars or array-like of same shape as x
-        - kwargs: passed to axvline (e.g. color, linestyle, linewidth)
+        - colors: color of the lines; a single color, a sequence of color names (one per
+                line), or a numeric array mapped through `cmap` (normalized to vmin, vmax)
+        - kwargs: line properties (e.g. color, linestyle, linewidth)
         """
         import numpy as np
 
-        x = np.atleast_1d(x)
-        ymin = np.broadcast_to(ymin, x.shape)
-        ymax = np.broadcast_to(ymax, x.shape)
-
-        items = []
-        for xi, y0, y1 in zip(x, ymin, ymax):
-            item = self.axvline(x=xi, ymin=y0, ymax=y1, **kwargs)
-            items.append(item)
-        
-        return items
+        x = np.atleast_1d(np.asarray(x, dtype=float))
+        return self._add_segments(x, ymin, x, ymax, colors, cmap, vmin, vmax, kwargs)
         
-    def hlines(self, y, xmin, xmax, **kwargs):
+    def hlines(self, y, xmin, xmax, colors=None, cmap='viridis', vmin=None, vmax=None, **kwargs):
         """
-        Draw horizontal lines at each y from xmin to xmax.
+        Draw horizontal lines at each y from xmin to xmax, as a single SegmentsItem.
+        With many lines whose colors alternate, the lines are drawn color by color rather
+        than in their order, which changes which color is on top where lines overlap (see
+        `SegmentsItem`).
 
         Parameters:
         - y: scalar or array-like of y positions
         - xmin, xmax: scalars or array-like of same shape as y
-        - kwargs: passed to axhline (e.g. color, linestyle, linewidth)
+        - colors: color of the lines; a single color, a sequence of color names (one per
+                line), or a numeric array mapped through `cmap` (normalized to vmin, vmax)
+        - kwargs: line properties (e.g. color, linestyle, linewidth)
+        """
+        import numpy as np
+
+        y = np.atleast_1d(np.asarray(y, dtype=float))
+        return self._add_segments(xmin, y, xmax, y, colors, cmap, vmin, vmax, kwargs)
+
+    def _add_segments(self, x0, y0, x1, y1, colors, cmap, vmin, vmax, kwargs):
+        """Add one SegmentsItem with one pen per distinct color of `colors`."""
+        antialias = kwargs.pop('antialias', False)
+        pens, pen_index = self._pens_for_colors(colors, cmap, vmin, vmax, kwargs)
+        item = SegmentsItem(pens[0], antialias=antialias)
+        item.setData(x0, y0, x1, y1, pens=pens, pen_index=pen_index)
+        self.addItem(item)
+        return item
+
+    def _pens_for_colors(self, colors, cmap, vmin, vmax, kwargs):
+        """
+        Pens for one color per element: a table of shared pens and the index into it of
+        each element (None if all elements use the single pen of the table).
         """
         import numpy as np
 
-        y = np.atleast_1d(y)
-        xmin = np.broadcast_to(xmin, y.shape)
-        xmax = np.broadcast_to(xmax, y.shape)
+        if isinstance(colors, (str, tuple, QColor)):
+            kwargs['color'] = colors
+            colors = None
+
+        kwargs_pen = {}
+        kwargs_pen.update(self._handle_color(kwargs))
+        kwargs_pen.update(self._handle_linestyle(kwargs))
+        kwargs_pen.update(self._handle_linewidth(kwargs))
 
-        items = []
-        for yi, x0, x1 in zip(y, xmin, xmax):
-            item = self.axhline(y=yi, xmin=x0, xmax=x1, **kwargs)
-            items.append(item)
+        if colors is None:
+            return [style_cache.pen(**kwargs_pen)], None
 
-        return items
+        if isinstance(colors, np.ndarray) and colors.ndim == 1 and np.issubdtype(colors.dtype, np.str_) \
+                or isinstance(colors, list) and len(colors) and isinstance(colors[0], str):
+            # Array of color names: one shared pen per distinct name
+            names, pen_index = np.unique(np.asarray(colors), return_inverse=True)
+            table = [style_cache.color(name) for name in names]
+        else:
+            # Numeric array mapped to colormap
+            brushes, pen_index = _cmap_to_brushes(colors, cmap, vmin, vmax)
+            table = [brush.color() for brush in brushes]
+        return [style_cache.pen(**dict(kwargs_pen, color=color)) for color in table], pen_index
     
     def text(self, x, y, text, transform='data', **kwargs):
         """
@@ -329,15 +1244,11 @@ class AxesWidget(pg.PlotWidget):
                     color = self._mpl_color_cycle[index]
             kwargs_pen['color'] = color
         else:
-            num_items = len([item for item in self.getPlotItem().items if isinstance(item, pg.PlotDataItem)])
-            col = self._mpl_color_cycle[num_items % len(self._mpl_color_cycle)]
-            kwargs_pen['color'] = col
+            # Next color of the cycle: one per line of the axes (see `_init_axes`)
+            kwargs_pen['color'] = self._mpl_color_cycle[self._cycle_index % len(self._mpl_color_cycle)]
             
-        # translate color to pen color:
-        kwargs_pen['color'] = pg.mkColor(kwargs_pen['color'])
-            
-        if 'alpha' in kwargs:
-            kwargs_pen['color'].setAlphaF(kwargs.pop('alpha'))
+        # translate color to pen color (shared, see `StyleCache`):
+        kwargs_pen['color'] = style_cache.color(kwargs_pen['color'], kwargs.pop('alpha', None))
 
         return kwargs_pen
 
@@ -392,7 +1303,7 @@ class AxesWidget(pg.PlotWidget):
             # kwargs['symbolBrush'] = pg.mkBrush(color)
             
             mpl_to_pyqt_size_ratio = 8
-            kwargs['symbolPen'] = pg.mkPen(markeredgecolor, width=markersize / mpl_to_pyqt_size_ratio)
+            kwargs['symbolPen'] = style_cache.pen(markeredgecolor, width=markersize / mpl_to_pyqt_size_ratio)
         return kwargs
 
     def _handle_legend_label(self, kwargs):
@@ -425,6 +1336,8 @@ class AxesWidget(pg.PlotWidget):
         """
         legend_item = self.plotItem.addLegend(*args, **kwargs)
         legend_item.setParentItem(self.plotItem) # This makes the legend part of the plot
+        if self._batch_depth:
+            self._defer_legend(legend_item)
         return legend_item
         
     def legend(self, *args, **kwargs):
@@ -433,12 +1346,20 @@ class AxesWidget(pg.PlotWidget):
     
 
     def imshow(self, data, cmap=None, levels=None, aspect='auto', extent=None, autoRange=True, 
-               interpolation='bilinear', antialias=True, vmin=None, vmax=None, **kwargs):
+               interpolation='bilinear', antialias=True, vmin=None, vmax=None, pyramid=False,
+               background=False, **kwargs):
         """
         Display an image on the AxesWidget.
 
         Parameters:
-        - data: 2D numpy array
+        - data: 2D numpy array indexed as data[row, col] (rows along y), an RGB(A) array of
+                shape (rows, cols, 3 or 4), or an `ImageSource` (e.g. `MemmapImageSource('image.npy')`)
+                for images that do not fit into memory.
+                NumPy arrays (including memmaps) of integer or floating point dtype, e.g. uint16
+                camera frames, are displayed without a copy: the ImageItem keeps a reference to
+                the array, so in-place changes show up after `img_item.updateImage()`.
+                C-contiguous arrays are in addition rendered without transposition. Other inputs
+                (e.g. lists) are converted with `np.asarray`, which copies.
         - cmap: a pyqtgraph.ColorMap, a string specifying the colormap (e.g. 'viridis'), or a matplotlib colormap
         - levels: (min, max) tuple specifying the data range that corresponds to the 
                 minimum and maximum display brightness levels
@@ -449,27 +1370,53 @@ class AxesWidget(pg.PlotWidget):
         - antialias: bool, whether to enable antialiasing (note: limited support for images)
         - vmin: float, minimum data value that corresponds to the minimum colormap level
         - vmax: float, maximum data value that corresponds to the maximum colormap level
+        - pyramid: bool, whether to display the image as a multi-resolution pyramid of tiles
+                (built in a background thread), which only draws the visible tiles at the
+                resolution of the screen. Meant for very large images.
+        - background: bool, whether to read the visible part of a 2D image at screen resolution,
+                colormap it and estimate its levels in a worker thread, so that the GUI stays
+                responsive during pan and zoom of very large images or slow `ImageSource`s.
         - **kwargs: other keyword arguments to customize the ImageItem
         """
 
         from pyqtgraph import ImageItem, colormap as pg_colormap
-        import matplotlib as mpl
         import numpy as np
         
-        # need to transpose the data to match the image orientation in matplotlib
-        _data = np.array(data).T
-        
+        from pyqtplotlib.pltwrapper.datasource import ImageSource, MemmapImageSource, SourceImageItem
+
         rect = kwargs.pop('rect', None)
-        
-        if rect is None:
-            if extent is None:
-                extent = (0, _data.shape[1], 0, _data.shape[0])
-            # translate extent to pyqtgraph's rect (x0, y0, width, height):
-            rect = (extent[0], extent[2], extent[1]-extent[0], extent[3]-extent[2])
-            
-        
-        # Create an ImageItem with the data and additional options
-        img_item = ImageItem(_data, antialias=antialias, rect=rect, **kwargs)
+
+        if not isinstance(data, ImageSource) and (pyramid or background and np.ndim(data) == 2):
+            data = MemmapImageSource(np.asarray(data))
+
+        if isinstance(data, ImageSource):
+            # Out-of-core image: only the visible part is read, at screen resolution
+            if rect is None:
+                if extent is None:
+                    extent = (0, data.shape[1], 0, data.shape[0])
+                rect = (extent[0], extent[2], extent[1]-extent[0], extent[3]-extent[2])
+            if levels is None and vmin is not None and vmax is not None:
+                levels = (vmin, vmax)
+            if pyramid:
+                from pyqtplotlib.pltwrapper.pyramid import TiledImageItem
+                img_item = TiledImageItem(data, rect=rect, levels=levels, antialias=antialias, **kwargs)
+            else:
+                img_item = SourceImageItem(data, rect=rect, levels=levels, antialias=antialias,
+                                           background=background, **kwargs)
+        else:
+            # Row-major orientation (data[row, col], rows along y) is the memory layout
+            # of C-contiguous arrays and the one pyqtgraph renders from: no copy, no transpose
+            _data = np.asarray(data)
+
+            if rect is None:
+                if extent is None:
+                    extent = (0, _data.shape[1], 0, _data.shape[0])
+                # translate extent to pyqtgraph's rect (x0, y0, width, height):
+                rect = (extent[0], extent[2], extent[1]-extent[0], extent[3]-extent[2])
+
+            # Create an ImageItem with the data and additional options
+            kwargs.setdefault('axisOrder', 'row-major')
+            img_item = ImageItem(_data, antialias=antialias, rect=rect, **kwargs)
 
         # Set color map
         if cmap is not None:
@@ -509,9 +1456,9 @@ class AxesWidget(pg.PlotWidget):
 
 
     def _apply_matplotlib_color_cycle(self):
-        """Apply default Matplotlib color cycle to the plot."""
-        prop_cycle = plt.rcParams['axes.prop_cycle']
-        self._mpl_color_cycle = prop_cycle.by_key()['color']
+        """Apply the Matplotlib color cycle to the plot (without importing Matplotlib)."""
+        from pyqtplotlib.pltwrapper.colors import color_cycle
+        self._mpl_color_cycle = color_cycle()
 
     def set_xlabel(self, label):
         """Set x-axis label."""
@@ -553,11 +1500,32 @@ class AxesWidget(pg.PlotWidget):
         
     def get_xlim(self):
         """Get x-axis limits."""
+        self._flush_shared_range('x')
         return self.plotItem.viewRange()[0]
     
     def get_ylim(self):
         """Get y-axis limits."""
+        self._flush_shared_range('y')
         return self.plotItem.viewRange()[1]
+
+    def _flush_shared_range(self, axis):
+        # a range change of another axes of the group may not have been broadcast yet
+        group = self.getViewBox().__dict__.get('_shared_ranges', {}).get(axis)
+        if group is not None:
+            group.flush()
+
+    def sharex(self, other):
+        """
+        Share the x-range with the axes `other`, which may belong to another figure; the
+        axes take the range of `other`. Returns the `SharedRange` of the group.
+        """
+        from pyqtplotlib.pltwrapper.sharing import share
+        return share(self, other, 'x')
+
+    def sharey(self, other):
+        """Share the y-range with the axes `other` (see `sharex`)."""
+        from pyqtplotlib.pltwrapper.sharing import share
+        return share(self, other, 'y')
                
     def set_yscale(self, scale_type):
         """
@@ -599,13 +1567,6 @@ class AxesWidget(pg.PlotWidget):
     def get_figure(self):
         return self.figure
         
-    def keyPressEvent(self, event):
-        if event.key() == pg.Qt.QtCore.Qt.Key_Escape:
-            # Trigger auto scaling when "Esc" is pressed
-            self.autoBtnClicked()
-        super(AxesWidget, self).keyPressEvent(event)
-        
-        
     def set_xticks(self, ticks):
         """Set the x-axis ticks of the plot."""
         if ticks == []:
@@ -650,8 +1611,9 @@ class AxesWidget(pg.PlotWidget):
     
     def fill_between(self, x, y1, y2=0, where=None, color=None, alpha=1.0, label=None, **kwargs):
         """
-        Mimics matplotlib's fill_between using a QGraphicsPathItem.
-        Supports optional 'where' masking with recursive-style segmented fill.
+        Mimics matplotlib's fill_between using a single QGraphicsPathItem.
+        With 'where', all masked segments are subpaths of the same item.
+        Non-finite values are left out of the filled area.
 
         Parameters:
         - x: 1D array of x values
@@ -662,57 +1624,18 @@ class AxesWidget(pg.PlotWidget):
         - alpha: Transparency (0.0 to 1.0)
         - label: Optional legend label
         - kwargs: Reserved for future use
-        """
-        import numpy as np
-        from PyQt5.QtWidgets import QGraphicsPathItem
-        from PyQt5.QtGui import QPainterPath, QBrush, QPen, QColor
-        from PyQt5.QtCore import QPointF, Qt
 
-        x = np.asarray(x)
-        y1 = np.asarray(y1)
-        y2 = np.asarray(y2 if not np.isscalar(y2) else np.full_like(y1, y2))
+        Returns:
+        - FillBetweenPathItem, whose `update(x, y1, y2, where)` refreshes the area in place
+        """
+        from PyQt5.QtGui import QPen
 
-        # Handle segmented recursive-like fill when 'where' is provided
-        if where is not None:
-            where = np.asarray(where, dtype=bool)
-            # Pad edges to catch transitions
-            padded = np.concatenate([[False], where, [False]])
-            edges = np.flatnonzero(padded[1:] != padded[:-1])
-            segments = list(zip(edges[::2], edges[1::2]))
-
-            items = []
-            for start, end in segments:
-                # Slice the arrays for this segment
-                xs = x[start:end]
-                y1s = y1[start:end]
-                y2s = y2[start:end]
-                # Recursively call fill_between without 'where'
-                item = self.fill_between(xs, y1s, y2s, None, color, alpha, label, **kwargs)
-                items.append(item)
-            return items
-
-        # Base case: fill the area between y1 and y2 without masking
-        if len(x) < 2:
-            return  # Not enough points to draw a region
-
-        path = QPainterPath()
-        path.moveTo(QPointF(x[0], y2[0]))
-        for xi, yi in zip(x, y2):
-            path.lineTo(QPointF(xi, yi))
-        for xi, yi in zip(x[::-1], y1[::-1]):
-            path.lineTo(QPointF(xi, yi))
-        path.closeSubpath()
+        item = FillBetweenPathItem(x, y1, y2, where)
 
         # Set up color and transparency
         if color is None:
-            color = QColor(100, 100, 255)
-        else:
-            color = QColor(*color) if isinstance(color, (tuple, list)) else QColor(color)
-        color.setAlphaF(alpha)
-
-        brush = QBrush(color)
-        item = QGraphicsPathItem(path)
-        item.setBrush(brush)
+            color = (100, 100, 255)
+        item.setBrush(style_cache.brush(color, alpha))
         item.setPen(QPen(Qt.NoPen))
 
         self.addItem(item)
@@ -721,35 +1644,165 @@ class AxesWidget(pg.PlotWidget):
             self._legend.addItem(item, label)
 
         return item
+
+
+class AxesWidget(Axes, pg.PlotWidget):
     
-    
+    def __init__(self, parent=None,  **kwargs):
+        super().__init__(parent=parent, **kwargs)
+        
+        self.setParent(parent)
+        self.plot_item = self.getPlotItem()
+
+        self.hover_label = QLabel(self)
+        self.hover_label.setAlignment(Qt.AlignCenter)
+        self.hover_label.setGeometry(0, 0, 150, 15)
+
+        self.setAntialiasing(True)
+        self._init_axes()
+        self.plot_item.scene().sigMouseMoved.connect(self._hoveredEvent)
+
+    def keyPressEvent(self, event):
+        if event.key() == pg.Qt.QtCore.Qt.Key_Escape:
+            # Trigger auto scaling when "Esc" is pressed
+            self.autoBtnClicked()
+        super(AxesWidget, self).keyPressEvent(event)
+
+
+class LazyMenuViewBox(pg.ViewBox):
+    """ViewBox that creates its context menu when it is first opened instead of up front."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, enableMenu=False, **kwargs)
+        self.state['enableMenu'] = True
+
+    def getMenu(self, ev):
+        if self.menu is None:
+            from pyqtgraph.graphicsItems.ViewBox.ViewBoxMenu import ViewBoxMenu
+            self.menu = ViewBoxMenu(self)
+            self.updateViewLists()
+        return self.menu
+
+    def getContextMenus(self, event):
+        return self.getMenu(event).actions() if self.menuEnabled() else []
+
+
+class AxesItem(Axes, QObject):
+    """
+    Axes drawn as a PlotItem in a graphics scene shared with other axes.
+
+    It has the plotting methods of `AxesWidget`, but no widget, scene and viewport of
+    its own, which makes large grids of subplots much cheaper to build (see
+    `subplots(..., single_scene=True)`). As with `pg.PlotWidget`, the methods of the
+    PlotItem (e.g. `addItem`, `setXRange`) can be called on the axes directly.
+
+    Parameters:
+    - parent: QObject owning the axes, usually the figure
+    - **kwargs: passed to pg.PlotItem; by default, the context menu of the view is only
+                created when it is first opened (`LazyMenuViewBox`)
+    """
+
+    def __init__(self, parent=None, **kwargs):
+        super().__init__(parent)
+        kwargs.setdefault('viewBox', LazyMenuViewBox())
+        self.plot_item = self.plotItem = pg.PlotItem(**kwargs)
+        self.hover_label = pg.LabelItem('', parent=self.plot_item, size='8pt')
+        self._init_axes()
+
+    def __getattr__(self, attr):
+        # Forward the methods of the PlotItem, like pg.PlotWidget does
+        plot_item = self.__dict__.get('plot_item')
+        if plot_item is not None and hasattr(plot_item, attr):
+            m = getattr(plot_item, attr)
+            if hasattr(m, '__call__'):
+                return m
+        raise AttributeError(attr)
+
+    def getPlotItem(self):
+        return self.plot_item
+
+    def _hoveredEvent(self, pos):
+        # The scene is shared: only follow the mouse over this plot
+        if self.plot_item.sceneBoundingRect().contains(pos):
+            super()._hoveredEvent(pos)
+
+
 # Usage can be similar, and extending this further will enhance its capabilities.
 def mpl_to_pg_cmap(mpl_cmap):
     """ Convert a Matplotlib colormap to a PyQTGraph colormap.
     Args:
         mpl_cmap: A Matplotlib colormap, or a string with the name of a Matplotlib colormap.
+            Common colormaps (see `colors.builtin_colormaps`) are built in; Matplotlib is
+            only imported for the others. A PyQTGraph colormap is returned unchanged.
     Example:
-        pg_cmap = mpl_to_pg_cmap(plt.cm.get_cmap('seismic'))
+        pg_cmap = mpl_to_pg_cmap('seismic')
     """
     import numpy as np
     import pyqtgraph as pg
-    import matplotlib.pyplot as plt
-    
-    if isinstance(mpl_cmap, str):
-        # Get the Matplotlib colormap
-        mpl_cmap = plt.cm.get_cmap(mpl_cmap)
+    from pyqtplotlib.pltwrapper.colors import colormap_table
 
+    if isinstance(mpl_cmap, pg.ColorMap):
+        return mpl_cmap
 
     # Sample colors from the colormap
     num_colors = 256  # Number of colors to sample
     positions = np.linspace(0, 1, num_colors)  # Positions where we sample the colormap
-    colors = (mpl_cmap(positions)[:,:3] * 255).astype(np.uint8)  # Convert to 0-255 RGB values
+    colors = colormap_table(mpl_cmap, num_colors) if isinstance(mpl_cmap, str) else None
+    if colors is None:
+        if isinstance(mpl_cmap, str):
+            # Get the Matplotlib colormap
+            import matplotlib
+            mpl_cmap = matplotlib.colormaps[mpl_cmap]
+        colors = (mpl_cmap(positions)[:,:3] * 255).astype(np.uint8)  # Convert to 0-255 RGB values
 
     # Create a PyQTGraph ColorMap
     pg_cmap = pg.ColorMap(positions, colors, mapping=pg.ColorMap.CLIP)
     
     return pg_cmap
 
+def _cmap_to_brushes(c, cmap='viridis', vmin=None, vmax=None, num_colors=256):
+    """ Map numeric values to a table of shared QBrush objects through a colormap.
+
+    The values are normalized to [vmin, vmax] and quantized to the `num_colors` entries
+    of the colormap's lookup table, so that at most `num_colors` brushes are created
+    (plus a transparent one for non-finite values) regardless of the number of points.
+
+    Returns:
+        brush_table: list of QBrush
+        brush_index: integer array with the index into `brush_table` of each value
+    """
+    return _cmap_brush_table(cmap, num_colors), _cmap_indices(c, vmin, vmax, num_colors)
+
+
+def _cmap_brush_table(cmap='viridis', num_colors=256):
+    """ The `num_colors` brushes of a colormap, followed by a transparent one for 'bad' values. """
+    # Single LUT lookup for the whole call
+    lut = mpl_to_pg_cmap(cmap).getLookupTable(0.0, 1.0, num_colors, alpha=False)
+    table = [style_cache.brush(tuple(rgb)) for rgb in lut.tolist()]
+    table.append(style_cache.brush((0, 0, 0, 0)))  # 'bad' values are transparent
+    return table
+
+
+def _cmap_indices(c, vmin=None, vmax=None, num_colors=256):
+    """ Index of each value into the table of `_cmap_brush_table` (numpy only, thread-safe). """
+    import numpy as np
+
+    c = np.asarray(c, dtype=float)
+    finite = np.isfinite(c)
+    if vmin is None:
+        vmin = np.min(c, where=finite, initial=np.inf)
+    if vmax is None:
+        vmax = np.max(c, where=finite, initial=-np.inf)
+
+    scale = num_colors / (vmax - vmin) if vmax > vmin else 0.0
+    norm = np.where(finite, c, vmin)
+    norm -= vmin
+    norm *= scale
+    np.clip(norm, 0, num_colors - 1, out=norm)
+    idx = norm.astype(np.intp)
+    idx[~finite] = num_colors
+    return idx
+
 import pyqtgraph as pg
 from PyQt5.QtWidgets import QVBoxLayout, QSlider, QWidget
 from PyQt5.QtCore import Qt
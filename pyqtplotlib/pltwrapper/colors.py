@@ -0,0 +1,115 @@
+#%%
+"""
+Built-in copies of matplotlib's default color cycle and of common colormaps, so that
+drawing with them does not require importing matplotlib (about half a second).
+Other colormaps are still looked up in matplotlib, which is then imported on first use.
+"""
+import sys
+
+import numpy as np
+
+# matplotlib's default 'axes.prop_cycle' (the tab10 colors)
+DEFAULT_COLOR_CYCLE = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd',
+                       '#8c564b', '#e377c2', '#7f7f7f', '#bcbd22', '#17becf']
+
+# Colormaps defined by equally spaced 8-bit RGB colors, linearly interpolated
+_COLOR_LISTS = {
+    'bwr': [(0, 0, 255), (255, 255, 255), (255, 0, 0)],
+    'Greys': [(255, 255, 255), (240, 240, 240), (217, 217, 217), (189, 189, 189), (150, 150, 150),
+              (115, 115, 115), (82, 82, 82), (37, 37, 37), (0, 0, 0)],
+    'Blues': [(247, 251, 255), (222, 235, 247), (198, 219, 239), (158, 202, 225), (107, 174, 214),
+              (66, 146, 198), (33, 113, 181), (8, 81, 156), (8, 48, 107)],
+    'Reds': [(255, 245, 240), (254, 224, 210), (252, 187, 161), (252, 146, 114), (251, 106, 74),
+             (239, 59, 44), (203, 24, 29), (165, 15, 21), (103, 0, 13)],
+    'RdBu': [(103, 0, 31), (178, 24, 43), (214, 96, 77), (244, 165, 130), (253, 219, 199), (247, 247, 247),
+             (209, 229, 240), (146, 197, 222), (67, 147, 195), (33, 102, 172), (5, 48, 97)],
+}
+
+# Colormaps defined by (position, value) anchors of each of the red, green and blue
+# channels, as the 'segmentdata' of matplotlib
+_SEGMENTS = {
+    'gray': ([(0, 0), (1, 1)],) * 3,
+    'binary': ([(0, 1), (1, 0)],) * 3,
+    'seismic': ([(0, 0), (0.25, 0), (0.5, 1), (0.75, 1), (1, 0.5)],
+                [(0, 0), (0.25, 0), (0.5, 1), (0.75, 0), (1, 0)],
+                [(0, 0.3), (0.25, 1), (0.5, 1), (0.75, 0), (1, 0)]),
+    'hot': ([(0, 0.0416), (0.365079, 1), (1, 1)],
+            [(0, 0), (0.365079, 0), (0.746032, 1), (1, 1)],
+            [(0, 0), (0.746032, 0), (1, 1)]),
+    'jet': ([(0, 0), (0.35, 0), (0.66, 1), (0.89, 1), (1, 0.5)],
+            [(0, 0), (0.125, 0), (0.375, 1), (0.64, 1), (0.91, 0), (1, 0)],
+            [(0, 0.5), (0.11, 1), (0.34, 1), (0.65, 0), (1, 0)]),
+}
+
+# Colormaps shipped with pyqtgraph that are identical to matplotlib's
+_PYQTGRAPH_MAPS = ('viridis', 'plasma', 'inferno', 'magma', 'turbo')
+
+
+def color_cycle():
+    """
+    The colors that successive plots cycle through: matplotlib's 'axes.prop_cycle' if
+    matplotlib has already been imported (so that its styles apply), otherwise its default.
+    """
+    mpl = sys.modules.get('matplotlib')
+    if mpl is not None and hasattr(mpl, 'rcParams'):
+        return list(mpl.rcParams['axes.prop_cycle'].by_key()['color'])
+    return list(DEFAULT_COLOR_CYCLE)
+
+
+def builtin_colormaps():
+    """Names of the colormaps available without matplotlib (each also reversed with the suffix '_r')."""
+    return sorted(_PYQTGRAPH_MAPS + tuple(_COLOR_LISTS) + tuple(_SEGMENTS))
+
+
+def colormap_table(name, num_colors=256):
+    """
+    RGB colors (uint8 array of shape (num_colors, 3)) of a built-in colormap sampled at
+    `num_colors` equally spaced positions, as matplotlib would, or None if `name` is not built in.
+    """
+    if name.endswith('_r'):
+        table = colormap_table(name[:-2], num_colors)
+        return None if table is None else table[::-1].copy()
+
+    positions = np.linspace(0, 1, num_colors)
+    if name in _COLOR_LISTS:
+        colors = np.array(_COLOR_LISTS[name], dtype=float) / 255
+        stops = np.linspace(0, 1, len(colors))
+        channels = [np.interp(positions, stops, colors[:, i]) for i in range(3)]
+    elif name in _SEGMENTS:
+        channels = [np.interp(positions, *zip(*anchors)) for anchors in _SEGMENTS[name]]
+    elif name in _PYQTGRAPH_MAPS:
+        import pyqtgraph as pg
+        cmap = pg.colormap.get(name)
+        channels = [np.interp(positions, cmap.pos, cmap.color[:, i]) for i in range(3)]
+    else:
+        return None
+    return (np.stack(channels, axis=1) * 255).astype(np.uint8)
+
+
+def map_to_rgba(data, levels, lut=None):
+    """
+    Colormap `data` to an RGBA uint8 image (shape data.shape + (4,)), as an ImageItem with
+    these `levels` and lookup table would draw it, without the ImageItem. Values are scaled
+    from `levels` (min, max) to the rows of `lut` (8-bit RGB or RGBA colors, default: a
+    gray ramp); NaN values are transparent.
+    """
+    if lut is None:
+        lut = np.repeat(np.arange(256, dtype=np.uint8)[:, None], 3, axis=1)
+    lut = np.asarray(lut, dtype=np.uint8)
+    lo, hi = levels
+    num_colors = len(lut)
+    scale = num_colors / (hi - lo) if hi > lo else 0.0
+
+    values = np.asarray(data, dtype=np.float32)
+    nan = np.isnan(values)
+    index = np.nan_to_num(values - np.float32(lo), nan=0.0)
+    index *= scale
+    np.clip(index, 0, num_colors - 1, out=index)
+    index = index.astype(np.intp)
+
+    rgba = np.empty(values.shape + (4,), dtype=np.uint8)
+    rgba[..., :lut.shape[1]] = lut[index]
+    if lut.shape[1] == 3:
+        rgba[..., 3] = 255
+    rgba[..., 3][nan] = 0
+    return rgba
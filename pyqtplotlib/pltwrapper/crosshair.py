@@ -0,0 +1,135 @@
+#%%
+"""
+Crosshair linked across the axes of a figure (`Figure.enable_crosshair`).
+"""
+import numpy as np
+import pyqtgraph as pg
+from pyqtgraph.Qt import QtCore
+
+
+class Crosshair(QtCore.QObject):
+    """
+    Vertical line that follows the mouse through all axes of a figure, with the value of
+    each line of each axes at the x of the mouse, interpolated linearly between samples.
+
+    The values are looked up by binary search in the x of each line (see
+    `pyqtplotlib.pltwrapper.hover`); the lookups are prepared for the lines present when the
+    crosshair is enabled, and for new lines when they are first crossed, and redone only
+    when the data of a line change. Mouse moves are coalesced to at most one update per
+    frame. Lines whose x is not sorted, scatter plots and images have no readout.
+
+    Parameters:
+    - figure: the `Figure`
+    - readout: show the values next to the line and mark them on the lines
+    - max_fps: maximal number of updates per second (default: refresh rate of the screen)
+    """
+
+    def __init__(self, figure, readout=True, max_fps=None):
+        from pyqtplotlib.pltwrapper import hover
+        from pyqtplotlib.pltwrapper.timing import FrameThrottle
+
+        super().__init__(figure)
+        self.figure = figure
+        self.readout = readout
+        self.x = None  # x of the crosshair, None while the mouse is outside the axes
+        self.values = {}  # axes: list of (line, value) at x
+        self._pos = None  # (scene, position) of the last mouse move
+        self._throttle = FrameThrottle(self.update, max_fps=max_fps, parent=self)
+
+        self._axes = figure._axes()
+        self._lines = {}  # axes: InfiniteLine
+        self._labels = {}  # axes: TextItem with the values
+        self._markers = {}  # axes: ScatterPlotItem marking the values
+        for ax in self._axes:
+            line = pg.InfiniteLine(angle=90, movable=False, pen=pg.mkPen((100, 100, 100), width=1))
+            ax.addItem(line, ignoreBounds=True)
+            line.hide()
+            self._lines[ax] = line
+            if readout:
+                label = pg.TextItem(anchor=(0, 0), color=(30, 30, 30), fill=pg.mkBrush(255, 255, 255, 200))
+                marker = pg.ScatterPlotItem(size=7, pen=pg.mkPen('k'), brush=pg.mkBrush(255, 255, 255))
+                for item in (label, marker):
+                    item.setZValue(1e9)
+                    ax.addItem(item, ignoreBounds=True)
+                    item.hide()
+                self._labels[ax], self._markers[ax] = label, marker
+            for item in self._data_items(ax):
+                hover._point_index(item)  # prepare the lookups now rather than on the first move
+
+        self._slots = {}  # scene: slot connected to its mouse moves (one per AxesWidget, one for single-scene subplots)
+        for ax in self._axes:
+            scene = ax.plot_item.scene()
+            if scene is not None and scene not in self._slots:
+                self._slots[scene] = lambda pos, scene=scene: self._mouse_moved(scene, pos)
+                scene.sigMouseMoved.connect(self._slots[scene])
+
+    def _data_items(self, ax):
+        return [item for item in ax.getViewBox().addedItems
+                if isinstance(item, pg.PlotDataItem) and item.isVisible()]
+
+    def _mouse_moved(self, scene, pos):
+        self._pos = (scene, pos)
+        self._throttle.request()
+
+    def update(self):
+        """Move the crosshair to the last mouse position and update the readouts."""
+        self._throttle.mark()
+        x = None
+        if self._pos is not None:
+            scene, pos = self._pos
+            for ax in self._axes:
+                vb = ax.getViewBox()
+                if vb.scene() is scene and vb.sceneBoundingRect().contains(pos):
+                    x = vb.mapSceneToView(pos).x()
+                    break
+        self.set_x(x)
+
+    def set_x(self, x):
+        """Show the crosshair at `x` in all axes (hide it if x is None)."""
+        from pyqtplotlib.pltwrapper import hover
+
+        self.x = x
+        self.values = {}
+        for ax in self._axes:
+            line = self._lines[ax]
+            if x is None:
+                line.hide()
+                if self.readout:
+                    self._labels[ax].hide()
+                    self._markers[ax].hide()
+                continue
+            line.setPos(x)
+            line.show()
+            values = [(item, hover.value_at(item, x)) for item in self._data_items(ax)]
+            values = [(item, value) for item, value in values if value is not None]
+            self.values[ax] = values
+            if not self.readout:
+                continue
+            label, marker = self._labels[ax], self._markers[ax]
+            if not values:
+                label.hide()
+                marker.hide()
+                continue
+            label.setText("\n".join(
+                "{}: {:.6g}".format(item.name() or f"line {i}", value) for i, (item, value) in enumerate(values)))
+            (x0, x1), (_, y1) = ax.getViewBox().viewRange()
+            label.setAnchor((1, 0) if x > x1 - 0.25 * (x1 - x0) else (0, 0))  # left of the line near the right edge
+            label.setPos(x, y1)
+            label.show()
+            marker.setData(np.full(len(values), x), [value for _, value in values])
+            marker.show()
+
+    def remove(self):
+        """Remove the crosshair from the figure."""
+        self._throttle.cancel()
+        for scene, slot in self._slots.items():
+            try:
+                scene.sigMouseMoved.disconnect(slot)
+            except (TypeError, RuntimeError):
+                pass  # the scene has been deleted
+        self._slots = {}
+        for ax in self._axes:
+            for items in (self._lines, self._labels, self._markers):
+                if ax in items:
+                    ax.removeItem(items[ax])
+        self._axes = []
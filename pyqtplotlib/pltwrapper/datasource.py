@@ -0,0 +1,708 @@
+#%%
+"""
+Out-of-core data sources for `AxesWidget.plot` and `AxesWidget.imshow`.
+
+A data source gives access to a data set without loading it into memory. The axes
+only request the part of the data that is visible, at the resolution of the screen,
+so opening a file is instantaneous. Views of more samples than a source reads at once
+are drawn from a min/max summary of the data (`MinMaxSummary`, 16 bytes per 1024
+samples), built by one pass over the data in a worker thread the first time such a
+view is shown; a strided preview of the data (`LineSource.preview`) is shown meanwhile.
+
+To plug in other storage backends (HDF5, zarr, network streams, ...), subclass
+`LineSource` or `ImageSource` and implement the methods marked as required.
+"""
+import mmap
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pyqtgraph as pg
+from pyqtgraph.Qt import QtCore, QtGui
+
+from pyqtplotlib.pltwrapper.decimation import DecimatedPlotDataItem, decimate_view
+
+
+def open_memmap(data, dtype=None, offset=0, shape=None):
+    """
+    Return a read-only memory map of `data`.
+
+    `data` may be an array (returned unchanged), the path to a .npy file, or the path
+    to a raw binary file, in which case `dtype` (and `shape` for images) must be given.
+    """
+    if not isinstance(data, (str, os.PathLike)):
+        return data
+    if str(data).endswith('.npy'):
+        return np.load(data, mmap_mode='r')
+    if dtype is None:
+        raise ValueError("dtype must be specified to open a raw binary file.")
+    return np.memmap(data, dtype=dtype, mode='r', offset=offset, shape=shape)
+
+
+def release_pages(array):
+    """Drop the pages of a memory-mapped array from the resident memory of the process."""
+    mm = getattr(array, '_mmap', None)
+    if mm is not None and hasattr(mmap, 'MADV_DONTNEED'):
+        try:
+            mm.madvise(mmap.MADV_DONTNEED)
+        except (OSError, ValueError):
+            pass
+
+
+class ChunkCache:
+    """
+    Least-recently-used cache of at most `max_chunks` arrays.
+
+    The cache is shared by the GUI thread (hover) and the worker threads reading windows,
+    so it is protected by a lock. `load()` is called outside of it: two threads missing
+    the same chunk may both load it, but a slow read never blocks the other readers.
+    """
+
+    def __init__(self, max_chunks=32):
+        self.max_chunks = max_chunks
+        self._chunks = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._chunks)
+
+    def get(self, key, load):
+        """Return the chunk stored under `key`, calling `load()` to create it if missing."""
+        with self._lock:
+            if key in self._chunks:
+                self._chunks.move_to_end(key)
+                return self._chunks[key]
+        chunk = load()
+        with self._lock:
+            self._chunks[key] = chunk
+            while len(self._chunks) > self.max_chunks:
+                self._chunks.popitem(last=False)
+        return chunk
+
+    def clear(self):
+        with self._lock:
+            self._chunks.clear()
+
+    @property
+    def nbytes(self):
+        with self._lock:
+            chunks = list(self._chunks.values())
+        return sum(sum(a.nbytes for a in chunk if a is not None) if isinstance(chunk, tuple)
+                   else chunk.nbytes for chunk in chunks)
+
+
+class MinMaxSummary:
+    """
+    Pyramid of the minimum and maximum of a `LineSource` over blocks of samples.
+
+    Level 0 holds the extrema (and the x of the first sample) of every `block` consecutive
+    samples, and each further level those of `factor` blocks of the level below. It is
+    built by a single pass over the data, in chunks of about `chunk_size` samples read
+    with `LineSource.scan`; if `checkpoint` raises between chunks, the next `update`
+    resumes where it stopped. Level 0 takes 16 bytes per block (160 MB for 10G samples
+    with the default blocks of 1024 samples), the other levels a seventh of that.
+
+    Parameters:
+    - source: the `LineSource`
+    - block: number of samples per block of level 0
+    - factor: number of blocks of a level per block of the next level
+    - chunk_size: number of samples read at once while building
+    """
+
+    def __init__(self, source, block=1 << 10, factor=8, chunk_size=1 << 22):
+        self.source = source
+        self.block = block
+        self.factor = factor
+        self.chunk_size = max(chunk_size // block, 1) * block
+        self.num_points = len(source)
+        self.num_blocks = -(-self.num_points // block)
+        self.levels = []  # (x, low, high) of the blocks of each level, once complete
+        self._done = 0    # number of samples summarized so far
+        self._level0 = None
+        self._lock = threading.Lock()
+
+    def update(self, checkpoint=None):
+        """Read the part of the data that is not summarized yet, and build the levels."""
+        with self._lock:
+            while self._done < self.num_points:
+                if checkpoint is not None:
+                    checkpoint()
+                i0 = self._done
+                x, y = self.source.scan(i0, min(i0 + self.chunk_size, self.num_points))
+                if self._level0 is None:
+                    dtype = np.result_type(y.dtype, np.float32)
+                    self._level0 = (np.empty(self.num_blocks), np.empty(self.num_blocks, dtype),
+                                    np.empty(self.num_blocks, dtype))
+                offsets = np.arange(0, len(y), self.block)
+                b0 = i0 // self.block
+                b1 = b0 + len(offsets)
+                self._level0[0][b0:b1] = x[offsets]
+                self._level0[1][b0:b1] = np.fmin.reduceat(y, offsets)
+                self._level0[2][b0:b1] = np.fmax.reduceat(y, offsets)
+                self._done = i0 + len(y)
+            if not self.levels and self._level0 is not None:
+                levels = [self._level0]
+                while len(levels[-1][0]) > self.factor:
+                    x, low, high = levels[-1]
+                    offsets = np.arange(0, len(x), self.factor)
+                    levels.append((x[offsets], np.fmin.reduceat(low, offsets), np.fmax.reduceat(high, offsets)))
+                self.levels = levels
+
+    def points(self, i0, i1, max_points):
+        """
+        The extrema of the samples i0 to i1 (excluded) as points: for each block of the finest
+        level with at most `max_points / 2` blocks in the range, (x, maximum) and (x, minimum)
+        at the x of its first sample. The blocks at the ends may extend beyond the range.
+        """
+        self.update()
+        if not self.levels or i1 <= i0:
+            return np.empty(0), np.empty(0)
+        level, size = 0, self.block
+        while level + 1 < len(self.levels) and -(-i1 // size) - i0 // size > max(max_points // 2, 1):
+            level, size = level + 1, size * self.factor
+        x, low, high = self.levels[level]
+        b0, b1 = i0 // size, -(-i1 // size)
+        y = np.empty(2 * (b1 - b0), dtype=high.dtype)
+        y[0::2] = high[b0:b1]
+        y[1::2] = low[b0:b1]
+        return np.repeat(x[b0:b1], 2), y
+
+
+class LineSource:
+    """
+    Protocol for line data that is read lazily, with x sorted in increasing order.
+
+    Required methods: `__len__`, `x_bounds`, `index_range` and `read`.
+    `read_runs`, `scan`, `preview` and `window` have generic implementations based on those.
+    """
+
+    # Windows with more samples than this are not read completely (see `window`)
+    max_read = 1 << 22
+    # Samples per block of level 0 of the `MinMaxSummary` and blocks per block of the next level
+    summary_block = 1 << 10
+    summary_factor = 8
+    # Runs of consecutive samples read for the `preview`, and samples per run
+    preview_runs = 1 << 12
+    preview_run_length = 1 << 6
+
+    def __len__(self):
+        raise NotImplementedError
+
+    def x_bounds(self):
+        """Return (xmin, xmax) of the whole data set."""
+        raise NotImplementedError
+
+    def index_range(self, x0, x1):
+        """Return the index range [i0, i1) of the samples with x in [x0, x1]."""
+        raise NotImplementedError
+
+    def read(self, i0, i1):
+        """Return the arrays (x, y) of the samples i0 to i1 (excluded)."""
+        raise NotImplementedError
+
+    def read_runs(self, starts, length):
+        """Return 2D arrays (x, y) with the `length` samples following each index in `starts`."""
+        runs = [self.read(start, start + length) for start in starts]
+        return np.stack([r[0] for r in runs]), np.stack([r[1] for r in runs])
+
+    def scan(self, i0, i1):
+        """Like `read`, for a single sequential pass over the data (see `MinMaxSummary`)."""
+        return self.read(i0, i1)
+
+    def summary(self, checkpoint=None):
+        """
+        The `MinMaxSummary` of the data, built on first use by one pass over the data
+        (`checkpoint` as in `MinMaxSummary.update`).
+        """
+        # the hover (GUI thread) and the window jobs (worker threads) may both ask for it first
+        with self.__dict__.setdefault('_summary_lock', threading.Lock()):
+            summary = self.__dict__.get('_summary')
+            if summary is None or summary.num_points != len(self):
+                summary = self._summary = MinMaxSummary(self, self.summary_block, self.summary_factor,
+                                                        self.max_read)
+        summary.update(checkpoint)
+        return summary
+
+    def summary_ready(self):
+        """Whether the `summary` is built, so that using it reads no more data."""
+        summary = self.__dict__.get('_summary')
+        return summary is not None and summary.num_points == len(self) and bool(summary.levels)
+
+    def _window_range(self, x0, x1, num_pixels):
+        """The index range [i0, i1) read for a window, and whether it is drawn from the summary."""
+        i0, i1 = self.index_range(x0, x1)
+        i0, i1 = max(i0 - 1, 0), min(i1 + 1, len(self))
+        return i0, i1, i1 - i0 > max(self.max_read, 4 * self.summary_block * num_pixels)
+
+    def summary_needed(self, x0, x1, num_pixels):
+        """Whether `window` would first have to build the summary, by one pass over the data."""
+        return self._window_range(x0, x1, max(int(num_pixels), 1))[2] and not self.summary_ready()
+
+    def sample_runs(self, i0, i1):
+        """
+        Return 1D arrays (x, y) with a strided sample of the samples i0 to i1 (excluded):
+        at most `preview_runs` evenly spaced runs of `preview_run_length` consecutive samples.
+        """
+        length = self.preview_run_length
+        num_runs = min(self.preview_runs, (i1 - i0) // length)
+        if num_runs <= 1:
+            return self.read(i0, i1)
+        starts = np.linspace(i0, i1 - length, num_runs).astype(np.int64)
+        x, y = self.read_runs(starts, length)
+        return x.ravel(), y.ravel()
+
+    def preview(self, x0, x1, num_pixels, mode='minmax'):
+        """
+        Like `window`, from the strided sample of the window (`sample_runs`) rather than
+        from the summary: it is read at once, but misses the peaks between the runs.
+        """
+        if len(self) == 0:
+            return np.empty(0), np.empty(0)
+        num_pixels = max(int(num_pixels), 1)
+        i0, i1, _ = self._window_range(x0, x1, num_pixels)
+        x, y = self.sample_runs(i0, i1)
+        return decimate_view(x, y, x0, x1, num_pixels, mode)
+
+    def window(self, x0, x1, num_pixels, mode='minmax', checkpoint=None):
+        """
+        Return the data in the x-range [x0, x1], decimated to `num_pixels` columns.
+
+        If the window holds at most `max_read` samples (or few samples per pixel column),
+        all of them are read and decimated with `decimate_view`. Beyond that (far zoomed
+        out), the extrema of blocks of a quarter of a column or less are decimated instead,
+        from the `summary` of the data, so that every peak is kept while the amount of data
+        read per view stays bounded. The summary is built by the first such window, which
+        takes one pass over the data (`DataSourcePlotDataItem` builds it in a worker thread
+        and shows the `preview` meanwhile); `checkpoint` is called between the chunks read
+        for it.
+        """
+        if len(self) == 0:
+            return np.empty(0), np.empty(0)
+        num_pixels = max(int(num_pixels), 1)
+        i0, i1, use_summary = self._window_range(x0, x1, num_pixels)
+
+        if not use_summary:
+            x, y = self.read(i0, i1)
+            return decimate_view(x, y, x0, x1, num_pixels, mode)
+
+        x, y = self.summary(checkpoint).points(i0, i1, 8 * self.summary_factor * num_pixels)
+        return decimate_view(x, y, x0, x1, num_pixels, mode)
+
+
+class MemmapLineSource(LineSource):
+    """
+    Line data stored in a memory-mapped array or file.
+
+    Parameters:
+    - y: 1D array, np.memmap, or path to a .npy or raw binary file
+    - x: None for uniformly sampled data (x = x0 + i*dx), or a sorted 1D array/memmap/path
+    - x0, dx: position of the first sample and sample spacing, if `x` is None
+    - dtype, offset: dtype and header size in bytes for raw binary files
+    - chunk_size: number of samples per cached chunk
+    - max_chunks: maximal number of chunks kept in memory
+    """
+
+    def __init__(self, y, x=None, x0=0.0, dx=1.0, dtype=None, offset=0,
+                 chunk_size=1 << 18, max_chunks=32):
+        self.y = open_memmap(y, dtype=dtype, offset=offset)
+        self.x = None if x is None else open_memmap(x, dtype=dtype, offset=offset)
+        if self.x is not None and len(self.x) != len(self.y):
+            raise ValueError("x and y must have the same length.")
+        self.x0 = x0
+        self.dx = dx
+        self.chunk_size = int(chunk_size)
+        self.cache = ChunkCache(max_chunks)
+
+    def __len__(self):
+        return len(self.y)
+
+    def x_bounds(self):
+        if len(self) == 0:
+            return (None, None)
+        if self.x is None:
+            return (self.x0, self.x0 + (len(self) - 1) * self.dx)
+        return (float(self.x[0]), float(self.x[-1]))
+
+    def index_range(self, x0, x1):
+        if self.x is None:
+            i0 = int(np.ceil((x0 - self.x0) / self.dx))
+            i1 = int(np.floor((x1 - self.x0) / self.dx)) + 1
+        else:
+            # binary search only touches a few pages of the memory map
+            i0 = int(np.searchsorted(self.x, x0, side='left'))
+            i1 = int(np.searchsorted(self.x, x1, side='right'))
+        num_points = len(self)
+        return min(max(i0, 0), num_points), min(max(i1, 0), num_points)
+
+    def _positions(self, indices):
+        return self.x0 + np.asarray(indices, dtype=float) * self.dx
+
+    def _load_chunk(self, k):
+        start = k * self.chunk_size
+        stop = start + self.chunk_size
+        y = np.array(self.y[start:stop])
+        x = None if self.x is None else np.array(self.x[start:stop])
+        release_pages(self.y)
+        release_pages(self.x)
+        return x, y
+
+    def read(self, i0, i1):
+        i0, i1 = max(i0, 0), min(i1, len(self))
+        if i1 <= i0:
+            return np.empty(0), np.empty(0, dtype=self.y.dtype)
+        xs, ys = [], []
+        for k in range(i0 // self.chunk_size, (i1 - 1) // self.chunk_size + 1):
+            x, y = self.cache.get(k, lambda k=k: self._load_chunk(k))
+            start = k * self.chunk_size
+            sl = slice(max(i0 - start, 0), min(i1 - start, self.chunk_size))
+            ys.append(y[sl])
+            if x is not None:
+                xs.append(x[sl])
+        y = ys[0] if len(ys) == 1 else np.concatenate(ys)
+        if self.x is None:
+            x = self._positions(np.arange(i0, i1))
+        else:
+            x = xs[0] if len(xs) == 1 else np.concatenate(xs)
+        return x, y
+
+    def scan(self, i0, i1):
+        # Read directly from the memory map, bypassing (and preserving) the chunk cache
+        y = np.array(self.y[i0:i1])
+        x = self._positions(np.arange(i0, i1)) if self.x is None else np.array(self.x[i0:i1])
+        release_pages(self.y)
+        release_pages(self.x)
+        return x, y
+
+    def read_runs(self, starts, length):
+        # Read the runs directly from the memory map, bypassing the chunk cache
+        indices = np.asarray(starts)[:, None] + np.arange(length)
+        y = self.y[indices]
+        x = self._positions(indices) if self.x is None else self.x[indices]
+        release_pages(self.y)
+        release_pages(self.x)
+        return np.asarray(x), np.asarray(y)
+
+
+def _window_job(source, key, mode, checkpoint):
+    """Background job of `DataSourcePlotDataItem`: read and decimate the window `key`."""
+    from pyqtgraph.graphicsItems.PlotDataItem import PlotDataset
+
+    x0, x1, num_pixels = key
+    x, y = source.window(x0, x1, num_pixels, mode, checkpoint)
+    return source, key, None, PlotDataset(x, y)
+
+
+def _summary_job(source, checkpoint):
+    """Background job of `DataSourcePlotDataItem`: build the summary of the source."""
+    source.summary(checkpoint)
+    return source
+
+
+class DataSourcePlotDataItem(DecimatedPlotDataItem):
+    """
+    Line item that displays a `LineSource`.
+
+    Only the visible x-window is read from the source, decimated to the pixel width
+    of the view, and re-read whenever the view changes (see `DecimatedPlotDataItem`).
+    With `background=True` the window is read in a worker thread, and the previous
+    window stays visible until the new one has been read.
+
+    The summary that far zoomed-out views are drawn from is always built in a worker
+    thread, since it takes a pass over the whole data; until it is ready, such views
+    show the strided `LineSource.preview` of the data.
+    """
+
+    def __init__(self, source, decimate='minmax', background=False, **kwargs):
+        self.source = source
+        self._summary_background = None  # LatestJob building the summary of the source
+        self._summary_source = None      # source whose summary is being built
+        super().__init__(decimate=decimate, background=background, **kwargs)
+
+    def _getDisplayDataset(self):
+        from pyqtgraph.graphicsItems.PlotDataItem import PlotDataset
+
+        source = getattr(self, 'source', None)
+        if source is None or len(source) == 0:
+            return None
+
+        key = self._view_key()
+        if key is None:
+            # Not in a view yet: show an overview of the whole data set
+            key = (*source.x_bounds(), 1000)
+        cached = self._decimated
+        if cached is not None and cached[0] is source and cached[1] == key:
+            return cached[2]
+
+        x0, x1, num_pixels = key
+        if source.summary_needed(x0, x1, num_pixels):
+            self._build_summary(source)
+            preview_key = ('preview', key)
+            if cached is None or cached[0] is not source or cached[1] != preview_key:
+                x, y = source.preview(x0, x1, num_pixels, self._decimate)
+                self._decimated = (source, preview_key, PlotDataset(x, y))
+            return self._decimated[2]
+
+        if self._background is not None:
+            requested = self._requested
+            if requested is None or requested[0] is not source or requested[1] != key:
+                self._requested = (source, key)
+                self._background.submit(_window_job, source, key, self._decimate)
+            return cached[2] if cached is not None and cached[0] is source else None
+
+        x, y = source.window(x0, x1, num_pixels, self._decimate)
+        dataset = PlotDataset(x, y)
+        self._decimated = (source, key, dataset)
+        return dataset
+
+    def _build_summary(self, source):
+        """Build the summary of `source` in a worker thread, unless it is already being built."""
+        if self._summary_background is None:
+            from pyqtplotlib.pltwrapper.workers import LatestJob
+            self._summary_background = LatestJob(self._summary_built, parent=self)
+        if self._summary_source is not source:
+            self._summary_source = source
+            self._summary_background.submit(_summary_job, source)
+
+    def _summary_built(self, source):
+        self._summary_source = None
+        if source is self.source:
+            self.updateItems(styleUpdate=False)
+
+    def wait_for_background(self, timeout=None):
+        """
+        Wait until the summary of the source is built (if it is being built) and the window
+        of the current view is shown. Return False if it is not after `timeout` seconds.
+        """
+        if self._summary_background is not None and not self._summary_background.wait(timeout):
+            return False
+        return super().wait_for_background(timeout)
+
+    def dataBounds(self, ax, frac=1.0, orthoRange=None):
+        # The x-extent is known without reading the data; the y-extent is the one of
+        # the displayed window, since the full y-range would require reading everything.
+        if ax == 0 and orthoRange is None:
+            return self.source.x_bounds()
+        return pg.PlotDataItem.dataBounds(self, ax, frac, orthoRange)
+
+
+def image_levels(image):
+    """(min, max) of the finite values of `image`, or (0, 1) if it has none."""
+    finite = image[np.isfinite(image)] if image.dtype.kind in 'fc' else image
+    if finite.size == 0:
+        return (0.0, 1.0)
+    return float(finite.min()), float(finite.max())
+
+
+class ImageSource:
+    """
+    Protocol for 2D image data that is read lazily.
+
+    Required: the `shape` attribute (rows, cols) and the `read` method.
+    """
+
+    shape = (0, 0)
+
+    def read(self, rows, cols):
+        """Return the 2D array data[rows, cols] for the slices `rows` and `cols`."""
+        raise NotImplementedError
+
+    def sample_levels(self, max_samples=1 << 20):
+        """Estimate (min, max) of the data from a strided subsample."""
+        num_rows, num_cols = self.shape
+        step = max(int(np.sqrt(num_rows * num_cols / max_samples)), 1)
+        return image_levels(self.read(slice(0, num_rows, step), slice(0, num_cols, step)))
+
+
+class MemmapImageSource(ImageSource):
+    """
+    Image stored in a memory-mapped 2D array or file.
+
+    Parameters:
+    - data: 2D array, np.memmap, or path to a .npy or raw binary file
+    - dtype, offset, shape: dtype, header size in bytes and (rows, cols) for raw binary files
+    """
+
+    def __init__(self, data, dtype=None, offset=0, shape=None):
+        self.data = open_memmap(data, dtype=dtype, offset=offset, shape=shape)
+        if self.data.ndim != 2:
+            raise ValueError("Image data must be 2D.")
+        self.shape = self.data.shape
+
+    def read(self, rows, cols):
+        window = np.array(self.data[rows, cols])
+        release_pages(self.data)
+        return window
+
+
+class SourceImageItem(pg.GraphicsObject):
+    """
+    Image item that displays an `ImageSource`.
+
+    The item spans the full image (one unit per pixel, mapped to `rect` in the view),
+    while its child ImageItem only holds the visible part of the image, read with a
+    stride so that it has about the resolution of the screen. The window is re-read
+    whenever the view changes, coalesced to once per event-loop iteration.
+
+    Levels, lookup table and options are forwarded to the child `image_item`.
+
+    Without `levels`, the levels are the range of the first window read, the overview of
+    the whole image, so that opening an image reads nothing else.
+
+    With `background=True`, the window is read and colormapped to RGBA in a worker thread
+    (see `LatestJob`); the previous window stays visible until the new one is ready.
+    """
+
+    def __init__(self, source, rect=None, levels=None, background=False, **kwargs):
+        super().__init__()
+        self.source = source
+        self._background = None  # LatestJob when reading the windows in a worker thread
+        if background:
+            from pyqtplotlib.pltwrapper.workers import LatestJob
+            self._background = LatestJob(self._apply_window, parent=self)
+        num_rows, num_cols = source.shape
+        self._image_kwargs = kwargs
+        self._lut = None
+        self._opts = {}
+        self.image_item = pg.ImageItem(axisOrder='row-major', **kwargs)
+        self.image_item.setParentItem(self)
+
+        if rect is None:
+            rect = (0, 0, num_cols, num_rows)
+        transform = QtGui.QTransform()
+        transform.translate(rect[0], rect[1])
+        transform.scale(rect[2] / num_cols, rect[3] / num_rows)
+        self.setTransform(transform)
+
+        self._levels = levels
+        self._window_key = None
+
+        self._window_timer = QtCore.QTimer(self)
+        self._window_timer.setSingleShot(True)
+        self._window_timer.timeout.connect(self.update_window)
+
+        # Coarse overview until the item is in a view
+        self.update_window(view_size=(1024, 1024))
+
+    def boundingRect(self):
+        num_rows, num_cols = self.source.shape
+        return QtCore.QRectF(0, 0, num_cols, num_rows)
+
+    def paint(self, painter, *args):
+        pass
+
+    def image_items(self):
+        """Return the child ImageItems that display the image."""
+        return [self.image_item]
+
+    def setLevels(self, levels, **kwargs):
+        self._levels = levels
+        if self._background is not None:
+            self._submit_window()
+            return
+        for item in self.image_items():
+            item.setLevels(levels, **kwargs)
+
+    def setLookupTable(self, lut, **kwargs):
+        self._lut = lut
+        if self._background is not None:
+            self._submit_window()
+            return
+        for item in self.image_items():
+            item.setLookupTable(lut, **kwargs)
+
+    def setOpts(self, **kwargs):
+        kwargs.pop('autoDownsample', None)  # the window is already read at screen resolution
+        self._opts.update(kwargs)
+        for item in self.image_items():
+            item.setOpts(**kwargs)
+
+    def _new_image_item(self, image):
+        """Create a child ImageItem with the current levels, lookup table and options."""
+        item = pg.ImageItem(image, autoLevels=False, levels=self._levels, axisOrder='row-major',
+                            **self._image_kwargs)
+        if self._lut is not None:
+            item.setLookupTable(self._lut)
+        if self._opts:
+            item.setOpts(**self._opts)
+        item.setParentItem(self)
+        return item
+
+    def viewTransformChanged(self):
+        super().viewTransformChanged()
+        self._window_timer.start(0)
+
+    def update_window(self, view_size=None):
+        """Read the visible part of the image at screen resolution."""
+        num_rows, num_cols = self.source.shape
+        view = self.getViewBox()
+        if view_size is None:
+            if view is None:
+                return
+            visible = self.mapRectFromView(view.viewRect()).intersected(self.boundingRect())
+            view_size = (view.width(), view.height())
+        else:
+            visible = self.boundingRect()
+        if visible.isEmpty():
+            return
+
+        c0, c1 = int(np.floor(visible.left())), int(np.ceil(visible.right()))
+        r0, r1 = int(np.floor(visible.top())), int(np.ceil(visible.bottom()))
+        col_step = max(int(np.ceil((c1 - c0) / max(view_size[0], 1))), 1)
+        row_step = max(int(np.ceil((r1 - r0) / max(view_size[1], 1))), 1)
+        key = (c0, c1, r0, r1, col_step, row_step)
+        if key == self._window_key:
+            return
+        self._window_key = key
+        if self._background is not None:
+            self._submit_window()
+            return
+
+        window = self.source.read(slice(r0, r1, row_step), slice(c0, c1, col_step))
+        if self._levels is None:
+            self._levels = image_levels(window)
+        self.image_item.setImage(window, autoLevels=False, levels=self._levels)
+        self.image_item.setRect(QtCore.QRectF(c0, r0, window.shape[1] * col_step,
+                                              window.shape[0] * row_step))
+
+    def _submit_window(self):
+        if self._window_key is not None:
+            self._background.submit(_read_window, self.source, self._window_key, self._levels, self._lut)
+
+    def _apply_window(self, result):
+        key, levels, rgba = result
+        c0, c1, r0, r1, col_step, row_step = key
+        if self._levels is None:
+            self._levels = levels
+        self.image_item.setImage(rgba, autoLevels=False)
+        self.image_item.setRect(QtCore.QRectF(c0, r0, rgba.shape[1] * col_step, rgba.shape[0] * row_step))
+
+    def wait_for_background(self, timeout=None):
+        """
+        With `background=True`, read the window of the current view now and wait until it
+        is shown (used before exporting). Return False if it is not after `timeout` seconds.
+        """
+        if self._background is None:
+            return True
+        self._window_timer.stop()
+        self.update_window()
+        return self._background.wait(timeout)
+
+
+def _read_window(source, key, levels, lut, checkpoint):
+    """
+    Background job of `SourceImageItem`: read the window `key` of the source and colormap
+    it, with the range of the window as levels if they are not set. Return (key, levels,
+    RGBA window).
+    """
+    from pyqtplotlib.pltwrapper.colors import map_to_rgba
+
+    c0, c1, r0, r1, col_step, row_step = key
+    window = source.read(slice(r0, r1, row_step), slice(c0, c1, col_step))
+    checkpoint()
+    if levels is None:
+        levels = image_levels(window)
+    if callable(lut):
+        lut = lut(window)
+    return key, levels, map_to_rgba(window, levels, lut)
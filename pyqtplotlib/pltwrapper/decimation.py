@@ -0,0 +1,305 @@
+#%%
+import numpy as np
+import pyqtgraph as pg
+from pyqtgraph.Qt import QtCore
+
+DECIMATION_MODES = ('minmax', 'lttb')
+
+
+def minmax_decimate(x, y, x0, x1, num_bins, checkpoint=None, chunk_size=1 << 22):
+    """
+    Reduce the samples with x in [x0, x1] to the minimum and maximum of each of
+    `num_bins` equally wide x-intervals (one per pixel column).
+
+    Every bin contributes two points at the x-position of its first sample, so the
+    vertical extent of each pixel column, and thus every spike, is preserved.
+    NaN values are ignored within a bin. `x` must be sorted in increasing order.
+    The bins are reduced in blocks of about `chunk_size` samples, and `checkpoint` (if
+    given) is called between blocks; it may raise to abort the computation.
+
+    Returns:
+        x, y: decimated arrays of at most 2*num_bins points
+    """
+    edges = np.linspace(x0, x1, num_bins + 1)
+    starts = np.unique(np.searchsorted(x, edges[:-1], side='left'))
+    starts = starts[starts < np.searchsorted(x, x1, side='right')]
+    if len(starts) == 0:
+        return x[:0], y[:0]
+
+    stop = np.searchsorted(x, x1, side='right')
+    out_x = np.repeat(x[starts], 2)
+    out_y = np.empty(2 * len(starts), dtype=np.result_type(y.dtype, np.float32))
+    block = max(int(len(starts) * chunk_size // max(stop - starts[0], 1)), 1)
+    for b in range(0, len(starts), block):
+        if checkpoint is not None:
+            checkpoint()
+        lo = starts[b]
+        hi = starts[b + block] if b + block < len(starts) else stop
+        offsets = starts[b:b + block] - lo
+        out_y[2 * b:2 * (b + block):2] = np.fmax.reduceat(y[lo:hi], offsets)
+        out_y[2 * b + 1:2 * (b + block):2] = np.fmin.reduceat(y[lo:hi], offsets)
+    return out_x, out_y
+
+
+def lttb(x, y, num_out, checkpoint=None):
+    """
+    Downsample to `num_out` points with the Largest-Triangle-Three-Buckets algorithm.
+
+    The first and last points are kept. The points in between are split into
+    `num_out - 2` buckets, and from each bucket the point forming the largest triangle
+    with the previously selected point and the average of the next bucket is kept.
+    This preserves the visual shape of the curve better than min/max decimation at
+    the cost of not keeping every extreme value. `checkpoint` (if given) is called
+    every 1024 buckets; it may raise to abort the computation.
+
+    Returns:
+        x, y: decimated arrays of `num_out` points (or the input if it is shorter)
+    """
+    num_points = len(x)
+    if num_out >= num_points or num_out < 3:
+        return x, y
+
+    edges = np.linspace(1, num_points - 1, num_out - 1).astype(np.intp)
+    counts = np.diff(edges)
+    mean_x = np.add.reduceat(x[1:-1], edges[:-1] - 1) / counts
+    mean_y = np.add.reduceat(y[1:-1], edges[:-1] - 1) / counts
+    mean_x = np.append(mean_x[1:], x[-1])
+    mean_y = np.append(mean_y[1:], y[-1])
+
+    selected = np.empty(num_out, dtype=np.intp)
+    selected[0], selected[-1] = 0, num_points - 1
+    a = 0
+    for i in range(num_out - 2):
+        if checkpoint is not None and i % 1024 == 0:
+            checkpoint()
+        lo, hi = edges[i], edges[i + 1]
+        ax, ay = x[a], y[a]
+        area = np.abs((ax - mean_x[i]) * (y[lo:hi] - ay) - (ax - x[lo:hi]) * (mean_y[i] - ay))
+        a = lo + int(np.nanargmax(area)) if np.any(np.isfinite(area)) else lo
+        selected[i + 1] = a
+    return x[selected], y[selected]
+
+
+def decimate_view(x, y, x0, x1, num_pixels, mode='minmax', checkpoint=None):
+    """
+    Decimate the part of (x, y) visible in the x-range [x0, x1] to `num_pixels` columns.
+
+    Only the visible window is processed. The closest sample outside the window on
+    each side is kept, so that the line runs through the edges of the view. If the
+    window contains few enough samples, they are returned unchanged (as views).
+    `x` must be sorted in increasing order. `checkpoint` is passed on to the decimation.
+    """
+    num_points = len(x)
+    num_pixels = max(int(num_pixels), 1)
+    j0 = int(np.searchsorted(x, x0, side='left'))
+    j1 = int(np.searchsorted(x, x1, side='right'))
+    i0, i1 = max(j0 - 1, 0), min(j1 + 1, num_points)
+
+    if j1 - j0 <= 2 * num_pixels:
+        return x[i0:i1], y[i0:i1]
+
+    if mode == 'minmax':
+        xd, yd = minmax_decimate(x, y, x0, x1, num_pixels, checkpoint)
+    elif mode == 'lttb':
+        xd, yd = lttb(x[j0:j1], y[j0:j1], 2 * num_pixels, checkpoint)
+    else:
+        raise ValueError(f"Unsupported decimation mode: '{mode}'. Use one of {DECIMATION_MODES}.")
+
+    return np.concatenate([x[i0:j0], xd, x[j1:i1]]), np.concatenate([y[i0:j0], yd, y[j1:i1]])
+
+
+def is_monotonic(x, chunk_size=1 << 22, checkpoint=None):
+    """
+    Check that x is sorted in increasing order, in chunks to bound the temporary memory.
+    `checkpoint` (if given) is called before each chunk; it may raise to abort the check.
+    """
+    for start in range(0, max(len(x) - 1, 0), chunk_size):
+        if checkpoint is not None:
+            checkpoint()
+        chunk = x[start:start + chunk_size + 1]
+        if not np.all(chunk[1:] >= chunk[:-1]):
+            return False
+    return True
+
+
+def _decimate_job(dataset, key, mode, monotonic, checkpoint):
+    """
+    Background job of `DecimatedPlotDataItem`: check that x is sorted (if not known yet)
+    and decimate the view `key`. Return (dataset, key, sorted, decimated dataset or None).
+    """
+    from pyqtgraph.graphicsItems.PlotDataItem import PlotDataset
+
+    if monotonic is None:
+        monotonic = is_monotonic(dataset.x, checkpoint=checkpoint)
+    if not monotonic:
+        return dataset, key, False, None
+    x0, x1, num_pixels = key
+    x, y = decimate_view(dataset.x, dataset.y, x0, x1, num_pixels, mode, checkpoint)
+    return dataset, key, True, PlotDataset(x, y, dataset.xAllFinite, dataset.yAllFinite)
+
+
+class DecimatedPlotDataItem(pg.PlotDataItem):
+    """
+    PlotDataItem that displays a view-dependent decimation of its data.
+
+    Whenever the x-range or the size of the ViewBox changes, only the visible x-window
+    is decimated to the current pixel width, either with 'minmax' (minimum and maximum
+    per pixel column, so spikes never disappear) or 'lttb' (Largest-Triangle-Three-Buckets).
+    Bursts of range changes are coalesced into one decimation per event-loop iteration.
+    The original data are kept untouched, so auto-range and `getOriginalDataset` still
+    see the full data set. Data with non-monotonic x are displayed without decimation.
+
+    With `background=True`, the decimation runs in a worker thread (see `LatestJob`), so
+    panning and zooming stay fluid for any number of samples. Until the decimation of the
+    current view arrives, the previous one is shown, extended by a strided preview of the
+    samples where the view goes beyond it.
+    """
+
+    def __init__(self, *args, decimate='minmax', background=False, **kwargs):
+        if decimate not in DECIMATION_MODES:
+            raise ValueError(f"Unsupported decimation mode: '{decimate}'. Use one of {DECIMATION_MODES}.")
+        self._decimate = decimate
+        self._decimated = None   # (source dataset, view key, decimated dataset)
+        self._monotonic = None   # (source x, whether x is sorted)
+        self._full_bounds = None  # (source dataset, [x bounds, y bounds])
+        self._background = None  # LatestJob when decimating in a worker thread
+        self._requested = None  # (source dataset, view key) of the newest background job
+        super().__init__(*args, **kwargs)
+
+        self._decimation_timer = QtCore.QTimer(self)
+        self._decimation_timer.setSingleShot(True)
+        self._decimation_timer.timeout.connect(self._redecimate)
+        if background:
+            from pyqtplotlib.pltwrapper.workers import LatestJob
+            self._background = LatestJob(self._apply_decimation, parent=self)
+
+    def setDecimation(self, mode):
+        """Set the decimation mode ('minmax' or 'lttb')."""
+        if mode not in DECIMATION_MODES:
+            raise ValueError(f"Unsupported decimation mode: '{mode}'. Use one of {DECIMATION_MODES}.")
+        self._decimate = mode
+        self._decimated = None
+        self._requested = None
+        self.updateItems(styleUpdate=False)
+
+    def decimation(self):
+        return self._decimate
+
+    def _view_key(self):
+        view = self.getViewBox()
+        if view is None:
+            return None
+        (x0, x1), _ = view.viewRange()
+        return (x0, x1, int(view.width()))
+
+    def _source_dataset(self):
+        """The full (mapped) dataset, with pyqtgraph's own clipping and downsampling."""
+        return super()._getDisplayDataset()
+
+    def _getDisplayDataset(self):
+        dataset = self._source_dataset()
+        key = self._view_key()
+        if dataset is None or key is None or len(dataset.x) < 2:
+            return dataset
+
+        if self._monotonic is None or self._monotonic[0] is not dataset.x:
+            if self._background is not None:
+                return self._request(dataset, key, None)
+            self._monotonic = (dataset.x, is_monotonic(dataset.x))
+        if not self._monotonic[1]:
+            return dataset
+
+        cached = self._decimated
+        if cached is not None and cached[0] is dataset and cached[1] == key:
+            return cached[2]
+        if self._background is not None:
+            return self._request(dataset, key, True)
+
+        from pyqtgraph.graphicsItems.PlotDataItem import PlotDataset
+
+        x0, x1, num_pixels = key
+        x, y = decimate_view(dataset.x, dataset.y, x0, x1, num_pixels, self._decimate)
+        decimated = PlotDataset(x, y, dataset.xAllFinite, dataset.yAllFinite)
+        self._decimated = (dataset, key, decimated)
+        return decimated
+
+    def _request(self, dataset, key, monotonic):
+        """Submit the decimation of the view to the worker pool; return what to show meanwhile."""
+        requested = self._requested
+        if requested is None or requested[0] is not dataset or requested[1] != key:
+            self._requested = (dataset, key)
+            self._background.submit(_decimate_job, dataset, key, self._decimate, monotonic)
+        return self._interim_dataset(dataset, key, monotonic)
+
+    def _interim_dataset(self, dataset, key, monotonic):
+        """
+        The previous decimation of the data, extended by a strided preview of the samples
+        of the view that it does not cover (the whole data set while x is not known to be sorted).
+        """
+        from pyqtgraph.graphicsItems.PlotDataItem import PlotDataset
+
+        x, y = dataset.x, dataset.y
+        x0, x1, num_pixels = key
+        if not monotonic:
+            step = max(len(x) // (2 * num_pixels), 1)
+            return PlotDataset(x[::step], y[::step], dataset.xAllFinite, dataset.yAllFinite)
+
+        j0, j1 = np.searchsorted(x, [x0, x1])
+        step = max(int(j1 - j0) // (2 * num_pixels), 1)
+        i0, i1 = max(j0 - 1, 0), min(j1 + 1, len(x))
+        cached = self._decimated
+        if cached is None or cached[0] is not dataset or len(cached[2].x) == 0:
+            return PlotDataset(x[i0:i1:step], y[i0:i1:step], dataset.xAllFinite, dataset.yAllFinite)
+
+        previous = cached[2]
+        k0 = np.searchsorted(x, previous.x[0], side='left')
+        k1 = np.searchsorted(x, previous.x[-1], side='right')
+        left, right = slice(i0, k0, step), slice(k1, i1, step)
+        return PlotDataset(np.concatenate([x[left], previous.x, x[right]]),
+                           np.concatenate([y[left], previous.y, y[right]]),
+                           dataset.xAllFinite, dataset.yAllFinite)
+
+    def _apply_decimation(self, result):
+        dataset, key, monotonic, decimated = result
+        if monotonic is not None:
+            self._monotonic = (dataset.x, monotonic)
+        if decimated is not None:
+            self._decimated = (dataset, key, decimated)
+        self.updateItems(styleUpdate=False)
+
+    def wait_for_background(self, timeout=None):
+        """
+        With `background=True`, decimate the current view now and wait until the result is
+        shown (used before exporting). Return False if it is not after `timeout` seconds.
+        """
+        if self._background is None:
+            return True
+        self._decimation_timer.stop()
+        self._redecimate()
+        return self._background.wait(timeout)
+
+    def dataBounds(self, ax, frac=1.0, orthoRange=None):
+        # The displayed data only cover the view, report the extent of the full data set
+        # so that auto-range does not shrink to the current window.
+        if orthoRange is not None or frac < 1.0:
+            return super().dataBounds(ax, frac, orthoRange)
+        dataset = self._source_dataset()
+        if dataset is None or len(dataset.x) == 0:
+            return (None, None)
+        if self._full_bounds is None or self._full_bounds[0] is not dataset:
+            with np.errstate(invalid='ignore'):
+                bounds = [(np.nanmin(d), np.nanmax(d)) if np.any(np.isfinite(d)) else (None, None)
+                          for d in (dataset.x, dataset.y)]
+            self._full_bounds = (dataset, bounds)
+        return self._full_bounds[1][ax]
+
+    def viewTransformChanged(self):
+        # Pan, zoom and resize all end up here; re-decimate once the event loop is idle
+        super().viewTransformChanged()
+        if hasattr(self, '_decimation_timer'):
+            self._decimation_timer.start(0)
+
+    def _redecimate(self):
+        cached = self._decimated
+        if cached is None or cached[1] != self._view_key():
+            self.updateItems(styleUpdate=False)
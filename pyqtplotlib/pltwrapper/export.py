@@ -0,0 +1,246 @@
+#%%
+"""
+Headless batch export of many figures with a pool of worker processes (`export_figures`),
+and reduction of large plots to the export resolution for vector files (`export_resolution`).
+"""
+import multiprocessing
+import os
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+_app = None  # QApplication of a worker process
+
+
+def _init_worker():
+    """Create the QApplication of a worker process, on the offscreen platform unless set otherwise."""
+    global _app
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    from PyQt5.QtWidgets import QApplication
+    _app = QApplication.instance() or QApplication([])
+
+
+def _export_one(task):
+    """Build and save one figure; return (filename, error message or None)."""
+    from PyQt5.QtCore import QEvent
+    from PyQt5.QtWidgets import QApplication
+
+    build, spec = task
+    spec = dict(spec)
+    filename = spec.pop('filename')
+    savefig_kwargs = spec.pop('savefig_kwargs', {})
+    try:
+        fig = build(**spec)
+        try:
+            fig.savefig(filename, **savefig_kwargs)
+        finally:
+            fig.close()
+            fig.deleteLater()
+            QApplication.sendPostedEvents(None, QEvent.DeferredDelete)  # free the figure now
+    except Exception as e:
+        return filename, f'{type(e).__name__}: {e}'
+    return filename, None
+
+
+def export_figures(build, specs, processes=None, chunksize=1, verbose=False):
+    """
+    Build and save many figures in parallel, with one QApplication per worker process.
+
+    The workers are started with the 'spawn' method and use the offscreen Qt platform
+    unless QT_QPA_PLATFORM is set, so no display is needed.
+
+    Parameters:
+    - build: function `build(**spec)` returning a `Figure` (e.g. the figure returned by
+             `subplots`). It is pickled by reference, so it must be defined at the top
+             level of an importable module.
+    - specs: iterable of dicts, one per figure, with the output 'filename', an optional
+             'savefig_kwargs' dict passed to `Figure.savefig`, and the keyword arguments of `build`
+    - processes: number of worker processes (default: number of CPUs); 0 exports in the
+                 current process, which must already have a QApplication
+    - chunksize: number of specs sent to a worker at once
+    - verbose: print the throughput when done
+
+    Returns:
+    - dict with the number of 'figures', the elapsed 'seconds', the throughput in
+      'figures_per_second', and the 'errors' as a list of (filename, message)
+    """
+    tasks = [(build, spec) for spec in specs]
+    t0 = time.perf_counter()
+    if processes == 0:
+        results = [_export_one(task) for task in tasks]
+    else:
+        context = multiprocessing.get_context('spawn')
+        with context.Pool(processes, initializer=_init_worker) as pool:
+            results = list(pool.imap_unordered(_export_one, tasks, chunksize=chunksize))
+    seconds = time.perf_counter() - t0
+
+    report = {
+        'figures': len(tasks),
+        'seconds': seconds,
+        'figures_per_second': len(tasks) / seconds if seconds > 0 else float('inf'),
+        'errors': [(filename, error) for filename, error in results if error is not None],
+    }
+    if verbose:
+        print(f"Exported {report['figures']} figures in {seconds:.2f} s "
+              f"({report['figures_per_second']:.1f} figures/s, {len(report['errors'])} errors)")
+    return report
+
+
+@contextmanager
+def export_resolution(figure, scale=1.0, min_points=10000, max_vector_points=20000):
+    """
+    Reduce the large curves and scatter plots of a figure to what can be seen at `scale`
+    times its on-screen resolution, while the figure is exported; restore them afterwards.
+
+    Vector formats write out every vertex, so the size of an exported file would otherwise
+    grow with the number of data points instead of with the resolution of the figure:
+    - curves with sorted x are decimated to the minimum and maximum of each pixel column
+      of the view (`decimate_view`), other curves lose the consecutive points that fall
+      into the same pixel
+    - of the scatter points (and curve symbols) that fall into the same pixel with the
+      same size, only the last one, which is drawn on top, is kept
+    - items that still have more than `max_vector_points` points are drawn as an image
+      at the export resolution, like the `rasterized` option of matplotlib
+    Scatter symbols are drawn as paths instead of pixmaps.
+
+    Parameters:
+    - figure: the `Figure` to be exported
+    - scale: export resolution relative to the screen, e.g. dpi / 96
+    - min_points: items with at most this many points are left as they are
+    - max_vector_points: maximum number of points of an item drawn as vector graphics
+
+    Curves that are already decimated to the view (`DecimatedPlotDataItem`,
+    `DataSourcePlotDataItem`) are left as they are.
+    """
+    import pyqtgraph as pg
+    from PyQt5.QtCore import QObject
+    from pyqtplotlib.pltwrapper.axes import Axes
+    from pyqtplotlib.pltwrapper.datasource import DataSourcePlotDataItem
+    from pyqtplotlib.pltwrapper.decimation import DecimatedPlotDataItem
+
+    restore = []
+    try:
+        for ax in figure.findChildren(QObject):
+            if not isinstance(ax, Axes):
+                continue
+            vb = ax.getViewBox()
+            grid = _pixel_grid(vb, scale)
+            if grid is None:
+                continue
+            for item in vb.addedItems:
+                if isinstance(item, pg.PlotDataItem) \
+                        and not isinstance(item, (DecimatedPlotDataItem, DataSourcePlotDataItem)):
+                    restore += _reduce_curve(item, vb, grid, scale, min_points, max_vector_points)
+                    if item.scatter.isVisible():
+                        restore += _reduce_scatter(item.scatter, vb, grid, scale, min_points, max_vector_points)
+                elif isinstance(item, pg.ScatterPlotItem):
+                    restore += _reduce_scatter(item, vb, grid, scale, min_points, max_vector_points)
+        yield
+    finally:
+        for undo in reversed(restore):
+            undo()
+
+
+def _pixel_grid(vb, scale):
+    """(x0, y0, pixels per unit along x, pixels per unit along y, number of pixel columns) of a view."""
+    vb.prepareForPaint()  # apply a pending auto range
+    (x0, x1), (y0, y1) = vb.viewRange()
+    num_cols, num_rows = vb.width() * scale, vb.height() * scale
+    if x1 <= x0 or y1 <= y0 or num_cols < 1 or num_rows < 1:
+        return None
+    return x0, y0, num_cols / (x1 - x0), num_rows / (y1 - y0), int(np.ceil(num_cols))
+
+
+def _pixels(x, y, grid):
+    x0, y0, sx, sy, _ = grid
+    with np.errstate(invalid='ignore'):
+        return np.floor((x - x0) * sx), np.floor((y - y0) * sy)
+
+
+def _reduce_curve(item, vb, grid, scale, min_points, max_vector_points):
+    from pyqtplotlib.pltwrapper.decimation import decimate_view, is_monotonic
+
+    x, y = item.getData()
+    if x is None or len(x) <= min_points or not item.curve.isVisible() \
+            or isinstance(item.opts['connect'], np.ndarray):
+        return []
+    if is_monotonic(x):
+        x0, _, sx, _, num_cols = grid
+        x, y = decimate_view(x, y, x0, x0 + num_cols / sx, num_cols, 'minmax')
+    else:
+        # keep a point only where the curve enters another pixel
+        px, py = _pixels(x, y, grid)
+        keep = np.ones(len(x), dtype=bool)
+        keep[1:-1] = (px[1:-1] != px[:-2]) | (py[1:-1] != py[:-2])
+        x, y = x[keep], y[keep]
+    item.curve.setData(x=x, y=y)
+    undo = [lambda: item.updateItems(styleUpdate=False)]
+    if len(x) > max_vector_points:
+        undo.append(_rasterize(item.curve, vb, scale))
+    return undo
+
+
+def _reduce_scatter(scatter, vb, grid, scale, min_points, max_vector_points):
+    undo = []
+    bulk = getattr(scatter, '_bulk', None)
+    if bulk is not None:
+        # the record array of a bulk `ArrayScatterPlotItem` is only kept for the export
+        undo.append(lambda: scatter._release_record_array(bulk))
+    data = scatter.data
+    visible = data['visible']
+    if len(data) > min_points:
+        px, py = _pixels(data['x'], data['y'], grid)
+        visible = visible & np.isfinite(px) & np.isfinite(py)
+        candidates = np.flatnonzero(visible)
+        # the last point of each (pixel, size) is drawn on top of the others
+        keys = np.stack([px[candidates], py[candidates], data['size'][candidates]], axis=1)[::-1]
+        _, first = np.unique(keys, axis=0, return_index=True)
+        visible[:] = False
+        visible[candidates[len(candidates) - 1 - first]] = True
+
+        old = data['visible'].copy()
+        data['visible'] = visible
+
+        def restore():
+            scatter.data['visible'] = old
+            scatter.update()
+        undo.append(restore)
+
+    if np.count_nonzero(visible) > max_vector_points:
+        undo.append(_rasterize(scatter, vb, scale))
+    else:
+        # draw the symbols as paths rather than as fragments of a pixmap, which vector
+        # formats would embed as one image per point
+        scatter.setExportMode(True, {'antialias': scatter.opts['antialias']})
+        undo.append(lambda: scatter.setExportMode(False))
+    return undo
+
+
+def _rasterize(item, vb, scale):
+    """Draw a graphics item as an image with `scale` pixels per device pixel, clipped to the view; return the undo function."""
+    from PyQt5 import QtCore, QtGui
+
+    def paint(painter, option, widget=None):
+        rect = painter.transform().mapRect(item.mapRectFromItem(vb, vb.rect())).toAlignedRect()
+        if rect.isEmpty():
+            return
+        image = QtGui.QImage(int(np.ceil(rect.width() * scale)), int(np.ceil(rect.height() * scale)),
+                             QtGui.QImage.Format_ARGB32_Premultiplied)
+        image.setDevicePixelRatio(scale)
+        image.fill(QtCore.Qt.transparent)
+        image_painter = QtGui.QPainter(image)
+        image_painter.setTransform(painter.transform() * QtGui.QTransform.fromTranslate(-rect.x(), -rect.y()))
+        type(item).paint(item, image_painter, option, None)
+        image_painter.end()
+        painter.save()
+        painter.resetTransform()
+        painter.drawImage(rect.topLeft(), image)
+        painter.restore()
+
+    item.paint = paint
+
+    def undo():
+        del item.paint
+        item.update()
+    return undo
@@ -1,7 +1,9 @@
 #%%
 # %gui qt
-from PyQt5 import QtWidgets
-from pyqtplotlib.pltwrapper.axes import AxesWidget
+import os
+from contextlib import contextmanager
+from PyQt5 import QtCore, QtGui, QtWidgets
+from pyqtplotlib.pltwrapper.axes import Axes, AxesWidget
 
 class Figure(QtWidgets.QWidget):
     def __init__(self, parent=None, title="", figsize=(600, 400)):
@@ -10,6 +12,7 @@ class Figure(QtWidgets.QWidget):
         self.resize(*figsize)
         self.layout = QtWidgets.QVBoxLayout()
         self.setLayout(self.layout)
+        self.crosshair = None  # Crosshair while it is enabled
         # self.plots = []
 
     def add_subplot(self, *args, **kwargs):
@@ -19,31 +22,166 @@ class Figure(QtWidgets.QWidget):
         ax.figure = self
         return ax
     
+    @contextmanager
+    def batch_update(self):
+        """
+        Context manager to add many items to the figure at once.
+
+        Inside the block, repaints, auto-range calculations and legend relayouts of all
+        axes of the figure are deferred, and applied once when the block exits. Blocks
+        can be nested.
+
+        Example:
+            with fig.batch_update():
+                for ax in axs.flat:
+                    ax.plot(x, y, label='data')
+        """
+        axes = self._axes()
+        updates_enabled = self.updatesEnabled()  # False in a nested block
+        self.setUpdatesEnabled(False)
+        for ax in axes:
+            ax._begin_batch_update()
+        try:
+            yield self
+        finally:
+            for ax in axes:
+                ax._end_batch_update()
+            self.setUpdatesEnabled(updates_enabled)
+
+    def _axes(self):
+        """All axes of the figure (widgets and, in single-scene subplots, items)."""
+        return [obj for obj in self.findChildren(QtCore.QObject) if isinstance(obj, Axes)]
+
+    def enable_profiling(self, overlay=False):
+        """
+        Start profiling the rendering of all axes of the figure (see `Axes.enable_profiling`);
+        return the list of their `AxesProfiler`s. Axes without a title are named
+        'axes i', numbered in the order of `axs.flat` for subplots.
+        """
+        return [ax.enable_profiling(overlay=overlay, name=ax.plot_item.titleLabel.text or f'axes {i}')
+                for i, ax in enumerate(self._axes())]
+
+    def disable_profiling(self):
+        """Stop profiling all axes of the figure; return the list of their profilers."""
+        return [profiler for profiler in (ax.disable_profiling() for ax in self._axes()) if profiler is not None]
+
+    def save_profile(self, filename, format='json'):
+        """
+        Save the data recorded by the profilers of all axes of the figure.
+
+        Parameters:
+        - filename: path of the output file
+        - format: 'json', or 'chrome' for a Chrome trace (open it in chrome://tracing
+                  or https://ui.perfetto.dev) with one row per axes
+        """
+        from pyqtplotlib.pltwrapper.profiling import save_profiles
+        save_profiles([ax.profiler for ax in self._axes() if ax.profiler is not None], filename, format)
+
+    def enable_crosshair(self, readout=True, max_fps=None):
+        """
+        Show a vertical line that follows the mouse through all axes of the figure, with
+        the value of each line at the x of the mouse (see `Crosshair`).
+
+        Parameters:
+        - readout: show the values next to the line and mark them on the lines
+        - max_fps: maximal number of updates per second (default: refresh rate of the screen)
+
+        Returns:
+        - the `Crosshair`, also available as `self.crosshair`; its `values` attribute holds
+          the values at the current x
+        """
+        from pyqtplotlib.pltwrapper.crosshair import Crosshair
+        self.disable_crosshair()
+        self.crosshair = Crosshair(self, readout=readout, max_fps=max_fps)
+        return self.crosshair
+
+    def disable_crosshair(self):
+        """Remove the crosshair."""
+        crosshair, self.crosshair = self.crosshair, None
+        if crosshair is not None:
+            crosshair.remove()
+
+    def _prepare_render(self):
+        """Lay out a figure that may never have been shown, as `render` would, before it is rendered."""
+        self.ensurePolished()
+        self.layout.activate()
+        # Hidden widgets only receive their resize events when shown or rendered; send them
+        # now so that the views have their final size and range before export_resolution
+        for widget in [self] + self.findChildren(QtWidgets.QWidget):
+            if widget.testAttribute(QtCore.Qt.WA_PendingResizeEvent):
+                widget.setAttribute(QtCore.Qt.WA_PendingResizeEvent, False)
+                QtWidgets.QApplication.sendEvent(widget, QtGui.QResizeEvent(widget.size(), QtCore.QSize()))
+        QtWidgets.QApplication.sendPostedEvents()
+        # Items that prepare their data in worker threads (background=True) catch up with the view
+        for ax in self._axes():
+            for item in ax.getViewBox().addedItems:
+                if hasattr(item, 'wait_for_background'):
+                    item.wait_for_background()
+
+    def savefig(self, filename, format=None, dpi=None, transparent=False, quality=-1):
+        """
+        Save the figure to a file without showing it.
+
+        Raster formats (png, jpg, bmp, tif, ...) are rendered into a QImage, so that figures
+        can be saved on headless machines with the offscreen Qt platform
+        (QT_QPA_PLATFORM=offscreen). pdf and svg files are written as vector graphics, in
+        which curves and scatter plots with many points are reduced to the resolution `dpi`
+        (see `export_resolution`), so that the file size does not grow with the number of
+        points; images are embedded as compressed rasters at their on-screen resolution.
 
-    def savefig(self, filename, format=None):
-        """Not working yet
+        Parameters:
+        - filename: path of the output file
+        - format: file format, default: the extension of `filename`
+        - dpi: resolution of raster images; the size of the figure on screen corresponds
+               to 96 dpi (default). For pdf and svg files the resolution to which large
+               plots are reduced (default: 300)
+        - transparent: if True, raster images have a transparent instead of a white background
+        - quality: 0 to 100, or -1 for the default of the format; for jpg the image quality,
+                   for png the speed of the compression (higher values give larger files faster)
         """
-        
         from PyQt5 import QtGui
+        from pyqtplotlib.pltwrapper.export import export_resolution
+
         if format is None:
-            format = filename.split('.')[-1]
-
-        if format.lower() in ['png', 'jpg', 'jpeg', 'bmp']:
-            # Raster image formats
-            pixmap = QtGui.QPixmap(self.size())
-            self.render(pixmap)
-            pixmap.save(filename, format.upper())
-        elif format.lower() in ['pdf', 'svg']:
-            # Vector image formats
-            printer = QtGui.QPrinter() if format.lower() == 'pdf' else QtGui.QSvgGenerator()
-            printer.setOutputFormat(QtGui.QPrinter.PdfFormat if format.lower() == 'pdf' else QtGui.QSvgGenerator.SvgFormat)
-            printer.setOutputFileName(filename)
-            printer.setPaperSize(self.size(), QtGui.QPrinter.DevicePixel)
-            printer.setFullPage(True)
-
-            painter = QtGui.QPainter(printer)
-            self.render(painter)
+            format = os.path.splitext(filename)[1][1:]
+        format = format.lower()
+
+        self._prepare_render()
+        size = self.size()
+
+        if format == 'pdf':
+            writer = QtGui.QPdfWriter(filename)
+            writer.setResolution(96)  # one device pixel per pixel of the figure
+            writer.setPageSize(QtGui.QPageSize(QtCore.QSizeF(size.width() * 72 / 96, size.height() * 72 / 96),
+                                               QtGui.QPageSize.Point))
+            writer.setPageMargins(QtCore.QMarginsF(0, 0, 0, 0))
+            painter = QtGui.QPainter(writer)
+            with export_resolution(self, (dpi or 300) / 96):
+                self.render(painter)
+            painter.end()
+        elif format == 'svg':
+            from PyQt5.QtSvg import QSvgGenerator
+            generator = QSvgGenerator()
+            generator.setFileName(filename)
+            generator.setSize(size)
+            generator.setViewBox(QtCore.QRect(QtCore.QPoint(0, 0), size))
+            painter = QtGui.QPainter(generator)
+            with export_resolution(self, (dpi or 300) / 96):
+                self.render(painter)
+            painter.end()
+        elif format.encode() in QtGui.QImageWriter.supportedImageFormats():
+            scale = 1.0 if dpi is None else dpi / 96
+            image = QtGui.QImage(int(round(size.width() * scale)), int(round(size.height() * scale)),
+                                 QtGui.QImage.Format_ARGB32_Premultiplied if transparent
+                                 else QtGui.QImage.Format_RGB32)
+            image.setDevicePixelRatio(scale)
+            image.fill(QtCore.Qt.transparent if transparent else QtCore.Qt.white)
+            painter = QtGui.QPainter(image)
+            self.render(painter, flags=QtWidgets.QWidget.DrawChildren if transparent
+                        else QtWidgets.QWidget.DrawWindowBackground | QtWidgets.QWidget.DrawChildren)
             painter.end()
+            if not image.save(filename, format.upper(), quality):
+                raise OSError(f"Could not write '{filename}'")
         else:
             raise ValueError(f"Unsupported file format: '{format}'")
     
@@ -62,7 +200,7 @@ if __name__ == '__main__':
 
     figure.show()
     
-    # figure.savefig('test.png') # not working yet (should not be placed in the event loop)
+    # figure.savefig('test.png')  # also works before the figure is shown
     
     app.exec_()
 # %%
@@ -0,0 +1,162 @@
+#%%
+"""
+Hover readout that snaps to the data (`Axes.set_hover_mode('snap')`): the data point of
+the lines and scatter plots of the axes nearest to the mouse, or the value of the image
+pixel under the mouse. The same lookups give the values of lines at the x of a crosshair
+(see `Crosshair`).
+
+The points near the mouse are looked up in an index of each item, built when the item is
+first hovered and rebuilt only when its data change: a binary search for lines with
+sorted x (and for `LineSource`s), a `GridIndex` for scatter plots and unsorted lines.
+Pixel values are read by mapping the mouse position to the pixel.
+"""
+import numpy as np
+import pyqtgraph as pg
+
+
+class _SortedLineIndex:
+    def __init__(self, x, y):
+        self.x, self.y = x, y
+
+    def candidates(self, x0, x1, y0, y1):
+        i0, i1 = np.searchsorted(self.x, [x0, x1])
+        return self.x[i0:i1], self.y[i0:i1]
+
+    def value_at(self, x):
+        i = int(np.searchsorted(self.x, x))
+        return _interpolate(self.x[max(i - 1, 0):i + 1], self.y[max(i - 1, 0):i + 1], x)
+
+
+class _SourceLineIndex:
+    def __init__(self, source):
+        self.source = source
+
+    def candidates(self, x0, x1, y0, y1):
+        i0, i1 = self.source.index_range(x0, x1)
+        if i1 - i0 <= self.source.max_read:
+            return self.source.read(i0, i1)
+        if not self.source.summary_ready():
+            # the summary is being built in a worker thread: the strided preview that is drawn
+            return self.source.sample_runs(i0, i1)
+        # far zoomed out: the extrema of blocks of samples, as drawn by `LineSource.window`
+        return self.source.summary().points(i0, i1, self.source.max_read)
+
+    def value_at(self, x):
+        i = self.source.index_range(x, x)[0]
+        return _interpolate(*self.source.read(max(i - 1, 0), min(i + 1, len(self.source))), x)
+
+
+class _PointIndex:
+    def __init__(self, x, y):
+        from pyqtplotlib.interaction.spatial_index import GridIndex
+        self.grid = GridIndex(x, y)
+
+    def candidates(self, x0, x1, y0, y1):
+        indices = self.grid.query(x0, x1, y0, y1)
+        return self.grid.x[indices], self.grid.y[indices]
+
+
+def _interpolate(xs, ys, x):
+    """The value at x of the samples (xs, ys) around it, or None if x is not between them."""
+    if len(xs) == 0 or not xs[0] <= x <= xs[-1]:
+        return None
+    return float(np.interp(x, xs, ys))
+
+
+def _point_index(item):
+    """The cached index of the points of a line or scatter item, or None for other items."""
+    from pyqtplotlib.pltwrapper.axes import ArrayScatterPlotItem
+    from pyqtplotlib.pltwrapper.datasource import LineSource
+    from pyqtplotlib.pltwrapper.decimation import is_monotonic
+
+    source = getattr(item, 'source', None)
+    if isinstance(item, pg.PlotDataItem) and isinstance(source, LineSource):
+        key = (source,)
+        build = lambda: _SourceLineIndex(source)
+    elif isinstance(item, pg.PlotDataItem):
+        x, y = item.xData, item.yData
+        if x is None or y is None or len(x) == 0:
+            return None
+        key = (x, y)
+        build = lambda: _SortedLineIndex(x, y) if is_monotonic(x) else _PointIndex(x, y)
+    elif isinstance(item, ArrayScatterPlotItem):
+        x, y = item.getData()  # the same arrays until the spots change, without the record array
+        if len(x) == 0:
+            return None
+        key = (x, y)
+        build = lambda: _PointIndex(x, y)
+    elif isinstance(item, pg.ScatterPlotItem):
+        if len(item.data) == 0:
+            return None
+        key = (item.data,)
+        build = lambda: _PointIndex(item.data['x'], item.data['y'])
+    else:
+        return None
+    # the key holds the data, so their ids cannot be reused by new data while cached
+    cached = item.__dict__.get('_hover_index')
+    if cached is None or len(cached[0]) != len(key) or any(a is not b for a, b in zip(cached[0], key)):
+        cached = item.__dict__['_hover_index'] = (key, build())
+    return cached[1]
+
+
+def nearest_point(axes, x, y, radius=10):
+    """
+    The data point of the lines and scatter plots of `axes` nearest to (x, y) (view
+    coordinates), if it is within `radius` pixels: (item, point x, point y), else None.
+    """
+    vb = axes.getViewBox()
+    pixel_x, pixel_y = vb.viewPixelSize()
+    if not (pixel_x > 0 and pixel_y > 0):
+        return None
+    best, best_distance = None, radius**2
+    for item in vb.addedItems:
+        if not item.isVisible():
+            continue
+        index = _point_index(item)
+        if index is None:
+            continue
+        px, py = index.candidates(x - radius * pixel_x, x + radius * pixel_x,
+                                  y - radius * pixel_y, y + radius * pixel_y)
+        if len(px) == 0:
+            continue
+        distance = np.square((px - x) / pixel_x) + np.square((py - y) / pixel_y)
+        distance[np.isnan(distance)] = np.inf
+        i = int(np.argmin(distance))
+        if distance[i] <= best_distance:
+            best, best_distance = (item, px[i], py[i]), distance[i]
+    return best
+
+
+def value_at(item, x):
+    """
+    The value of the line `item` at `x`, interpolated linearly between the samples around
+    x; None if x is outside the data, or for items that are not lines with sorted x.
+    """
+    index = _point_index(item)
+    if not hasattr(index, 'value_at'):
+        return None
+    return index.value_at(x)
+
+
+def pixel_value(axes, x, y):
+    """
+    The image pixel of `axes` at (x, y) (view coordinates), topmost image first:
+    (item, row, col, value), or None.
+    """
+    from PyQt5.QtCore import QPointF
+    from pyqtplotlib.pltwrapper.datasource import SourceImageItem
+
+    items = [item for item in axes.getViewBox().addedItems
+             if isinstance(item, (pg.ImageItem, SourceImageItem)) and item.isVisible()]
+    for item in sorted(items, key=lambda item: -item.zValue()):
+        position = item.mapFromView(QPointF(x, y))
+        col, row = int(np.floor(position.x())), int(np.floor(position.y()))
+        if isinstance(item, SourceImageItem):
+            num_rows, num_cols = item.source.shape
+            if 0 <= row < num_rows and 0 <= col < num_cols:
+                return item, row, col, item.source.read(slice(row, row + 1), slice(col, col + 1))[0, 0]
+        elif item.image is not None:
+            image = item.image if item.axisOrder == 'row-major' else item.image.swapaxes(0, 1)
+            if 0 <= row < image.shape[0] and 0 <= col < image.shape[1]:
+                return item, row, col, image[row, col]
+    return None
@@ -0,0 +1,308 @@
+#%%
+"""
+Opt-in profiling of the rendering of axes (`Axes.enable_profiling`): duration of each
+frame and of each item's paint, frames per second, latency from a data update to the
+frame that shows it, and the number of items drawn. The statistics can be shown as an
+overlay on the axes and saved as JSON or as a Chrome trace (chrome://tracing, Perfetto).
+
+Nothing is instrumented while profiling is off: enabling it wraps the paint methods of
+the view and of the items of the axes, per instance, and disabling it removes the wrappers.
+"""
+import json
+import time
+from collections import deque
+
+import numpy as np
+
+# Methods through which the items of the axes receive new data
+_UPDATE_METHODS = ('setData', 'setImage', 'setArrayData')
+
+
+class AxesProfiler:
+    """
+    Records the rendering of one axes; created by `Axes.enable_profiling`.
+
+    A frame is one paint event of the view showing the axes. With `single_scene`
+    subplots all axes share one view, so their frames have the same duration, and
+    the paint time of each axes is the sum of the paint times of its items.
+
+    Parameters:
+    - axes: the `Axes` to profile
+    - name: name of the axes in the exported files (default: its title, or 'axes')
+    - overlay: show the statistics on the axes, refreshed twice per second
+    - max_events: number of frames, paints and updates kept (the oldest are dropped)
+    """
+
+    def __init__(self, axes, name=None, overlay=False, max_events=100000):
+        self.axes = axes
+        self.name = name or axes.plot_item.titleLabel.text or 'axes'
+        self.frames = deque(maxlen=max_events)  # (start, duration, paint time, items drawn)
+        self.paints = deque(maxlen=max_events)  # (start, duration, item name)
+        self.latencies = deque(maxlen=max_events)  # (frame end, latency)
+        self.frame_count = 0  # frames recorded since the last reset, including the dropped ones
+
+        self._wrapped = {}  # item: {method name: instance attribute it replaced, or None}
+        self._names = {}  # item: name
+        self._pending_update = None  # time of the oldest data update not yet drawn
+        self._frame_start = None
+        self._frame_paint = 0.0
+        self._frame_items = 0
+
+        self._views = list(axes.plot_item.scene().views()) if axes.plot_item.scene() else []
+        for view in self._views:
+            _attach_view(view, self)
+        self._instrument_items()
+
+        self._overlay = None
+        self._overlay_frames = 0  # `frame_count` when the overlay was last updated
+        if overlay:
+            self._init_overlay()
+
+    # Instrumentation
+
+    def _instrument_items(self):
+        """Wrap the items of the axes that are not wrapped yet (items may be added at any time)."""
+        stack = list(self.axes.getViewBox().childGroup.childItems())
+        while stack:
+            item = stack.pop()
+            stack.extend(item.childItems())
+            if item not in self._wrapped:
+                self._wrap_item(item)
+
+    def _wrap_item(self, item):
+        name = type(item).__name__
+        parent = item.parentItem()
+        label = item.name() if hasattr(item, 'name') and callable(item.name) else None
+        if not label and parent is not None and hasattr(parent, 'name') and callable(parent.name):
+            label = parent.name()
+        if label:
+            name += f" '{label}'"
+        name += f' #{len(self._names)}'
+        self._names[item] = name
+
+        replaced = {}
+        paint_method = item.paint
+
+        def paint(painter, *args):
+            t0 = time.perf_counter()
+            paint_method(painter, *args)
+            self._painted(name, t0, time.perf_counter())
+        replaced['paint'] = item.__dict__.get('paint')
+        item.paint = paint
+
+        for method_name in _UPDATE_METHODS:
+            if hasattr(item, method_name):
+                replaced[method_name] = item.__dict__.get(method_name)
+                setattr(item, method_name, self._update_wrapper(getattr(item, method_name)))
+        self._wrapped[item] = replaced
+
+    def _update_wrapper(self, method):
+        def wrapper(*args, **kwargs):
+            self.mark_update()
+            return method(*args, **kwargs)
+        return wrapper
+
+    def remove(self):
+        """Remove the instrumentation and the overlay; the recorded data is kept."""
+        for view in self._views:
+            _detach_view(view, self)
+        self._views = []
+        for item, replaced in self._wrapped.items():
+            try:
+                for method_name, previous in replaced.items():
+                    if previous is None:
+                        delattr(item, method_name)
+                    else:
+                        setattr(item, method_name, previous)
+            except RuntimeError:
+                pass  # the item has been deleted
+        self._wrapped = {}
+        if self._overlay is not None:
+            self._timer.stop()
+            self._overlay.setParentItem(None)
+            self.axes.getViewBox().scene().removeItem(self._overlay)
+            self._overlay = None
+
+    # Recording
+
+    def mark_update(self):
+        """Record that the data of the axes changed; the latency is measured until the next frame that draws it."""
+        if self._pending_update is None:
+            self._pending_update = time.perf_counter()
+
+    def _begin_frame(self):
+        self._instrument_items()
+        self._frame_paint = 0.0
+        self._frame_items = 0
+        self._frame_start = time.perf_counter()
+
+    def _end_frame(self):
+        end = time.perf_counter()
+        start, self._frame_start = self._frame_start, None
+        self.frames.append((start, end - start, self._frame_paint, self._frame_items))
+        self.frame_count += 1
+        if self._pending_update is not None and self._frame_items > 0:
+            self.latencies.append((end, end - self._pending_update))
+            self._pending_update = None
+
+    def _painted(self, name, t0, t1):
+        self.paints.append((t0, t1 - t0, name))
+        if self._frame_start is not None:
+            self._frame_paint += t1 - t0
+            self._frame_items += 1
+
+    def reset(self):
+        """Discard the recorded data."""
+        self.frames.clear()
+        self.paints.clear()
+        self.latencies.clear()
+        self.frame_count = 0
+        self._overlay_frames = 0
+        self._pending_update = None
+
+    # Results
+
+    def stats(self):
+        """
+        Summary of the recorded data, with times in milliseconds:
+        - frames: number of frames
+        - fps: frames during the last second
+        - frame_ms, paint_ms, update_latency_ms: dicts with the mean, median (p50),
+          95th percentile (p95) and max of the duration of the frames, of the time spent
+          painting the items of the axes per frame, and of the update latencies
+        - items_drawn: mean number of items painted per frame
+        - items: per item name, the number of paints and their total, mean and max time
+        """
+        frames = np.array(self.frames, dtype=float).reshape(-1, 4)
+        now = time.perf_counter()
+        items = {}
+        for _, duration, name in self.paints:
+            entry = items.setdefault(name, [0, 0.0, 0.0])
+            entry[0] += 1
+            entry[1] += duration
+            entry[2] = max(entry[2], duration)
+        return {
+            'frames': len(frames),
+            'fps': int(np.count_nonzero(frames[:, 0] + frames[:, 1] > now - 1)),
+            'frame_ms': _summary(frames[:, 1]),
+            'paint_ms': _summary(frames[:, 2]),
+            'update_latency_ms': _summary(np.array([latency for _, latency in self.latencies])),
+            'items_drawn': float(frames[:, 3].mean()) if len(frames) else 0.0,
+            'items': {name: {'paints': n, 'total_ms': 1e3 * total, 'mean_ms': 1e3 * total / n, 'max_ms': 1e3 * peak}
+                      for name, (n, total, peak) in items.items()},
+        }
+
+    def to_dict(self):
+        """The statistics and the recorded events, with times in seconds of `time.perf_counter`."""
+        return {
+            'name': self.name,
+            'stats': self.stats(),
+            'frames': [dict(start=s, duration=d, paint=p, items_drawn=n) for s, d, p, n in self.frames],
+            'paints': [dict(start=s, duration=d, item=name) for s, d, name in self.paints],
+            'update_latencies': [dict(frame_end=t, latency=latency) for t, latency in self.latencies],
+        }
+
+    def trace_events(self, tid=0):
+        """The frames, paints and update latencies as Chrome trace events (times in microseconds)."""
+        events = [dict(name='thread_name', ph='M', pid=0, tid=tid, args=dict(name=self.name))]
+        events += [dict(name='frame', cat='frame', ph='X', pid=0, tid=tid, ts=1e6 * s, dur=1e6 * d,
+                        args=dict(paint_ms=1e3 * p, items_drawn=n)) for s, d, p, n in self.frames]
+        events += [dict(name=name, cat='paint', ph='X', pid=0, tid=tid, ts=1e6 * s, dur=1e6 * d)
+                   for s, d, name in self.paints]
+        events += [dict(name='update latency', cat='latency', ph='C', pid=0, tid=tid, ts=1e6 * t,
+                        args={self.name: 1e3 * latency}) for t, latency in self.latencies]
+        return events
+
+    def save(self, filename, format='json'):
+        """Save the recorded data; see `save_profiles`."""
+        save_profiles([self], filename, format)
+
+    # Overlay
+
+    def _init_overlay(self):
+        import pyqtgraph as pg
+        from PyQt5.QtCore import QTimer
+
+        # child of the view box itself (not of its child group): fixed in pixels, not profiled
+        self._overlay = pg.TextItem(color=(0, 0, 0), fill=(255, 255, 255, 200), anchor=(0, 0))
+        self._overlay.setParentItem(self.axes.getViewBox())
+        self._overlay.setPos(4, 4)
+        self._overlay.setZValue(1e9)
+        # parented to the view box so that it is deleted with the axes if `remove` is never called
+        self._timer = QTimer(self.axes.getViewBox())
+        self._timer.timeout.connect(self._update_overlay)
+        self._timer.start(500)
+
+    def _update_overlay(self):
+        # Updating the text repaints the axes: skip when that is the only new frame, so
+        # that an idle plot is not repainted twice per second
+        # (`frame_count`, as `frames` stops growing once it holds `max_events` frames)
+        if self.frame_count <= self._overlay_frames + 1 and self._overlay.textItem.toPlainText():
+            return
+        stats = self.stats()
+        lines = [f"{stats['fps']} fps, frame {stats['frame_ms']['p50']:.1f} ms "
+                 f"(p95 {stats['frame_ms']['p95']:.1f} ms)",
+                 f"paint {stats['paint_ms']['p50']:.1f} ms, {stats['items_drawn']:.0f} items drawn"]
+        if self.latencies:
+            lines.append(f"update latency {stats['update_latency_ms']['p50']:.1f} ms")
+        if stats['items']:
+            name, item = max(stats['items'].items(), key=lambda entry: entry[1]['total_ms'])
+            lines.append(f"slowest: {name} {item['mean_ms']:.1f} ms")
+        self._overlay.setText('\n'.join(lines))
+        self._overlay_frames = self.frame_count
+
+
+def _summary(values):
+    if len(values) == 0:
+        return dict(mean=0.0, p50=0.0, p95=0.0, max=0.0)
+    values = 1e3 * np.asarray(values)
+    return dict(mean=float(values.mean()), p50=float(np.percentile(values, 50)),
+                p95=float(np.percentile(values, 95)), max=float(values.max()))
+
+
+def _attach_view(view, profiler):
+    """Time the paint events of a view for the profilers of the axes it shows."""
+    profilers = view.__dict__.get('_axes_profilers')
+    if profilers is None:
+        profilers = view._axes_profilers = []
+        paint_event = view.paintEvent
+
+        def paintEvent(event):
+            active = list(profilers)
+            for p in active:
+                p._begin_frame()
+            paint_event(event)
+            for p in active:
+                p._end_frame()
+        view.paintEvent = paintEvent
+    profilers.append(profiler)
+
+
+def _detach_view(view, profiler):
+    profilers = view.__dict__.get('_axes_profilers', [])
+    if profiler in profilers:
+        profilers.remove(profiler)
+    if not profilers and '_axes_profilers' in view.__dict__:
+        del view.paintEvent
+        del view._axes_profilers
+
+
+def save_profiles(profilers, filename, format='json'):
+    """
+    Save the data recorded by several `AxesProfiler`s to one file.
+
+    Parameters:
+    - profilers: list of `AxesProfiler`
+    - filename: path of the output file
+    - format: 'json' for the statistics and events of each axes, or 'chrome' for a
+              Chrome trace with one row per axes
+    """
+    if format == 'json':
+        data = {'axes': [profiler.to_dict() for profiler in profilers]}
+    elif format == 'chrome':
+        events = [event for tid, profiler in enumerate(profilers) for event in profiler.trace_events(tid)]
+        data = {'traceEvents': events, 'displayTimeUnit': 'ms'}
+    else:
+        raise ValueError(f"Unknown profile format: '{format}' (expected 'json' or 'chrome')")
+    with open(filename, 'w') as f:
+        json.dump(data, f)
@@ -0,0 +1,224 @@
+#%%
+"""
+Multi-resolution tiled image pyramid for `AxesWidget.imshow(..., pyramid=True)`.
+"""
+import threading
+
+import numpy as np
+from pyqtgraph.Qt import QtCore
+
+from pyqtplotlib.pltwrapper.datasource import SourceImageItem, image_levels, release_pages
+
+
+def downsample_2x2(image):
+    """
+    Halve the resolution of a 2D image by averaging blocks of 2x2 pixels.
+
+    Odd trailing rows and columns are averaged over the pixels available. Integer
+    images keep their dtype; other images are returned with at least float32 precision.
+    """
+    num_rows, num_cols = image.shape
+    r2, c2 = num_rows // 2 * 2, num_cols // 2 * 2
+    out = np.empty(((num_rows + 1) // 2, (num_cols + 1) // 2), dtype=np.float32)
+
+    block = image[0:r2:2, 0:c2:2].astype(np.float32)
+    block += image[1:r2:2, 0:c2:2]
+    block += image[0:r2:2, 1:c2:2]
+    block += image[1:r2:2, 1:c2:2]
+    out[:r2 // 2, :c2 // 2] = block / 4
+    if num_rows % 2:
+        out[-1, :c2 // 2] = (image[-1, 0:c2:2].astype(np.float32) + image[-1, 1:c2:2]) / 2
+    if num_cols % 2:
+        out[:r2 // 2, -1] = (image[0:r2:2, -1].astype(np.float32) + image[1:r2:2, -1]) / 2
+    if num_rows % 2 and num_cols % 2:
+        out[-1, -1] = image[-1, -1]
+
+    if np.issubdtype(image.dtype, np.integer):
+        return np.rint(out).astype(image.dtype)
+    return out.astype(np.result_type(image.dtype, np.float32), copy=False)
+
+
+class ImagePyramid(QtCore.QObject):
+    """
+    Downsampled levels of an `ImageSource`, split into square tiles.
+
+    Level 0 is the source itself; level L has 2**L times fewer pixels along each axis.
+    A strided `preview` of the coarsest level is available immediately; the averaged
+    levels are computed in a background thread (`start`), which emits `sigLevelReady`
+    after each level. Level 1 is computed from the source in bands of rows, so that
+    memory-mapped sources are never read completely into memory.
+
+    Parameters:
+    - source: ImageSource
+    - tile_size: edge length of the tiles in pixels
+    - min_size: the coarsest level is the first one with both dimensions at most `min_size`
+    """
+
+    sigLevelReady = QtCore.pyqtSignal(int)
+
+    def __init__(self, source, tile_size=512, min_size=512, band_rows=2048):
+        super().__init__()
+        self.source = source
+        self.tile_size = int(tile_size)
+        self.band_rows = int(band_rows)
+
+        num_rows, num_cols = source.shape
+        self.num_levels = 1 + max(int(np.ceil(np.log2(max(num_rows, num_cols) / min_size))), 0)
+        self.levels = [None] * self.num_levels
+
+        step = 2 ** (self.num_levels - 1)
+        self.preview = source.read(slice(0, num_rows, step), slice(0, num_cols, step))
+        self.preview_step = step
+
+        self._stop = threading.Event()
+        self._thread = None
+
+    def level_shape(self, level):
+        num_rows, num_cols = self.source.shape
+        f = 2 ** level
+        return (-(-num_rows // f), -(-num_cols // f))
+
+    def is_ready(self, level):
+        return level == 0 or self.levels[level] is not None
+
+    def tile(self, level, row, col):
+        """Return the tile (row, col) of the given level as a 2D array (rows, cols)."""
+        T = self.tile_size
+        rows, cols = slice(row * T, (row + 1) * T), slice(col * T, (col + 1) * T)
+        if level == 0:
+            return self.source.read(rows, cols)
+        return self.levels[level][rows, cols]
+
+    def start(self):
+        """Build the levels in a background thread."""
+        if self._thread is None and self.num_levels > 1:
+            self._thread = threading.Thread(target=self._build, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop building the levels after the current one."""
+        self._stop.set()
+
+    def wait(self, timeout=None):
+        """Wait until the levels are built, return True if they are."""
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return all(self.is_ready(level) for level in range(self.num_levels))
+
+    def _build(self):
+        num_rows, num_cols = self.source.shape
+        band = self.band_rows // 2 * 2
+
+        # Level 1 from the source, band by band
+        level = np.empty(self.level_shape(1), dtype=self._level_dtype())
+        for r in range(0, num_rows, band):
+            if self._stop.is_set():
+                return
+            rows = self.source.read(slice(r, min(r + band, num_rows)), slice(0, num_cols))
+            level[r // 2:(r + len(rows) + 1) // 2] = downsample_2x2(rows)
+            release_pages(getattr(self.source, 'data', None))
+        self.levels[1] = level
+        self.sigLevelReady.emit(1)
+
+        # Coarser levels from the previous one
+        for L in range(2, self.num_levels):
+            if self._stop.is_set():
+                return
+            self.levels[L] = downsample_2x2(self.levels[L - 1])
+            self.sigLevelReady.emit(L)
+
+    def _level_dtype(self):
+        dtype = self.source.read(slice(0, 1), slice(0, 1)).dtype
+        return dtype if np.issubdtype(dtype, np.integer) else np.result_type(dtype, np.float32)
+
+
+class TiledImageItem(SourceImageItem):
+    """
+    Image item that draws an `ImagePyramid`.
+
+    Only the tiles intersecting the view are drawn, at the coarsest level that still has
+    at least one image pixel per screen pixel. Levels that are not built yet are replaced
+    by the next coarser available level. The strided preview stays underneath the tiles
+    as a backdrop, so the first coarse view appears immediately.
+
+    Parameters:
+    - source: ImageSource
+    - rect: (x0, y0, width, height) of the image in view coordinates
+    - levels: (min, max) display levels
+    - tile_size: edge length of the tiles in pixels
+    - **kwargs: passed to the ImageItems
+    """
+
+    def __init__(self, source, rect=None, levels=None, tile_size=512, **kwargs):
+        self.pyramid = ImagePyramid(source, tile_size=tile_size)
+        self.tiles = {}  # (level, row, col) -> ImageItem
+        super().__init__(source, rect=rect, levels=levels, **kwargs)
+
+        self.pyramid.sigLevelReady.connect(self._on_level_ready)
+        self.pyramid.start()
+
+    def image_items(self):
+        return [self.image_item] + list(self.tiles.values())
+
+    def itemChange(self, change, value):
+        # Stop building the pyramid once the item is removed from its scene
+        if change == self.GraphicsItemChange.ItemSceneHasChanged and value is None:
+            self.pyramid.stop()
+        return super().itemChange(change, value)
+
+    def _on_level_ready(self, level):
+        self._window_timer.start(0)
+
+    def _display_level(self, visible, view):
+        """Coarsest built level with at least one image pixel per screen pixel, or None."""
+        pyramid = self.pyramid
+        pixels_per_screen_pixel = max(visible.width() / max(view.width(), 1),
+                                      visible.height() / max(view.height(), 1), 1)
+        level = min(int(np.floor(np.log2(pixels_per_screen_pixel))), pyramid.num_levels - 1)
+        while level < pyramid.num_levels and not pyramid.is_ready(level):
+            level += 1
+        return level if level < pyramid.num_levels else None
+
+    def update_window(self, view_size=None):
+        """Show the tiles of the appropriate level that intersect the view."""
+        pyramid = self.pyramid
+        if view_size is not None:
+            # Initial overview: the preview spans the whole image
+            step = pyramid.preview_step
+            if self._levels is None:
+                self._levels = image_levels(pyramid.preview)
+            self.image_item.setImage(pyramid.preview, autoLevels=False, levels=self._levels)
+            self.image_item.setRect(QtCore.QRectF(0, 0, pyramid.preview.shape[1] * step,
+                                                  pyramid.preview.shape[0] * step))
+            return
+
+        view = self.getViewBox()
+        if view is None:
+            return
+        visible = self.mapRectFromView(view.viewRect()).intersected(self.boundingRect())
+        level = None if visible.isEmpty() else self._display_level(visible, view)
+
+        keys = set()
+        if level is not None:
+            T = pyramid.tile_size * 2 ** level
+            rows, cols = pyramid.level_shape(level)
+            r0, r1 = int(visible.top() // T), int(np.ceil(visible.bottom() / T))
+            c0, c1 = int(visible.left() // T), int(np.ceil(visible.right() / T))
+            keys = {(level, r, c)
+                    for r in range(r0, min(r1, -(-rows // pyramid.tile_size)))
+                    for c in range(c0, min(c1, -(-cols // pyramid.tile_size)))}
+
+        for key in set(self.tiles) - keys:
+            tile = self.tiles.pop(key)
+            if tile.scene() is not None:
+                tile.scene().removeItem(tile)
+            tile.setParentItem(None)
+
+        for key in keys - set(self.tiles):
+            level, r, c = key
+            f, T = 2 ** level, pyramid.tile_size
+            data = pyramid.tile(level, r, c)
+            tile = self._new_image_item(data)
+            tile.setRect(QtCore.QRectF(c * T * f, r * T * f, data.shape[1] * f, data.shape[0] * f))
+            tile.setZValue(1)
+            self.tiles[key] = tile
@@ -0,0 +1,186 @@
+#%%
+"""
+Shared axis ranges: `subplots(sharex=True)`, `share_axes`, `Axes.sharex` and `Axes.sharey`.
+"""
+import weakref
+
+from pyqtgraph.Qt import QtCore
+
+_AXIS_INDEX = {'x': 0, 'y': 1}
+_named_groups = weakref.WeakValueDictionary()  # (name, axis): SharedRange
+
+
+class SharedRange(QtCore.QObject):
+    """
+    Keeps the x- or y-range of a group of views equal; the views may be in different figures.
+
+    Every member notifies the group when its range changes (pan, zoom, auto-range,
+    `set_xlim`, ...), and the group broadcasts the new range to the other members once
+    the pending events have been processed, at most once per frame, so that a burst of
+    changes (e.g. of wheel events) makes a single broadcast.
+    Members that already show the range are skipped, and the range changes caused by a
+    broadcast are not broadcast again, so a zoom costs one range update per member.
+    Reading the limits of a member (`get_xlim`, `get_ylim`) applies a pending broadcast first.
+
+    As with linked pyqtgraph views, a member that joins takes the range of the group and
+    stops auto-ranging along the shared axis; members whose range is set by a broadcast
+    stop auto-ranging too, so the member that changed last leads.
+
+    Parameters:
+    - axis: 'x' or 'y'
+    - max_fps: maximal number of broadcasts per second (default: refresh rate of the screen)
+    """
+
+    def __init__(self, axis='x', max_fps=None, parent=None):
+        from pyqtplotlib.pltwrapper.timing import FrameThrottle
+
+        super().__init__(parent)
+        if axis not in _AXIS_INDEX:
+            raise ValueError(f"Unknown axis: '{axis}' (expected 'x' or 'y')")
+        self.axis = axis
+        self._index = _AXIS_INDEX[axis]
+        self._members = []  # ViewBoxes
+        self._slots = {}  # ViewBox: slot connected to its range signal
+        self._range = None  # range of the last broadcast
+        self._source = None  # member whose range change has not been broadcast yet
+        self._broadcasting = False
+        self._stats = dict(changes=0, broadcasts=0, updates=0, skipped=0)
+        # deferred: a broadcast waits for the pending events, so a burst of changes makes one
+        self._throttle = FrameThrottle(self.flush, max_fps=max_fps, defer=True, parent=self)
+
+    def __len__(self):
+        return len(self._members)
+
+    def members(self):
+        """The ViewBoxes of the group."""
+        return list(self._members)
+
+    def add(self, ax):
+        """Add an axes (or a PlotWidget, PlotItem or ViewBox) to the group; it leaves its previous group."""
+        vb = _view_box(ax)
+        if vb in self._members:
+            return
+        previous = shared_group(vb, self.axis)
+        if previous is not None:
+            previous.remove(vb)
+        if self._index == 0:
+            vb.setXLink(None)
+        else:
+            vb.setYLink(None)
+
+        slot = lambda _, __, vb=vb: self._member_changed(vb)
+        self._range_signal(vb).connect(slot)
+        self._slots[vb] = slot
+        vb.__dict__.setdefault('_shared_ranges', {})[self.axis] = self
+        self._members.append(vb)
+        if self._range is None:
+            self._range = tuple(vb.viewRange()[self._index])
+        else:
+            self._set_range(vb, self._range)
+
+    def remove(self, ax):
+        """Remove an axes from the group; it keeps its current range."""
+        vb = _view_box(ax)
+        if vb not in self._members:
+            return
+        self._members.remove(vb)
+        try:
+            self._range_signal(vb).disconnect(self._slots.pop(vb))
+        except (TypeError, RuntimeError):
+            pass  # the view has been deleted
+        vb.__dict__.get('_shared_ranges', {}).pop(self.axis, None)
+        if self._source is vb:
+            self._source = None
+
+    def _range_signal(self, vb):
+        return vb.sigXRangeChanged if self._index == 0 else vb.sigYRangeChanged
+
+    def _set_range(self, vb, view_range):
+        # disables the auto-range of the view along the axis
+        if self._index == 0:
+            vb.setXRange(*view_range, padding=0)
+        else:
+            vb.setYRange(*view_range, padding=0)
+
+    def _member_changed(self, vb):
+        if self._broadcasting:
+            return
+        if self._source is None and _same_range(vb.viewRange()[self._index], self._range):
+            return
+        self._stats['changes'] += 1
+        self._source = vb
+        self._throttle.request()
+
+    def flush(self):
+        """Broadcast the pending range change now."""
+        source, self._source = self._source, None
+        if source is None:
+            return
+        self._throttle.mark()
+        view_range = tuple(source.viewRange()[self._index])
+        self._range = view_range
+        self._stats['broadcasts'] += 1
+        self._broadcasting = True
+        try:
+            for vb in list(self._members):
+                if vb is source:
+                    continue
+                if _same_range(vb.viewRange()[self._index], view_range):
+                    self._stats['skipped'] += 1
+                    continue
+                try:
+                    self._set_range(vb, view_range)
+                except RuntimeError:
+                    self.remove(vb)  # the view has been deleted
+                    continue
+                self._stats['updates'] += 1
+        finally:
+            self._broadcasting = False
+
+    def stats(self):
+        """
+        Counters since the group was created:
+        - members: number of views in the group
+        - changes: range changes of members that had to be broadcast
+        - broadcasts: number of broadcasts (several changes in a frame make one broadcast)
+        - updates: ranges set by broadcasts
+        - skipped: members that a broadcast skipped since they already showed the range
+        """
+        return dict(members=len(self._members), **self._stats)
+
+
+def _view_box(ax):
+    return ax.getViewBox() if hasattr(ax, 'getViewBox') else ax
+
+
+def _same_range(a, b, rtol=1e-9):
+    if b is None:
+        return False
+    tolerance = rtol * max(abs(b[1] - b[0]), 1e-300)
+    return abs(a[0] - b[0]) <= tolerance and abs(a[1] - b[1]) <= tolerance
+
+
+def shared_group(ax, axis='x'):
+    """The `SharedRange` that the axes `ax` belongs to along `axis`, or None."""
+    return _view_box(ax).__dict__.get('_shared_ranges', {}).get(axis)
+
+
+def named_group(name, axis='x'):
+    """
+    The `SharedRange` registered under `name` for `axis`, created on first use. Axes of
+    different figures that join the same named group share their range.
+    """
+    group = _named_groups.get((name, axis))
+    if group is None:
+        group = _named_groups[(name, axis)] = SharedRange(axis)
+    return group
+
+
+def share(ax, other, axis='x'):
+    """Share the range of `ax` along `axis` with `other` (and the rest of its group); return the group."""
+    group = shared_group(other, axis)
+    if group is None:
+        group = SharedRange(axis)
+        group.add(other)
+    group.add(ax)
+    return group
@@ -0,0 +1,312 @@
+#%%
+import numpy as np
+from PyQt5 import QtCore
+
+from pyqtplotlib.pltwrapper.timing import FrameThrottle
+
+
+class RingBuffer:
+    """
+    Preallocated ring buffer of the last `maxlen` values of a 1D stream.
+
+    Every value is written twice, at position i and i + maxlen of a buffer of length
+    2*maxlen. The most recent values are therefore always available as one contiguous
+    view (no copy, no concatenation), which can be handed directly to pyqtgraph.
+    """
+
+    def __init__(self, maxlen, dtype=float):
+        if maxlen < 1:
+            raise ValueError("maxlen must be at least 1.")
+        self.maxlen = int(maxlen)
+        self._buffer = np.zeros(2 * self.maxlen, dtype=dtype)
+        self._head = 0   # position where the next value is written
+        self._count = 0  # number of valid values (at most maxlen)
+
+    def __len__(self):
+        return self._count
+
+    def append(self, value):
+        """Append a single value."""
+        self._buffer[self._head] = value
+        self._buffer[self._head + self.maxlen] = value
+        self._head = (self._head + 1) % self.maxlen
+        self._count = min(self._count + 1, self.maxlen)
+
+    def extend(self, values):
+        """Append an array of values; only the last `maxlen` of them are kept."""
+        values = np.asarray(values).ravel()
+        num_new = len(values)
+        if num_new == 0:
+            return
+        if num_new > self.maxlen:
+            self._head = (self._head + num_new - self.maxlen) % self.maxlen
+            values = values[-self.maxlen:]
+            num_new = self.maxlen
+
+        # At most two contiguous chunks: up to the end of the ring, then from its start
+        first = min(num_new, self.maxlen - self._head)
+        for start, chunk in ((self._head, values[:first]), (0, values[first:])):
+            if len(chunk):
+                self._buffer[start:start + len(chunk)] = chunk
+                self._buffer[start + self.maxlen:start + self.maxlen + len(chunk)] = chunk
+
+        self._head = (self._head + num_new) % self.maxlen
+        self._count = min(self._count + num_new, self.maxlen)
+
+    def clear(self):
+        self._head = 0
+        self._count = 0
+
+    def view(self):
+        """Return the valid values, oldest first, as a view into the buffer."""
+        stop = self._head + self.maxlen
+        return self._buffer[stop - self._count:stop]
+
+
+class StreamLine(QtCore.QObject):
+    """
+    Line of a live data stream, backed by preallocated ring buffers for x and y.
+
+    `append` and `extend` only write into the buffers and mark the line as dirty.
+    The PlotDataItem is updated (with views into the buffers) at most once per frame,
+    so the cost of redrawing does not grow with the rate at which samples arrive.
+    Create it with `AxesWidget.stream`.
+
+    Parameters:
+    - line: the pyqtgraph PlotDataItem displaying the stream
+    - maxlen: number of most recent samples that are kept and displayed
+    - dtype: dtype of the buffers
+    - max_fps: maximal number of redraws per second (default: refresh rate of the screen)
+
+    While the line is suspended (see `suspend`), samples are buffered but the line is not
+    redrawn; `resume` redraws it once with everything that arrived in the meantime.
+    """
+
+    def __init__(self, line, maxlen, dtype=float, max_fps=None, parent=None):
+        super().__init__(parent if parent is not None else line)
+        self.line = line
+        self.x = RingBuffer(maxlen, dtype=dtype)
+        self.y = RingBuffer(maxlen, dtype=dtype)
+        self._suspended = False
+        self._dirty = False  # samples arrived while suspended
+
+        self._redraw_throttle = FrameThrottle(self.flush, max_fps=max_fps, defer=True, parent=self)
+
+    @property
+    def maxlen(self):
+        return self.x.maxlen
+
+    def __len__(self):
+        return len(self.y)
+
+    def append(self, x, y):
+        """Append a single sample."""
+        self.x.append(x)
+        self.y.append(y)
+        self._schedule_redraw()
+
+    def extend(self, xs, ys):
+        """Append arrays of samples."""
+        if np.shape(xs) != np.shape(ys):
+            raise ValueError("xs and ys must have the same shape.")
+        self.x.extend(xs)
+        self.y.extend(ys)
+        self._schedule_redraw()
+
+    def clear(self):
+        """Remove all samples."""
+        self.x.clear()
+        self.y.clear()
+        self._schedule_redraw()
+
+    def get_data(self):
+        """Return the buffered samples (oldest first) as views into the ring buffers."""
+        return self.x.view(), self.y.view()
+
+    def _schedule_redraw(self):
+        if self._suspended:
+            self._dirty = True
+        else:
+            self._redraw_throttle.request()
+
+    def flush(self):
+        """Push the buffered samples to the line immediately."""
+        self._redraw_throttle.mark()
+        self._dirty = False
+        self.line.setData(*self.get_data())
+
+    @property
+    def suspended(self):
+        return self._suspended
+
+    def suspend(self):
+        """Stop redrawing the line (e.g. while it is hidden); samples are still buffered."""
+        if self._redraw_throttle.pending():
+            self._redraw_throttle.cancel()
+            self._dirty = True
+        self._suspended = True
+
+    def resume(self):
+        """Redraw the line again, at once if samples arrived while it was suspended."""
+        self._suspended = False
+        if self._dirty:
+            self.flush()
+
+
+class DataFeed(QtCore.QObject):
+    """
+    Thread-safe bridge from producer threads to a `StreamLine` on the GUI thread.
+
+    Worker threads call `put(xs, ys)` with NumPy chunks; the chunks are copied into a
+    queue and the GUI thread is woken through a queued signal. At most once per frame it
+    writes all pending chunks into the ring buffers of the stream and updates the line
+    with a single `setData`. Create it with `AxesWidget.feed`. While the stream is
+    suspended, the chunks are still taken into its ring buffers, so producers are not
+    blocked and the memory stays bounded, but the line is not updated.
+
+    When the pending samples would exceed `max_pending`, the policy decides:
+    - 'drop_oldest': the oldest pending chunks are discarded (a live view loses nothing
+      it would show when `max_pending` is at least the length of the stream)
+    - 'drop_newest': the new chunk is rejected and `put` returns False
+    - 'block': `put` waits until the GUI thread has taken the pending chunks (backpressure),
+      or returns False after `timeout` seconds
+
+    Parameters:
+    - stream: the `StreamLine` that displays the data
+    - max_pending: maximal number of samples waiting for the GUI thread (default: the
+                   length of the stream)
+    - policy: 'drop_oldest', 'drop_newest' or 'block'
+    - max_fps: maximal number of updates per second (default: refresh rate of the screen)
+    """
+
+    _data_available = QtCore.pyqtSignal()
+
+    def __init__(self, stream, max_pending=None, policy='drop_oldest', max_fps=None, parent=None):
+        import threading
+        from collections import deque
+
+        if policy not in ('drop_oldest', 'drop_newest', 'block'):
+            raise ValueError(f"Unknown policy '{policy}', expected 'drop_oldest', 'drop_newest' or 'block'.")
+        super().__init__(parent if parent is not None else stream)
+        self.stream = stream
+        self.policy = policy
+        self.max_pending = int(max_pending if max_pending is not None else stream.maxlen)
+
+        self._chunks = deque()  # pending (xs, ys)
+        self._pending = 0       # number of pending samples
+        self._closed = False
+        self._lock = threading.Lock()
+        self._drained = threading.Condition(self._lock)  # notified when chunks are taken
+        self._counters = dict(received_samples=0, dropped_samples=0, rejected_chunks=0,
+                              max_pending_seen=0, flushes=0)
+
+        self._flush_throttle = FrameThrottle(self.flush, max_fps=max_fps, defer=True, parent=self)
+        # emitted from producer threads, delivered on the thread of the feed
+        self._data_available.connect(self._flush_throttle.request, QtCore.Qt.QueuedConnection)
+
+    def put(self, xs, ys, timeout=None):
+        """
+        Queue a chunk of samples; may be called from any thread.
+
+        Parameters:
+        - xs, ys: arrays (or scalars) of the same shape; they are copied
+        - timeout: for the 'block' policy, maximal number of seconds to wait (default: no limit)
+
+        Returns:
+        - True if the chunk was queued, False if it was rejected or the feed is closed
+        """
+        xs = np.array(xs, dtype=self.stream.x._buffer.dtype, ndmin=1).ravel()
+        ys = np.array(ys, dtype=self.stream.y._buffer.dtype, ndmin=1).ravel()
+        if xs.shape != ys.shape:
+            raise ValueError("xs and ys must have the same shape.")
+        num_new = len(xs)
+
+        if self.policy == 'block' and QtCore.QThread.currentThread() is self.thread() \
+                and self._pending + num_new > self.max_pending:
+            self.flush()  # waiting would block the thread that drains the queue
+
+        with self._lock:
+            if self._closed:
+                return False
+            if self._pending + num_new > self.max_pending and self._chunks:
+                if self.policy == 'block':
+                    if not self._drained.wait_for(
+                            lambda: self._closed or not self._chunks
+                            or self._pending + num_new <= self.max_pending, timeout):
+                        self._reject(num_new)
+                        return False
+                    if self._closed:
+                        return False
+                elif self.policy == 'drop_newest':
+                    self._reject(num_new)
+                    return False
+                else:
+                    while self._chunks and self._pending + num_new > self.max_pending:
+                        dropped = len(self._chunks.popleft()[0])
+                        self._pending -= dropped
+                        self._counters['dropped_samples'] += dropped
+            if self.policy == 'drop_oldest' and num_new > self.max_pending:
+                self._counters['dropped_samples'] += num_new - self.max_pending
+                xs, ys = xs[-self.max_pending:], ys[-self.max_pending:]
+            wake = not self._chunks
+            self._chunks.append((xs, ys))
+            self._pending += len(xs)
+            self._counters['received_samples'] += num_new
+            self._counters['max_pending_seen'] = max(self._counters['max_pending_seen'], self._pending)
+        if wake:
+            self._data_available.emit()
+        return True
+
+    def _reject(self, num_new):
+        self._counters['dropped_samples'] += num_new
+        self._counters['rejected_chunks'] += 1
+
+    def flush(self):
+        """Write the pending chunks into the stream and update the line once (GUI thread)."""
+        self._flush_throttle.mark()
+        with self._lock:
+            chunks, self._chunks = self._chunks, type(self._chunks)()
+            self._pending = 0
+            self._drained.notify_all()
+        if not chunks:
+            return
+        # only the samples that fit into the ring buffers are written
+        num_total = sum(len(xs) for xs, _ in chunks)
+        skip = max(num_total - self.stream.maxlen, 0)
+        for xs, ys in chunks:
+            if skip >= len(xs):
+                skip -= len(xs)
+                continue
+            self.stream.x.extend(xs[skip:])
+            self.stream.y.extend(ys[skip:])
+            skip = 0
+        self._counters['flushes'] += 1
+        if self.stream.suspended:
+            self.stream._dirty = True  # drawn when the stream is resumed
+        else:
+            self.stream.flush()
+
+    def close(self):
+        """Stop accepting chunks and release producers waiting in `put`."""
+        with self._lock:
+            self._closed = True
+            self._drained.notify_all()
+
+    @property
+    def queue_depth(self):
+        """Number of samples waiting for the GUI thread."""
+        return self._pending
+
+    @property
+    def dropped_samples(self):
+        """Number of samples discarded by the policy since the feed was created."""
+        return self._counters['dropped_samples']
+
+    def stats(self):
+        """
+        Counters of the feed: 'queue_depth' (pending samples), 'pending_chunks',
+        'received_samples', 'dropped_samples', 'rejected_chunks', 'max_pending_seen'
+        (highest queue depth) and 'flushes' (times the pending chunks were taken).
+        """
+        with self._lock:
+            return dict(queue_depth=self._pending, pending_chunks=len(self._chunks), **self._counters)
@@ -0,0 +1,78 @@
+#%%
+"""
+Shared colors, pens and brushes for the plotting methods of `AxesWidget`.
+"""
+from collections import OrderedDict
+
+import numpy as np
+import pyqtgraph as pg
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QColor
+
+
+def _color_key(color):
+    """Hashable key for anything `pg.mkColor` accepts, or None if there is none."""
+    if isinstance(color, QColor):
+        return ('rgba', color.rgba())
+    if isinstance(color, np.ndarray):
+        color = color.tolist()
+    if isinstance(color, list):
+        color = tuple(color)
+    try:
+        hash(color)
+    except TypeError:
+        return None
+    return color
+
+
+class StyleCache:
+    """
+    Least-recently-used cache of at most `max_size` QColors, QPens and QBrushes.
+
+    The returned objects are shared between all callers asking for the same style and
+    must not be modified; pyqtgraph items copy the pens and brushes they are given.
+    """
+
+    def __init__(self, max_size=1024):
+        self.max_size = max_size
+        self._items = OrderedDict()
+
+    def __len__(self):
+        return len(self._items)
+
+    def _get(self, key, make):
+        if key[1] is None:
+            return make()  # unhashable color specification
+        if key in self._items:
+            self._items.move_to_end(key)
+            return self._items[key]
+        item = make()
+        self._items[key] = item
+        while len(self._items) > self.max_size:
+            self._items.popitem(last=False)
+        return item
+
+    def color(self, color, alpha=None):
+        """QColor of `color` (anything `pg.mkColor` accepts) with an optional alpha (0 to 1)."""
+        def make():
+            qcolor = pg.mkColor(color)
+            if alpha is not None:
+                qcolor.setAlphaF(alpha)
+            return qcolor
+        return self._get(('color', _color_key(color), alpha), make)
+
+    def pen(self, color='k', width=1, style=Qt.SolidLine, alpha=None):
+        """Cosmetic QPen of the given color, width, style and alpha."""
+        return self._get(('pen', _color_key(color), width, style, alpha),
+                         lambda: pg.mkPen(color=self.color(color, alpha), width=width, style=style))
+
+    def brush(self, color, alpha=None):
+        """QBrush of the given color and alpha."""
+        return self._get(('brush', _color_key(color), alpha),
+                         lambda: pg.mkBrush(self.color(color, alpha)))
+
+    def clear(self):
+        self._items.clear()
+
+
+style_cache = StyleCache()
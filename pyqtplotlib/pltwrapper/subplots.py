@@ -2,33 +2,30 @@
 from pyqtplotlib.pltwrapper import AxesWidget
 from PyQt5 import QtCore, QtWidgets
 import numpy as np
+import pyqtgraph as pg
 
 from typing import Tuple
 from pyqtplotlib.pltwrapper.figure import Figure
-from pyqtplotlib.pltwrapper.axes import AxesWidget
+from pyqtplotlib.pltwrapper.axes import AxesWidget, AxesItem
 
 class Subplots(Figure):
     
     ppy = 96 # typical pixels per inch (for conversion from matplotlib inches to Qt pixels)
     
-    def __init__(self, nrows=1, ncols=1, sharex=False, sharey=False, figsize=None, axwidget=AxesWidget, parent=None, **figure_kwargs):
+    def __init__(self, nrows=1, ncols=1, sharex=False, sharey=False, figsize=None, axwidget=AxesWidget, parent=None,
+                 single_scene=False, **figure_kwargs):
+        if single_scene and axwidget is not AxesWidget \
+                and not (isinstance(axwidget, type) and issubclass(axwidget, AxesItem)):
+            raise ValueError("With single_scene=True, axwidget must be AxesWidget or a subclass of AxesItem, "
+                             f"not {getattr(axwidget, '__name__', axwidget)}.")
         super().__init__(parent=parent, **figure_kwargs)
             
         self.axs = np.empty((nrows, ncols), dtype=object)
 
-        main_splitter = QtWidgets.QSplitter(
-            QtCore.Qt.Vertical)  # Main splitter to hold rows
-        self.layout.addWidget(main_splitter)
-
-        for i in range(nrows):
-            row_splitter = QtWidgets.QSplitter(
-                QtCore.Qt.Horizontal)  # Splitter for each row
-            main_splitter.addWidget(row_splitter)
-            for j in range(ncols):
-                ax = axwidget()
-                ax.figure = self
-                row_splitter.addWidget(ax)
-                self.axs[i, j] = ax
+        if single_scene:
+            self._init_single_scene(nrows, ncols, AxesItem if axwidget is AxesWidget else axwidget)
+        else:
+            self._init_splitters(nrows, ncols, axwidget)
 
         # Synchronize axes if necessary
         if sharex:
@@ -43,8 +40,46 @@ class Subplots(Figure):
             geom = (0, 0, int(figsize[0]*Subplots.ppy), int(figsize[1]*Subplots.ppy))
             print(geom)
             self.setGeometry(*geom)
-            
-            
+
+    def _init_splitters(self, nrows, ncols, axwidget):
+        """One AxesWidget per cell, in resizable splitters."""
+        main_splitter = QtWidgets.QSplitter(
+            QtCore.Qt.Vertical)  # Main splitter to hold rows
+        self.layout.addWidget(main_splitter)
+
+        for i in range(nrows):
+            row_splitter = QtWidgets.QSplitter(
+                QtCore.Qt.Horizontal)  # Splitter for each row
+            main_splitter.addWidget(row_splitter)
+            for j in range(ncols):
+                ax = axwidget()
+                ax.figure = self
+                row_splitter.addWidget(ax)
+                self.axs[i, j] = ax
+
+    def _init_single_scene(self, nrows, ncols, axitem):
+        """One AxesItem per cell, all in the grid layout of a single graphics view."""
+        self.view = pg.GraphicsLayoutWidget()
+        self.view.setAntialiasing(True)
+        self.layout.addWidget(self.view)
+
+        # GraphicsLayout.addItem lays out the whole grid after each item; do it once instead
+        grid = self.view.ci.layout
+        grid.activate = lambda: None
+        for i in range(nrows):
+            for j in range(ncols):
+                ax = axitem(parent=self)
+                ax.figure = self
+                self.view.addItem(ax.plot_item, row=i, col=j)
+                self.view.scene().sigMouseMoved.connect(ax._hoveredEvent)
+                self.axs[i, j] = ax
+        del grid.activate
+        grid.activate()
+
+    def _axes(self):
+        """All axes, in the order of `axs.flat`."""
+        return list(self.axs.flat)
+
     def get_fig_and_axs(self):
         """Return the figure and a 2D numpy array of Axes unless there is only one axis."""
         
@@ -55,20 +90,28 @@ class Subplots(Figure):
         else:
             return fig, self.axs
 
-def share_axes(axs, axis='x'):
-    """Synchronize the given axis (x or y) for the given list of `pg.PlotWidget` widgets."""
-    # Use the first plot widget as master
-    
-    master = np.array(axs).flat[0]
-    for pw in np.array(axs).flat:
-        if pw != master:
-            if axis == 'x':
-                pw.getViewBox().setXLink(master.getViewBox())
-            elif axis == 'y':
-                pw.getViewBox().setYLink(master.getViewBox())
+def share_axes(axs, axis='x', group=None):
+    """
+    Synchronize the given axis (x or y) of the given axes through one `SharedRange`.
+
+    Parameters:
+    - axs: axes (or `pg.PlotWidget` widgets), in an array of any shape
+    - axis: 'x' or 'y'
+    - group: `SharedRange` to add the axes to, or the name of a group (created on first
+             use), to share the range with axes of other figures. Default: a new group.
+
+    Returns:
+    - the `SharedRange`, whose range the first of the axes sets if the group is new
+    """
+    from pyqtplotlib.pltwrapper.sharing import SharedRange, named_group
 
-    # Connect the master's view change signal to the sync function
-    # master.getViewBox().sigRangeChanged.connect(sync_views)
+    if group is None:
+        group = SharedRange(axis)
+    elif isinstance(group, str):
+        group = named_group(group, axis)
+    for ax in np.array(axs).flat:
+        group.add(ax)
+    return group
 
 
 def output_figure_and_axes(func):
@@ -78,7 +121,8 @@ def output_figure_and_axes(func):
     return wrapper
 
 @output_figure_and_axes
-def subplots(nrows=1, ncols=1, sharex=False, sharey=False, figsize=None, axwidget=AxesWidget, parent=None):
+def subplots(nrows=1, ncols=1, sharex=False, sharey=False, figsize=None, axwidget=AxesWidget, parent=None,
+             single_scene=False):
     """Create a figure with a set of subplots (wrapper function for calling the `Subplots` class)
 
     This utility wrapper makes it convenient to create common layouts of
@@ -91,6 +135,12 @@ def subplots(nrows=1, ncols=1, sharex=False, sharey=False, figsize=None, axwidge
     sharex, sharey : bool, default: False
     figsize: tuple of (width, height) in inches, default: None
     axwidget : Widget to use, default: AxesWidget (the base class for all axes widgets)
+    single_scene : bool, default: False
+        If True, all axes are `AxesItem`s in one shared graphics scene instead of separate
+        widgets. They have the same plotting methods, and large grids are much faster to
+        build and use much less memory, but the cells cannot be resized with splitters.
+        `axwidget` must then be AxesWidget (replaced by AxesItem) or a subclass of AxesItem,
+        otherwise a ValueError is raised.
     
     Returns
     -------
@@ -99,7 +149,8 @@ def subplots(nrows=1, ncols=1, sharex=False, sharey=False, figsize=None, axwidge
     axs : array of Axes
     """
     _subplots = Subplots(nrows, ncols, sharex=sharex,
-                         sharey=sharey, figsize=figsize, axwidget=axwidget, parent=parent)
+                         sharey=sharey, figsize=figsize, axwidget=axwidget, parent=parent,
+                         single_scene=single_scene)
     fig, axs = _subplots.get_fig_and_axs()
     return fig, axs
     
@@ -0,0 +1,73 @@
+#%%
+"""
+Pacing of updates to the refresh rate of the screen: `FrameThrottle` coalesces requests
+(mouse moves, range changes, new samples) into at most one call per frame.
+"""
+import math
+import time
+
+from PyQt5 import QtCore, QtWidgets
+
+
+def display_refresh_rate(default=60.0):
+    """Refresh rate of the primary screen in Hz, or `default` if it cannot be determined."""
+    app = QtWidgets.QApplication.instance()
+    screen = app.primaryScreen() if app is not None else None
+    rate = screen.refreshRate() if screen is not None else 0
+    return rate if rate and rate > 1 else default
+
+
+class FrameThrottle(QtCore.QObject):
+    """
+    Calls `callback` at most once per frame, however often it is requested.
+
+    A request made at least one frame after the last call is served at once, so the
+    first mouse move after a pause is shown without delay; the requests made within a
+    frame of it are coalesced into one call at the end of that frame. With `defer`,
+    every call waits at least until the pending events have been processed, so that
+    a burst of requests (e.g. of wheel events) makes a single call.
+
+    Parameters:
+    - callback: function called without arguments
+    - max_fps: maximal number of calls per second (default: refresh rate of the screen)
+    - defer: never call `callback` from within `request`
+    - parent: QObject owning the throttle and its timer
+    """
+
+    def __init__(self, callback, max_fps=None, defer=False, parent=None):
+        super().__init__(parent)
+        self.callback = callback
+        self.interval = 1 / (max_fps or display_refresh_rate())
+        self.defer = defer
+        self.last_call = float('-inf')  # time.perf_counter() of the last call
+        self._timer = QtCore.QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setTimerType(QtCore.Qt.PreciseTimer)  # coarse timers may fire 5% early
+        self._timer.timeout.connect(self._call)
+
+    def request(self):
+        """Call `callback` now if the last call is a frame old, else once it is (a pending call is kept)."""
+        if self._timer.isActive():
+            return
+        wait = self.last_call + self.interval - time.perf_counter()
+        if wait <= 0 and not self.defer:
+            self._call()
+        else:
+            self._timer.start(math.ceil(1000 * max(wait, 0.0)))
+
+    def pending(self):
+        """Whether a call is scheduled."""
+        return self._timer.isActive()
+
+    def cancel(self):
+        """Drop the pending call."""
+        self._timer.stop()
+
+    def mark(self):
+        """Record a call made now outside of the throttle: cancel the pending call and delay the next one by a frame."""
+        self.cancel()
+        self.last_call = time.perf_counter()
+
+    def _call(self):
+        self.mark()
+        self.callback()
@@ -0,0 +1,345 @@
+#%%
+"""
+Many traces with a shared x-axis, drawn by a single item (`AxesWidget.plot_many`).
+"""
+import warnings
+
+import numpy as np
+import pyqtgraph as pg
+from pyqtgraph.Qt import QtCore, QtGui
+
+from pyqtplotlib.pltwrapper.decimation import is_monotonic
+
+
+def _qt_lines(x, Y):
+    """Connected line segments of the rows of Y as a Qt QLineF array (rows are not joined)."""
+    from pyqtgraph.Qt import internals
+
+    lines = internals.PrimitiveArray(QtCore.QLineF, 4)
+    valid = np.isfinite(Y[:, :-1]) & np.isfinite(Y[:, 1:])
+    num_rows, num_segments = valid.shape
+    if valid.all():
+        lines.resize(num_rows * num_segments)
+        memory = lines.ndarray().reshape(num_rows, num_segments, 4)
+        memory[:, :, 0] = x[:-1]
+        memory[:, :, 1] = Y[:, :-1]
+        memory[:, :, 2] = x[1:]
+        memory[:, :, 3] = Y[:, 1:]
+    else:
+        rows, cols = np.nonzero(valid)
+        lines.resize(len(rows))
+        memory = lines.ndarray()
+        memory[:, 0] = x[cols]
+        memory[:, 1] = Y[rows, cols]
+        memory[:, 2] = x[cols + 1]
+        memory[:, 3] = Y[rows, cols + 1]
+    return lines
+
+
+def rasterize_traces(x, Y, width, height, x_scale, x_offset, y_scale, y_offset, trace_ids):
+    """
+    Rasterize the polylines (x, Y[k]) into an image of the trace covering each pixel.
+
+    The polyline of a trace covers, in every pixel column, the rows between the minimum
+    and maximum of its samples in the column and of its values (linearly interpolated)
+    at the two column edges. This is what a 1 pixel wide, non-antialiased line draws,
+    computed for all traces at once with numpy instead of one Qt call per segment.
+    Later traces are drawn over earlier ones.
+
+    Parameters:
+    - x: 1D array of sorted x values
+    - Y: 2D array (traces, samples)
+    - width, height: size of the image in pixels
+    - x_scale, x_offset, y_scale, y_offset: map data to pixel coordinates (pixel = data*scale + offset)
+    - trace_ids: increasing int32 array, the index of each row of Y in the image
+
+    Returns:
+    - int32 array of shape (height, width) with the index of the top trace of each pixel
+      (-1 for pixels not covered by any trace)
+    """
+    owner_flat = np.full(height * width + 1, -1, dtype=np.int32)
+    owner = owner_flat[:-1].reshape(height, width)
+    if len(x) < 2 or len(Y) == 0:
+        return owner
+    xd = x * x_scale + x_offset
+
+    # Polyline values at the column edges
+    edges = np.arange(width + 1, dtype=float)
+    idx = np.clip(np.searchsorted(xd, edges, side='right'), 1, len(x) - 1)
+    span = xd[idx] - xd[idx - 1]
+    weight = np.divide(edges - xd[idx - 1], span, out=np.zeros_like(edges), where=span > 0).astype(np.float32)
+    outside = (edges < xd[0]) | (edges > xd[-1])
+
+    # Samples grouped by pixel column
+    cols = np.floor(xd).astype(np.intp)
+    s0, s1 = np.searchsorted(cols, 0, side='left'), np.searchsorted(cols, width, side='left')
+    starts = np.flatnonzero(np.diff(cols[s0:s1], prepend=-1)) if s1 > s0 else np.zeros(0, np.intp)
+    counts = np.diff(np.append(starts, s1 - s0))
+    group_cols = cols[s0:s1][starts]
+
+    # Process the traces in chunks to bound the temporary memory
+    chunk = max(1, (1 << 22) // (width + 1))
+    for c0 in range(0, len(Y), chunk):
+        Yd = Y[c0:c0 + chunk].astype(np.float32) * np.float32(y_scale) + np.float32(y_offset)
+
+        at_edges = Yd[:, idx - 1] + (Yd[:, idx] - Yd[:, idx - 1]) * weight
+        at_edges[:, outside] = np.nan
+        lo = np.fmin(at_edges[:, :-1], at_edges[:, 1:])
+        hi = np.fmax(at_edges[:, :-1], at_edges[:, 1:])
+        del at_edges
+        if len(starts) and counts.max() <= 16:
+            # Few samples per column: compare the r-th samples of all columns at once
+            for r in range(counts.max()):
+                sel = counts > r
+                cols_r = group_cols[sel]
+                samples = Yd[:, s0 + starts[sel] + r]
+                lo[:, cols_r] = np.fmin(lo[:, cols_r], samples)
+                hi[:, cols_r] = np.fmax(hi[:, cols_r], samples)
+        elif len(starts):
+            lo[:, group_cols] = np.fmin(lo[:, group_cols], np.fmin.reduceat(Yd[:, s0:s1], starts, axis=1))
+            hi[:, group_cols] = np.fmax(hi[:, group_cols], np.fmax.reduceat(Yd[:, s0:s1], starts, axis=1))
+
+        # Covered pixel rows [r0, r0 + length] of each (trace, column); NaN compares False.
+        # Columns not covered by a trace write to the extra pixel at the end of owner_flat.
+        hidden = ~((hi >= 0) & (lo < height))
+        lo[hidden] = hi[hidden] = 0
+        np.clip(lo, 0, height - 1, out=lo)
+        np.clip(hi, 0, height - 1, out=hi)
+        pixels = lo.astype(np.int32)
+        lengths = hi.astype(np.int32)
+        lengths -= pixels
+        pixels *= width
+        pixels += np.arange(width, dtype=np.int32)
+        pixels[hidden] = height * width
+        lengths[hidden] = 0
+        del lo, hi, hidden
+
+        # The top trace of a pixel is the one with the largest index: np.maximum.at is
+        # independent of the order in which the spans are written
+        pixels, lengths = pixels.ravel(), lengths.ravel()
+        ids = np.repeat(trace_ids[c0:c0 + chunk], width)
+        np.maximum.at(owner_flat, pixels, ids)
+        longer = np.flatnonzero(lengths)
+        pixels, ids, lengths = pixels[longer], ids[longer], lengths[longer]
+        for offset in range(1, lengths.max(initial=0) + 1):
+            if offset > 1:
+                longer = lengths >= offset
+                pixels, ids, lengths = pixels[longer], ids[longer], lengths[longer]
+            np.maximum.at(owner_flat, pixels + offset * width, ids)
+
+    return owner
+
+
+class TracesItem(pg.GraphicsObject):
+    """
+    Many traces sharing one x-axis (the rows of a 2D array), drawn by a single item.
+
+    Only the traces and samples in the view are drawn. When few line segments are
+    visible, they are drawn as Qt line arrays (one `drawLines` call per pen). When
+    there are more than `max_segments`, the traces are rasterized at screen resolution
+    with numpy and drawn as a single image, which keeps the overview of thousands of
+    traces interactive; this needs solid pens of width 1. An optional highlighted trace
+    is drawn on top with its own pen.
+
+    Parameters:
+    - x: 1D array of sorted x values shared by all traces
+    - Y: 2D array of shape (traces, samples)
+    - pens: sequence of QPens shared between traces
+    - pen_index: integer array with the index into `pens` of each trace (default: all 0)
+    - antialias: whether lines drawn with Qt are antialiased
+    """
+
+    max_segments = 1 << 19
+    rest_interval = 100
+
+    def __init__(self, x, Y, pens=None, pen_index=None, antialias=False):
+        super().__init__()
+        self._antialias = antialias
+        self._highlight = None  # (trace index, pen)
+        self._cache = None      # (view key, [(pen, QLineF array)] or (QImage, position), device transform)
+        self._render_due = False
+        self.setData(x, Y, pens, pen_index)
+
+        # While the view moves, the last raster image is stretched to the new view; it is
+        # re-rendered once the view has rested for `rest_interval` ms
+        self._rest_timer = QtCore.QTimer(self)
+        self._rest_timer.setSingleShot(True)
+        self._rest_timer.setInterval(self.rest_interval)
+        self._rest_timer.timeout.connect(self._on_rest)
+
+    def setData(self, x, Y, pens=None, pen_index=None):
+        """Replace the traces. `pens` and `pen_index` as in the constructor."""
+        Y = np.asarray(Y)
+        if Y.ndim != 2:
+            raise ValueError("Y must be a 2D array of shape (traces, samples).")
+        x = np.arange(Y.shape[1], dtype=float) if x is None else np.asarray(x, dtype=float)
+        if x.shape != Y.shape[1:]:
+            raise ValueError("x must have one value per column of Y.")
+        self.x, self.Y = x, Y
+        self._monotonic = is_monotonic(x)
+
+        if pens is not None:
+            self._pens = [pg.mkPen(pen) for pen in pens]
+        elif not hasattr(self, '_pens'):
+            self._pens = [pg.mkPen('k')]
+        if pen_index is None:
+            pen_index = np.zeros(len(Y), dtype=np.intp)
+        self._pen_index = np.broadcast_to(np.asarray(pen_index, dtype=np.intp), (len(Y),))
+
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)  # all-NaN traces
+            self._trace_min = np.nanmin(Y, axis=1) if Y.size else np.zeros(len(Y))
+            self._trace_max = np.nanmax(Y, axis=1) if Y.size else np.zeros(len(Y))
+        finite = np.isfinite(self._trace_min)
+        if finite.any() and len(x):
+            self._bounds = ((np.nanmin(x), np.nanmax(x)),
+                            (self._trace_min[finite].min(), self._trace_max[finite].max()))
+        else:
+            self._bounds = None
+
+        self._cache = None
+        self.prepareGeometryChange()
+        self.informViewBoundsChanged()
+        self.update()
+
+    def __len__(self):
+        return len(self.Y)
+
+    def pens(self):
+        return list(self._pens)
+
+    def setPens(self, pens, pen_index=None):
+        """Set the pens (and the index into `pens` of each trace)."""
+        self._pens = [pg.mkPen(pen) for pen in pens]
+        if pen_index is not None:
+            self._pen_index = np.broadcast_to(np.asarray(pen_index, dtype=np.intp), (len(self.Y),))
+        self._cache = None
+        self.update()
+
+    def setHighlight(self, index, pen=None):
+        """
+        Draw the trace `index` on top of the others, with `pen` (default: its own color,
+        3 pixels wide). `index=None` removes the highlight.
+        """
+        if index is None:
+            self._highlight = None
+        else:
+            index = int(index) % len(self.Y)
+            if pen is None:
+                pen = pg.mkPen(self._pens[self._pen_index[index]].color(), width=3)
+            self._highlight = (index, pg.mkPen(pen))
+        self.update()
+
+    def highlight(self):
+        """Index of the highlighted trace, or None."""
+        return None if self._highlight is None else self._highlight[0]
+
+    def dataBounds(self, ax, frac=1.0, orthoRange=None):
+        if self._bounds is None:
+            return (None, None)
+        return self._bounds[ax]
+
+    def boundingRect(self):
+        if self._bounds is None:
+            return QtCore.QRectF()
+        (x0, x1), (y0, y1) = self._bounds
+        px, py = self.pixelVectors()
+        px = 0 if px is None else px.length() * 2
+        py = 0 if py is None else py.length() * 2
+        return QtCore.QRectF(x0, y0, x1 - x0, y1 - y0).adjusted(-px, -py, px, py)
+
+    def viewTransformChanged(self):
+        self.prepareGeometryChange()
+        super().viewTransformChanged()
+        if hasattr(self, '_rest_timer') and self._rest_timer.isActive():
+            self._rest_timer.start()  # the view is still moving
+
+    def _visible(self):
+        """Indices of the traces and slice of the samples within the view (plus one neighbour)."""
+        view = self.getViewBox()
+        if view is None:
+            return np.arange(len(self.Y)), slice(0, len(self.x))
+        rect = self.mapRectFromView(view.viewRect())
+        traces = np.flatnonzero((self._trace_max >= rect.top()) & (self._trace_min <= rect.bottom()))
+        if not self._monotonic:
+            return traces, slice(0, len(self.x))
+        i0 = max(int(np.searchsorted(self.x, rect.left(), side='left')) - 1, 0)
+        i1 = min(int(np.searchsorted(self.x, rect.right(), side='right')) + 1, len(self.x))
+        return traces, slice(i0, i1)
+
+    def _can_rasterize(self, transform):
+        return (self._monotonic and transform.m12() == 0 and transform.m21() == 0 and transform.m11() > 0
+                and all(pen.style() == QtCore.Qt.SolidLine and pen.widthF() <= 1 and pen.isCosmetic()
+                        for pen in self._pens))
+
+    def _render(self, transform, device_rect):
+        traces, samples = self._visible()
+        num_segments = len(traces) * max(samples.stop - samples.start - 1, 0)
+        x = self.x[samples]
+
+        if num_segments <= self.max_segments or not self._can_rasterize(transform):
+            # Qt line arrays, one per pen
+            order = traces[np.argsort(self._pen_index[traces], kind='stable')]
+            counts = np.bincount(self._pen_index[traces], minlength=len(self._pens))
+            groups = []
+            for pen, sel in zip(self._pens, np.split(order, np.cumsum(counts)[:-1])):
+                if len(sel) and len(x) > 1:
+                    groups.append((pen, _qt_lines(x, self.Y[sel, samples])))
+            return groups
+
+        # Raster image at device resolution
+        left, top = int(np.floor(device_rect.left())), int(np.floor(device_rect.top()))
+        width, height = int(np.ceil(device_rect.right())) - left, int(np.ceil(device_rect.bottom())) - top
+        owner = rasterize_traces(x, self.Y[traces, samples], width, height,
+                                 transform.m11(), transform.m31() - left, transform.m22(), transform.m32() - top,
+                                 traces.astype(np.int32))
+
+        colors = np.array([pen.color().rgba() for pen in self._pens], dtype=np.uint32)
+        table = np.append(colors[self._pen_index], np.uint32(0))  # index -1: transparent
+        pixels = np.ascontiguousarray(table[owner])
+        image = QtGui.QImage(pixels.data, width, height, 4 * width, QtGui.QImage.Format.Format_ARGB32)
+        image.pixels = pixels  # keep the buffer alive as long as the image
+        return (image, QtCore.QPoint(left, top))
+
+    def _on_rest(self):
+        self._render_due = True
+        self.update()
+
+    def paint(self, painter, *args):
+        if self._bounds is None:
+            return
+        transform = painter.deviceTransform()
+        view = self.getViewBox()
+        visible = self.boundingRect() if view is None else \
+            self.mapRectFromView(view.viewRect()).intersected(self.boundingRect())
+        device_rect = transform.mapRect(visible)
+        key = (transform.m11(), transform.m12(), transform.m21(), transform.m22(),
+               transform.m31(), transform.m32(), device_rect.getRect())
+        cache = self._cache
+        if cache is None or cache[0] != key:
+            if cache is not None and isinstance(cache[1], tuple) and not self._render_due:
+                if not self._rest_timer.isActive():
+                    self._rest_timer.start()
+            else:
+                cache = self._cache = (key, self._render(transform, device_rect), transform)
+                self._render_due = False
+
+        key, rendered, rendered_transform = cache
+        painter.setRenderHint(painter.RenderHint.Antialiasing, self._antialias)
+        if isinstance(rendered, tuple):
+            # Raster image in the device pixels of the view it was rendered for
+            image, position = rendered
+            inverse, _ = rendered_transform.inverted()
+            painter.save()
+            painter.setTransform(inverse * transform)
+            painter.drawImage(position, image)
+            painter.restore()
+        else:
+            for pen, lines in rendered:
+                painter.setPen(pen)
+                painter.drawLines(*lines.drawargs())
+
+        if self._highlight is not None:
+            index, pen = self._highlight
+            painter.setPen(pen)
+            painter.drawLines(*_qt_lines(self.x, self.Y[index:index + 1]).drawargs())
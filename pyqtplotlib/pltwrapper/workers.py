@@ -0,0 +1,151 @@
+#%%
+"""
+Background preparation of the data that an item displays (`background=True` in `plot`,
+`scatter` and `imshow`): decimation to the view, reading windows of data sources,
+colormapping and level estimation run in a thread pool instead of the GUI thread.
+
+Each item submits its jobs through a `LatestJob`. A job made stale by a newer one (e.g.
+for an older view range) is dropped if it has not started yet, and aborted at its next
+checkpoint otherwise. Results are delivered to the GUI thread through a queued signal and
+only the result of the newest job is applied, in a single call, so an item never shows a
+mix of old and new data. Meanwhile, the item keeps showing what it has.
+"""
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from pyqtgraph.Qt import QtCore
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+class JobCancelled(Exception):
+    """Raised by the checkpoint of a job that has been superseded by a newer one."""
+
+
+def worker_pool():
+    """The thread pool shared by the background jobs of all items, created on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(thread_name_prefix='pyqtplotlib-worker')
+    return _pool
+
+
+class LatestJob(QtCore.QObject):
+    """
+    Runs the background jobs of one item, one at a time, and applies only the newest result.
+
+    `submit(function, *args)` calls `function(*args, checkpoint=checkpoint)` in the worker
+    pool. `checkpoint()` raises `JobCancelled` once a newer job has been submitted, so long
+    computations call it between blocks of work. A job submitted while another one runs
+    waits for it and replaces any job already waiting, so at most two jobs of an item exist
+    at any time and the data of the item is never read by two threads at once.
+
+    Parameters:
+    - callback: called in the GUI thread with the result of the newest job
+    - parent: QObject that owns the jobs (the item)
+
+    Attributes:
+    - stats: numbers of jobs 'submitted', 'applied', 'superseded' (dropped or aborted)
+      and 'failed' (their exceptions are printed)
+    """
+
+    _finished = QtCore.pyqtSignal(int, object, object)  # generation, result, exception
+
+    def __init__(self, callback, parent=None):
+        super().__init__(parent)
+        self._callback = callback
+        self._lock = threading.Lock()
+        self._generation = 0  # generation of the newest submitted job
+        self._delivered = 0  # generation of the newest job whose result arrived
+        self._queued = None  # (generation, function, args, kwargs) waiting for the running job
+        self._running = None  # Future of the running job
+        self.stats = dict(submitted=0, applied=0, superseded=0, failed=0)
+        self._finished.connect(self._deliver, QtCore.Qt.QueuedConnection)
+
+    @property
+    def pending(self):
+        """Whether the result of the newest job has not been applied yet."""
+        return self._delivered < self._generation
+
+    def submit(self, function, *args, **kwargs):
+        """Run `function(*args, checkpoint=..., **kwargs)` in the worker pool, superseding earlier jobs."""
+        with self._lock:
+            self._generation += 1
+            self.stats['submitted'] += 1
+            if self._queued is not None:
+                self.stats['superseded'] += 1
+            self._queued = (self._generation, function, args, kwargs)
+            if self._running is None:
+                self._start_queued()
+
+    def cancel(self):
+        """Supersede all submitted jobs without submitting a new one."""
+        with self._lock:
+            if self._queued is not None:
+                self.stats['superseded'] += 1
+                self._queued = None
+            self._generation += 1
+            self._delivered = self._generation
+
+    def _start_queued(self):
+        # called with the lock held
+        job, self._queued = self._queued, None
+        self._running = worker_pool().submit(self._run, *job)
+
+    def _run(self, generation, function, args, kwargs):
+        def checkpoint():
+            if self._generation != generation:
+                raise JobCancelled()
+
+        result = error = None
+        try:
+            result = function(*args, checkpoint=checkpoint, **kwargs)
+        except JobCancelled:
+            with self._lock:
+                self.stats['superseded'] += 1
+            generation = None
+        except Exception as e:
+            error = e
+        if generation is not None:
+            try:
+                self._finished.emit(generation, result, error)
+            except RuntimeError:
+                pass  # the item has been deleted
+        with self._lock:
+            if self._queued is not None:
+                self._start_queued()
+            else:
+                self._running = None
+
+    @QtCore.pyqtSlot(int, object, object)
+    def _deliver(self, generation, result, error):
+        if generation != self._generation:
+            self.stats['superseded'] += 1
+            return
+        self._delivered = generation
+        if error is not None:
+            self.stats['failed'] += 1
+            traceback.print_exception(type(error), error, error.__traceback__)
+            return
+        self.stats['applied'] += 1
+        self._callback(result)
+
+    def wait(self, timeout=None):
+        """
+        Block the GUI thread until the result of the newest job has been applied (for
+        exports and tests). Return False if it has not after `timeout` seconds.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.pending:
+            remaining = None if deadline is None else max(deadline - time.monotonic(), 0)
+            future = self._running
+            if future is not None:
+                wait([future], remaining)
+            QtCore.QCoreApplication.sendPostedEvents(self, QtCore.QEvent.MetaCall)
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+        return not self.pending
@@ -2,15 +2,20 @@
 
 import unittest
 import numpy as np
-from PyQt5.QtCore import QTimer
+from PyQt5.QtCore import QTimer, Qt
 
+import json
+import os
 import sys
+import tempfile
+import time
 import unittest
 from PyQt5.QtWidgets import QApplication
 
 app = QApplication(sys.argv) if QApplication.instance() is None else QApplication.instance()
 
-from pyqtplotlib.pltwrapper import AxesWidget
+from pyqtplotlib.pltwrapper import AxesWidget, AxesItem, subplots
+from pyqtplotlib.pltwrapper.styles import style_cache
 
 
 class TestAxesWidget(unittest.TestCase):
@@ -42,13 +47,452 @@ class TestAxesWidget(unittest.TestCase):
         # app.aboutToQuit.connect(app.deleteLater)
         # sys.exit(app.exec_())
 
+    def test_plot_decimate(self):
+        
+        x = np.arange(100000, dtype=float)
+        y = np.random.rand(len(x))
+        y[54321] = 10
+        self.ax.resize(400, 300)
+        for mode in ['minmax', 'lttb']:
+            line = self.ax.plot(x, y, decimate=mode)
+            self.ax.set_xlim(50000, 60000)
+            app.processEvents()
+            x_shown, y_shown = line.curve.getData()
+            self.assertLessEqual(len(x_shown), 2 * line.getViewBox().width() + 2)
+            self.assertLessEqual(x_shown[0], 50000)
+            self.assertGreaterEqual(x_shown[-1], 60000)
+            if mode == 'minmax':
+                self.assertEqual(y_shown.max(), 10)
+            # auto-range still sees the full data
+            self.assertEqual(line.dataBounds(0), (0, 99999))
+            self.assertEqual(len(line.getOriginalDataset()[0]), len(x))
+        
+        with self.assertRaises(ValueError):
+            self.ax.plot(x, y, decimate='mean')
+
+    def test_color_cycle(self):
+
+        cycle = self.ax._mpl_color_cycle
+        lines = [self.ax.plot([0, 1], [i, i]) for i in range(len(cycle) + 1)]
+        self.assertEqual(lines[1].opts['pen'].color().name(), cycle[1])
+        self.assertEqual(lines[-1].opts['pen'].color().name(), cycle[0])
+        # a scatter takes the next color without advancing the cycle
+        self.ax.scatter([0], [0])
+        self.assertEqual(self.ax.plot([0, 1], [0, 1]).opts['pen'].color().name(), cycle[1])
+        self.ax.clear()
+        self.assertEqual(self.ax.plot([0, 1], [0, 1]).opts['pen'].color().name(), cycle[0])
+        # finite axvline/axhline segments are lines too; a removed line's color is reused
+        segment = self.ax.axvline(0.5, 0, 1)
+        self.assertEqual(segment.opts['pen'].color().name(), cycle[1])
+        self.assertEqual(self.ax.plot([0, 1], [0, 1]).opts['pen'].color().name(), cycle[2])
+        self.ax.axhline(0.5)  # an infinite line is not
+        self.ax.removeItem(segment)
+        self.assertEqual(self.ax.plot([0, 1], [0, 1]).opts['pen'].color().name(), cycle[2])
+        self.ax.clear()
+
+        # equal styles share one cached pen; alpha is part of the style
+        pen = style_cache.pen('r', width=2, style=Qt.DashLine)
+        self.assertIs(style_cache.pen('r', width=2, style=Qt.DashLine), pen)
+        self.assertIsNot(style_cache.pen('r', width=2, style=Qt.DashLine, alpha=0.5), pen)
+        line = self.ax.plot([0, 1], [0, 1], color='r', alpha=0.5)
+        self.assertAlmostEqual(line.opts['pen'].color().alphaF(), 0.5, places=2)
+        self.assertEqual(style_cache.color('r').alpha(), 255)
+
     def test_imshow(self):
         
         data = np.random.rand(10,10)
         im = self.ax.imshow(data, extent=(-10,5,-3,3), cmap='plasma')
 
+        # arrays are displayed without a copy, in row-major orientation
+        for dtype in (np.uint8, np.uint16, np.float32, np.float64):
+            data = np.zeros((20, 30), dtype=dtype)
+            im = self.ax.imshow(data)
+            self.assertTrue(np.shares_memory(im.image, data))
+            self.assertEqual((im.width(), im.height()), (30, 20))
+        with tempfile.TemporaryFile() as f:
+            frame = np.memmap(f, dtype=np.uint16, shape=(20, 30))
+            im = self.ax.imshow(frame)
+            self.assertTrue(np.shares_memory(im.image, frame))
+
+    def test_fill_between(self):
+        
+        x = np.arange(4)
+        band = self.ax.fill_between(x, 1, 0, where=[True, True, False, True], color='g', alpha=0.5)
+        path = band.path()
+        points = [(path.elementAt(i).x, path.elementAt(i).y) for i in range(path.elementCount())]
+        # one item, two outlines: along y2 and back along y1
+        self.assertEqual(points, [(0, 0), (1, 0), (1, 1), (0, 1), (3, 0), (3, 1)])
+        
+        band.update(x, x + 1, x)
+        self.assertEqual(band.path().boundingRect().height(), 4)
+        self.assertEqual(sum(isinstance(item, type(band)) for item in self.ax.plot_item.items), 1)
+        # a plain repaint request keeps the area
+        band.update()
+        band.update(band.boundingRect())
+        self.assertEqual(band.path().boundingRect().height(), 4)
+
+    def test_vlines(self):
+        
+        x = np.random.default_rng(0).random(5000)
+        lines = self.ax.vlines(x, 0, 1, colors=['r', 'b'] * 2500)
+        self.assertEqual(len(lines), 5000)
+        self.assertEqual(len(lines.pens()), 2)
+        self.assertEqual(lines.dataBounds(1), (0, 1))
+        # lines on the same pixels are drawn once
+        self.ax.grab()
+        self.assertLessEqual(sum(len(group) for _, group in lines._lines[1]), 2 * self.ax.width())
+        # with few changes of color the lines keep their order (the red and blue halves never
+        # share a pixel column, so neither is culled); translucent lines are all drawn
+        halves = np.r_[np.linspace(0, 0.4, 2500), np.linspace(0.6, 1, 2500)]
+        lines = self.ax.vlines(halves, 0, 1, colors=['r'] * 2500 + ['b'] * 2500)
+        self.ax.grab()
+        self.assertEqual([pen.color().name() for pen, _ in lines._lines[1]], ['#ff0000', '#0000ff'])
+        lines = self.ax.vlines(x, 0, 1, color=(0, 0, 255, 100))
+        self.ax.grab()
+        self.assertEqual(sum(len(group) for _, group in lines._lines[1]), 5000)
+        
+        lines = self.ax.hlines([1, 2, np.nan], 0, [1, 2, 3], color='k')
+        self.assertEqual(len(lines), 2)
+        self.assertEqual(lines.dataBounds(0), (0, 2))
+
+    def test_plot_many(self):
+        from pyqtplotlib.pltwrapper.traces import rasterize_traces
+        
+        Y = np.arange(5)[:, None] + np.zeros((5, 100))
+        traces = self.ax.plot_many(None, Y, colors=np.arange(5), cmap='plasma', highlight=2)
+        self.assertEqual(len(traces), 5)
+        self.assertEqual(len(traces.pens()), 257)
+        self.assertEqual(traces.highlight(), 2)
+        self.assertEqual(traces.dataBounds(1), (0, 4))
+        self.ax.grab()
+        traces.max_segments = 0  # rasterized
+        traces.setData(None, Y)
+        self.ax.grab()
+        
+        # trace k covers row k; where traces overlap, the later one is on top
+        owner = rasterize_traces(np.arange(100.), Y, 10, 5, 0.1, 0, 1, 0, np.arange(5, dtype=np.int32))
+        np.testing.assert_array_equal(owner, np.repeat(np.arange(5)[:, None], 10, axis=1))
+        owner = rasterize_traces(np.arange(100.), Y * 0, 10, 5, 0.1, 0, 1, 0, np.arange(5, dtype=np.int32))
+        self.assertTrue(np.all(owner[0] == 4) and np.all(owner[1:] == -1))
+
+    def test_batch_update(self):
+
+        fig, axs = subplots(2, 2)
+        with fig.batch_update():
+            with fig.batch_update():
+                for ax in axs.flat:
+                    ax.plot([0, 1], [0, 10], label='a')
+                    ax.plot([0, 1], [0, 20], label='b')
+                    ax.legend()
+            # auto-range and repaints are deferred until the outer block exits
+            self.assertFalse(axs[0, 0].updatesEnabled())
+            self.assertLess(axs[0, 0].get_ylim()[1], 20)
+        for ax in axs.flat:
+            self.assertTrue(ax.updatesEnabled())
+            self.assertGreaterEqual(ax.get_ylim()[1], 20)
+            self.assertGreater(ax.plot_item.legend.boundingRect().height(), 0)
+        fig.close()
+
+    def test_single_scene(self):
+
+        fig, axs = subplots(2, 3, sharex=True, single_scene=True)
+        self.assertIsInstance(axs[1, 2], AxesItem)
+        # all axes are drawn by one view
+        self.assertIs(axs[0, 0].plot_item.scene(), axs[1, 2].plot_item.scene())
+        line = axs[1, 2].plot([0, 1, 2], [1, 4, 9], color='r', label='a')
+        axs[1, 2].set_ylim(0, 10)
+        self.assertAlmostEqual(sum(axs[1, 2].get_ylim()), 10)
+        self.assertIs(axs[1, 2].get_figure(), fig)
+        self.assertIn(line, axs[1, 2].plot_item.listDataItems())
+        with fig.batch_update():
+            axs[0, 0].plot([0, 100], [0, 1])
+        self.assertGreaterEqual(axs[1, 2].get_xlim()[1], 100)  # shared x-axis
+
+        # the context menu of the view is created when it is first opened
+        vb = axs[0, 0].getViewBox()
+        self.assertIsNone(vb.menu)
+        self.assertTrue(vb.getContextMenus(None))
+
+        # the hover label only follows the mouse over its own axes
+        pos = axs[0, 0].getViewBox().sceneBoundingRect().center()
+        axs[0, 0].plot_item.scene().sigMouseMoved.emit(pos)
+        self.assertTrue(axs[0, 0].hover_label.text)
+        self.assertFalse(axs[1, 2].hover_label.text)
+        fig.close()
+
+        # widget axes cannot be items of the shared scene
+        with self.assertRaises(ValueError):
+            subplots(1, 2, single_scene=True, axwidget=type('CustomAxes', (AxesWidget,), {}))
+
+    def test_scatter(self):
+        
+        x, y, c = np.random.rand(3, 10000)
+        c[0] = np.nan
+        sc = self.ax.scatter(x, y, c=c, s=5, cmap='plasma')
+        self.assertEqual(len(sc.data), len(x))
+        # points with equal colors share the same brush object
+        self.assertLessEqual(len({id(b) for b in sc.data['brush']}), 257)
+        self.assertEqual(sc.data['brush'][0].color().alpha(), 0)
+        self.assertTrue(np.all(sc.data['sourceRect']['w'] > 0))
+        
+        sc = self.ax.scatter(x[:4], y[:4], c=['r', 'b', 'r', 'b'], s=[1, 2, 3, 4])
+        self.assertIs(sc.data['brush'][0], sc.data['brush'][2])
+        np.testing.assert_array_equal(sc.data['size'], [1, 2, 3, 4])
+
+        # bulk path: drawn from the arrays, the record array is only built when used
+        from pyqtplotlib.pltwrapper.axes import ArrayScatterPlotItem, _cmap_brush_table, _cmap_indices
+        self.ax.resize(300, 200)
+        self.ax.show()
+        images = []
+        for bulk_threshold in (len(x) + 1, 1000):
+            self.ax.clear()
+            sc = ArrayScatterPlotItem(size=6)
+            sc.bulk_threshold = bulk_threshold
+            sc.setArrayData(x, y, brush_table=_cmap_brush_table('plasma'), brush_index=_cmap_indices(c))
+            self.ax.addItem(sc)
+            self.ax.setRange(xRange=(0, 1), yRange=(0, 1))
+            images.append(self.ax.grab().toImage())
+            self.assertEqual(sc._bulk is not None, bulk_threshold < len(x))
+        self.assertEqual(sc.dataBounds(0), (np.nanmin(x), np.nanmax(x)))
+        # spots hidden under later opaque spots are culled, which only shows at sub-pixel edges
+        generic, bulk = (np.frombuffer(image.constBits().asstring(image.sizeInBytes()), np.uint8)
+                         .reshape(image.height(), image.width(), 4).astype(int) for image in images)
+        self.assertLess(np.mean(np.abs(bulk - generic).max(axis=2) > 64), 0.01)
+
+        sc.bulk_threshold = 1000
+        sc.setArrayData(x, y, size=5)
+        x_shown, y_shown = sc.getData()
+        self.assertIs(x_shown, sc.getData()[0])
+        self.assertEqual(len(sc.data), len(x))
+        self.assertIsNone(sc._bulk)
+        np.testing.assert_array_equal(sc.data['x'], x)
+        self.assertTrue(np.all(sc.data['sourceRect']['w'] > 0))
+
+    def test_profiling(self):
+
+        self.ax.resize(400, 300)
+        self.ax.show()
+        line = self.ax.plot(np.random.rand(100), label='signal')
+        profiler = self.ax.enable_profiling(overlay=True)
+        self.assertIs(self.ax.enable_profiling(), profiler)
+        for _ in range(3):
+            line.setData(np.random.rand(100))
+            app.processEvents()
+        stats = profiler.stats()
+        self.assertGreaterEqual(stats['frames'], 1)
+        self.assertGreater(stats['frame_ms']['max'], 0)
+        self.assertGreaterEqual(stats['items_drawn'], 1)
+        self.assertGreater(stats['update_latency_ms']['max'], 0)
+        self.assertTrue(any("'signal'" in name for name in stats['items']))
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            for format in ['json', 'chrome']:
+                fn = os.path.join(tmpdir, f'{format}.json')
+                profiler.save(fn, format=format)
+                with open(fn) as f:
+                    self.assertTrue(json.load(f))
+
+        # disabling removes all instrumentation
+        self.assertIs(self.ax.disable_profiling(), profiler)
+        self.assertIsNone(self.ax.profiler)
+        self.assertNotIn('paint', line.curve.__dict__)
+        self.assertNotIn('setData', line.__dict__)
+        self.assertNotIn('paintEvent', self.ax.__dict__)
+        frames = stats['frames']
+        line.setData(np.random.rand(100))
+        app.processEvents()
+        self.assertEqual(profiler.stats()['frames'], frames)
+
+        # the overlay keeps updating once `max_events` frames are kept
+        profiler = self.ax.enable_profiling(overlay=True, max_events=2)
+        for _ in range(4):
+            line.setData(np.random.rand(100))
+            app.processEvents()
+        profiler._update_overlay()
+        profiler._overlay.setText('stale')
+        for _ in range(4):
+            line.setData(np.random.rand(100))
+            app.processEvents()
+        profiler._update_overlay()
+        self.assertEqual(len(profiler.frames), 2)
+        self.assertGreater(profiler.frame_count, 2)
+        self.assertNotEqual(profiler._overlay.textItem.toPlainText(), 'stale')
+
+        # disposing of the axes stops profiling
+        timer = profiler._timer
+        self.ax.dispose()
+        self.assertIsNone(self.ax.profiler)
+        self.assertIsNone(profiler._overlay)
+        self.assertFalse(timer.isActive())
+        self.assertIs(timer.parent(), self.ax.getViewBox())
+
+    def test_shared_range(self):
+        from pyqtplotlib.pltwrapper.sharing import shared_group
+
+        fig, axs = subplots(3, 3, sharex=True)
+        group = shared_group(axs[0, 0], 'x')
+        self.assertEqual(len(group), 9)
+        app.processEvents()
+        broadcasts = group.stats()['broadcasts']
+        # a burst of zoom steps is broadcast once, after the pending events
+        vb = axs[1, 1].getViewBox()
+        for _ in range(10):
+            vb.scaleBy(x=0.9)
+        self.assertEqual(group.stats()['broadcasts'], broadcasts)
+        app.processEvents()
+        self.assertEqual(group.stats()['broadcasts'], broadcasts + 1)
+        for ax in axs.flat:
+            np.testing.assert_allclose(ax.get_xlim(), axs[1, 1].get_xlim())
+        # reading the limits applies a pending broadcast; the y-axes are independent
+        axs[2, 0].set_xlim(3, 4)
+        np.testing.assert_allclose(axs[0, 2].get_xlim(), axs[2, 0].get_xlim())
+        self.assertIsNone(shared_group(axs[0, 0], 'y'))
+
+        # axes of another figure join the group
+        other, ax = subplots(1, 1)
+        ax.sharex(axs[0, 0])
+        np.testing.assert_allclose(ax.get_xlim(), axs[2, 0].get_xlim())
+        ax.set_xlim(5, 6)
+        np.testing.assert_allclose(axs[2, 2].get_xlim(), ax.get_xlim())
+        stats = group.stats()
+        self.assertEqual(stats['members'], 10)
+        self.assertLessEqual(stats['updates'] + stats['skipped'], 9 * stats['broadcasts'])
+        fig.close()
+        other.close()
+
+    def test_background(self):
+        import time
+        from pyqtplotlib.pltwrapper.workers import LatestJob
+
+        x = np.arange(200000, dtype=float)
+        y = np.random.rand(len(x))
+        y[54321] = 10
+        self.ax.resize(400, 300)
+        self.ax.show()
+        line = self.ax.plot(x, y, background=True)
+        reference = self.ax.plot(x, y, decimate='minmax')
+        for x0 in range(0, 100000, 10000):
+            self.ax.set_xlim(x0, x0 + 20000)
+            app.processEvents()
+        self.ax.set_xlim(50000, 60000)
+        app.processEvents()
+        self.assertTrue(line.wait_for_background(10))
+        for shown, expected in zip(line.curve.getData(), reference.curve.getData()):
+            np.testing.assert_array_equal(shown, expected)
+        self.assertEqual(line.curve.getData()[1].max(), 10)
+
+        # only the newest job is applied; superseded ones are dropped or aborted
+        results = []
+
+        def job(value, checkpoint):
+            for _ in range(100):
+                checkpoint()
+                time.sleep(0.001)
+            return value
+        jobs = LatestJob(results.append)
+        for value in range(20):
+            jobs.submit(job, value)
+        self.assertTrue(jobs.wait(10))
+        self.assertEqual(results, [19])
+        self.assertEqual(jobs.stats['submitted'], jobs.stats['applied'] + jobs.stats['superseded'])
+
+        sc = self.ax.scatter(x[:1000], y[:1000], c=y[:1000], cmap='plasma', background=True)
+        self.assertTrue(sc.wait_for_background(10))
+        self.assertEqual(len(sc.data), 1000)
+
+        image = np.random.rand(2000, 3000).astype(np.float32)
+        im = self.ax.imshow(image, cmap='viridis', background=True)
+        self.ax.setRange(xRange=(100, 150), yRange=(200, 240), padding=0)
+        app.processEvents()
+        self.assertTrue(im.wait_for_background(10))
+        self.assertEqual(im.image_item.image.shape, (40, 50, 4))
+
+    def test_hover_snap(self):
+        from PyQt5.QtCore import QPointF
+        from pyqtplotlib.pltwrapper import hover
+
+        self.ax.resize(400, 300)
+        self.ax.show()
+        x = np.arange(1000, dtype=float)
+        line = self.ax.plot(x, np.sin(x / 50), label='sine')
+        sc = self.ax.scatter([200.5, 700.5], [0.5, -0.5])
+        im = self.ax.imshow(np.arange(12.0).reshape(3, 4), extent=(900, 1000, 2, 5), autoRange=False)
+        self.ax.set_xlim(0, 1000)
+        self.ax.set_ylim(-1.5, 5)
+        app.processEvents()
+        self.ax.set_hover_mode('snap', radius=10)
+
+        # binary search on the sorted line, the nearest point over all items
+        item, px, py = hover.nearest_point(self.ax, 300.2, np.sin(6) + 0.01)
+        self.assertIs(item, line)
+        self.assertEqual(px, 300)
+        item, px, py = hover.nearest_point(self.ax, 701, -0.49)
+        self.assertIs(item, sc)
+        self.assertEqual((px, py), (700.5, -0.5))
+        self.assertIsNone(hover.nearest_point(self.ax, 500, 4))
+        # the index is rebuilt when the data change
+        index = line._hover_index[1]
+        hover.nearest_point(self.ax, 100, 0)
+        self.assertIs(line._hover_index[1], index)
+        line.setData(x[::-1], np.sin(x / 50))
+        hover.nearest_point(self.ax, 100, 0)
+        self.assertIsNot(line._hover_index[1], index)
+        # pixel values: rows along y
+        self.assertEqual(hover.pixel_value(self.ax, 960, 4.5)[1:], (2, 2, 10.0))
+
+        # readouts are limited to one per frame
+        vb = self.ax.getViewBox()
+        scene_pos = lambda x, y: vb.mapViewToScene(QPointF(x, y))
+        self.ax._hoveredEvent(scene_pos(701, -0.49))
+        self.assertIn('700.5', self.ax.hover_label.text())
+        self.assertTrue(self.ax._hover_marker.isVisible())
+        self.ax._hoveredEvent(scene_pos(960, 4.5))
+        self.assertIn('700.5', self.ax.hover_label.text())
+        self.assertTrue(self.ax._hover_throttle.pending())
+        time.sleep(0.05)
+        app.processEvents()
+        self.assertIn('[2, 2]: 10.', self.ax.hover_label.text())
+        self.assertFalse(self.ax._hover_marker.isVisible())
+
+    def test_crosshair(self):
+        from PyQt5.QtCore import QPointF
+
+        fig, axs = subplots(3, 1, sharex=True)
+        fig.resize(400, 600)
+        fig.show()
+        x = np.linspace(0, 10, 1001)
+        for i, ax in enumerate(axs.flat):
+            ax.plot(x, i * x, label=f'ch{i}')
+        axs[1, 0].plot(x[::-1], x)  # unsorted x: no readout
+        app.processEvents()
+        time.sleep(0.05)
+        app.processEvents()  # the shared x-range is broadcast in the next frame
+        crosshair = fig.enable_crosshair()
+
+        vb = axs[2, 0].getViewBox()
+        scene_pos = vb.mapViewToScene(QPointF(4.0025, 1))
+        axs[2, 0].plot_item.scene().sigMouseMoved.emit(scene_pos)
+        self.assertAlmostEqual(crosshair.x, 4.0025)
+        for i, ax in enumerate(axs.flat):
+            self.assertEqual(len(crosshair.values[ax]), 1)
+            self.assertAlmostEqual(crosshair.values[ax][0][1], i * 4.0025)
+            self.assertTrue(crosshair._lines[ax].isVisible())
+        self.assertIn('ch2: 8.005', crosshair._labels[axs[2, 0]].textItem.toPlainText())
+
+        # moves within a frame are coalesced
+        axs[0, 0].plot_item.scene().sigMouseMoved.emit(axs[0, 0].getViewBox().mapViewToScene(QPointF(6, 0)))
+        self.assertAlmostEqual(crosshair.x, 4.0025)
+        time.sleep(0.05)
+        app.processEvents()
+        self.assertAlmostEqual(crosshair.x, 6, places=2)
+        crosshair.set_x(20)  # outside the data
+        self.assertEqual(crosshair.values[axs[0, 0]], [])
+
+        fig.disable_crosshair()
+        self.assertIsNone(fig.crosshair)
+        self.assertNotIn(crosshair._lines[axs[0, 0]], axs[0, 0].getViewBox().addedItems)
+        fig.close()
 
-    
     def tearDown(self):
         # Cleanup runs after each test method
         self.ax.close()
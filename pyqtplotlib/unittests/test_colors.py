@@ -0,0 +1,48 @@
+#%%
+import os
+import subprocess
+import sys
+import unittest
+import numpy as np
+
+from pyqtplotlib.pltwrapper.colors import DEFAULT_COLOR_CYCLE, builtin_colormaps, colormap_table
+
+
+class TestColors(unittest.TestCase):
+
+    def test_builtin_colormaps(self):
+        import matplotlib
+        positions = np.linspace(0, 1, 256)
+        for name in builtin_colormaps():
+            for name in [name, name + '_r']:
+                expected = (matplotlib.colormaps[name](positions)[:, :3] * 255).astype(np.uint8)
+                table = colormap_table(name)
+                self.assertEqual(table.shape, (256, 3))
+                self.assertLessEqual(np.abs(table.astype(int) - expected).max(), 1, name)
+        self.assertIsNone(colormap_table('no such colormap'))
+        self.assertEqual(DEFAULT_COLOR_CYCLE, matplotlib.rcParamsDefault['axes.prop_cycle'].by_key()['color'])
+
+    def test_no_matplotlib_import(self):
+        # Plotting with the default color cycle and built-in colormaps must not import matplotlib
+        code = '\n'.join([
+            'import sys',
+            'import numpy as np',
+            'import pyqtplotlib as qtplt',
+            'assert "pyqtgraph" not in sys.modules',
+            'assert qtplt.pltwrapper.AxesWidget and qtplt.windows and qtplt.interaction',  # submodules load on access
+            'from PyQt5.QtWidgets import QApplication',
+            'app = QApplication([])',
+            'fig, axs = qtplt.subplots(1, 2)',
+            'axs[0, 0].plot(np.arange(10))',
+            'axs[0, 0].scatter(np.arange(10), np.arange(10), c=np.arange(10), cmap="plasma")',
+            'axs[0, 1].imshow(np.random.rand(10, 10), cmap="gray_r")',
+            'assert "matplotlib" not in sys.modules, "matplotlib was imported"',
+        ])
+        env = dict(os.environ, QT_QPA_PLATFORM='offscreen')
+        result = subprocess.run([sys.executable, '-c', code], env=env, capture_output=True, text=True)
+        self.assertEqual(result.returncode, 0, result.stderr)
+
+
+if __name__ == '__main__':
+    unittest.main()
+# %%
@@ -0,0 +1,140 @@
+#%%
+import os
+import sys
+import tempfile
+import unittest
+import numpy as np
+from PyQt5.QtWidgets import QApplication
+
+app = QApplication(sys.argv) if QApplication.instance() is None else QApplication.instance()
+
+from pyqtplotlib.pltwrapper import AxesWidget
+from pyqtplotlib.pltwrapper.datasource import MemmapLineSource, MemmapImageSource
+from pyqtplotlib.pltwrapper.pyramid import downsample_2x2
+
+
+class TestDataSources(unittest.TestCase):
+
+    def setUp(self):
+        self.ax = AxesWidget()
+        self.ax.resize(400, 300)
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def test_line_source(self):
+        fn = os.path.join(self.tmpdir.name, 'line.npy')
+        y = np.random.rand(200000).astype(np.float32)
+        y[123456] = 5
+        np.save(fn, y)
+
+        source = MemmapLineSource(fn, dx=0.5, chunk_size=1000, max_chunks=4)
+        np.testing.assert_array_equal(source.read(999, 2001)[1], y[999:2001])
+        self.assertLessEqual(len(source.cache), 4)
+
+        line = self.ax.plot(source, color='k')
+        self.assertEqual(line.dataBounds(0), (0, 99999.5))
+        self.ax.setXRange(60000, 62000, padding=0)
+        app.processEvents()
+        x_shown, y_shown = line.curve.getData()
+        self.assertLessEqual(len(x_shown), 2 * line.getViewBox().width() + 2)
+        self.assertEqual(y_shown.max(), 5)
+        self.assertLessEqual(len(source.cache), 4)
+
+    def test_line_source_summary(self):
+        fn = os.path.join(self.tmpdir.name, 'spikes.npy')
+        y = np.random.rand(1000000).astype(np.float32)
+        y[123457], y[876543] = 50, -50
+        np.save(fn, y)
+
+        # far zoomed out, the extrema of every block are kept: no spike is lost
+        source = MemmapLineSource(fn)
+        source.max_read, source.summary_block = 10000, 16
+        x, y_shown = source.window(0, len(y), 100)
+        self.assertEqual((y_shown.max(), y_shown.min()), (50, -50))
+        self.assertLessEqual(len(x), 2 * 100 + 2)
+        column = len(y) / 100
+        self.assertLess(abs(x[np.argmax(y_shown)] - 123457), column)
+        summary = source.summary()
+        self.assertIs(source.summary(), summary)
+        self.assertEqual([len(level[0]) for level in summary.levels][:2], [62500, 7813])
+
+        # the snapping hover finds the spikes among the same extrema
+        from pyqtplotlib.pltwrapper.hover import _SourceLineIndex
+        px, py = _SourceLineIndex(source).candidates(0, len(y), -100, 100)
+        self.assertEqual((py.max(), py.min()), (50, -50))
+        self.assertLessEqual(len(px), source.max_read)
+
+    def test_line_source_overview(self):
+        import threading
+        fn = os.path.join(self.tmpdir.name, 'overview.npy')
+        y = np.random.default_rng(0).random(1000000).astype(np.float32)
+        y[123457] = 50
+        np.save(fn, y)
+
+        class ScanThreads(MemmapLineSource):
+            threads = set()
+
+            def scan(self, i0, i1):
+                self.threads.add(threading.current_thread())
+                return super().scan(i0, i1)
+
+        # the summary is built in a worker thread, a strided preview is shown meanwhile
+        source = ScanThreads(fn)
+        source.max_read, source.summary_block = 10000, 16
+        self.assertTrue(source.summary_needed(0, len(y), 100))
+        line = self.ax.plot(source)
+        self.ax.setXRange(0, len(y), padding=0)
+        app.processEvents()
+        self.assertGreater(len(line.curve.getData()[0]), 0)
+        self.assertLessEqual(len(source.preview(0, len(y), 100)[0]), 2 * 100 + 2)
+        self.assertTrue(line.wait_for_background(10))
+        app.processEvents()
+        self.assertTrue(source.summary_ready())
+        self.assertNotIn(threading.main_thread(), source.threads)
+        self.assertEqual(line.curve.getData()[1].max(), 50)
+
+    def test_image_source(self):
+        fn = os.path.join(self.tmpdir.name, 'image.npy')
+        data = np.arange(3000 * 2000, dtype=np.uint16).reshape(3000, 2000)
+        np.save(fn, data)
+
+        source = MemmapImageSource(fn)
+        source.sample_levels = None  # the levels come from the overview, not from another read
+        im = self.ax.imshow(source, cmap='viridis')
+        # the displayed window is read at about screen resolution
+        self.assertLessEqual(im.image_item.image.size, 2 * 1024 * 1024)
+        self.assertEqual(im._levels, (0, im.image_item.image.max()))
+        self.ax.setRange(xRange=(100, 150), yRange=(200, 240), padding=0)
+        app.processEvents()
+        window = im.image_item.image
+        np.testing.assert_array_equal(window, data[200:240, 100:150])
+
+    def test_image_pyramid(self):
+        data = np.random.rand(2049, 3001).astype(np.float32)
+        np.testing.assert_allclose(downsample_2x2(data)[:2, :2],
+                                   data[:4, :4].reshape(2, 2, 2, 2).mean(axis=(1, 3)), rtol=1e-6)
+        self.assertEqual(downsample_2x2(data).shape, (1025, 1501))
+
+        self.ax.show()  # the view transform is only updated when the view is painted
+        im = self.ax.imshow(data, pyramid=True)
+        self.assertTrue(im.pyramid.wait(timeout=10))
+        app.processEvents()
+        # zoomed out: a few tiles of a coarse level
+        levels = {key[0] for key in im.tiles}
+        self.assertEqual(len(levels), 1)
+        self.assertGreater(levels.pop(), 0)
+        # zoomed in: full-resolution tiles of the visible region only
+        self.ax.setRange(xRange=(100, 150), yRange=(200, 240), padding=0)
+        app.processEvents()
+        app.processEvents()
+        self.assertEqual(set(im.tiles), {(0, 0, 0)})
+        tile = im.tiles[(0, 0, 0)].image
+        np.testing.assert_array_equal(tile, data[:512, :512])
+
+    def tearDown(self):
+        self.ax.close()
+        self.tmpdir.cleanup()
+
+
+if __name__ == '__main__':
+    unittest.main()
+# %%
@@ -0,0 +1,91 @@
+#%%
+import os
+import sys
+import tempfile
+import unittest
+import numpy as np
+from PyQt5.QtGui import QImage
+from PyQt5.QtWidgets import QApplication
+
+app = QApplication(sys.argv) if QApplication.instance() is None else QApplication.instance()
+
+from pyqtplotlib.pltwrapper import subplots
+from pyqtplotlib.pltwrapper.export import export_figures
+
+
+def build_figure(freq):
+    fig, ax = subplots(1, 1)
+    ax.plot(np.sin(freq * np.linspace(0, 10, 500)))
+    return fig
+
+
+class TestExport(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def test_savefig(self):
+        fig = build_figure(1)
+        self.assertFalse(fig.isVisible())
+        for ext in ['png', 'jpg', 'pdf', 'svg']:
+            fn = os.path.join(self.tmpdir.name, 'figure.' + ext)
+            fig.savefig(fn)
+            self.assertGreater(os.path.getsize(fn), 0)
+        self.assertFalse(fig.isVisible())
+
+        fn = os.path.join(self.tmpdir.name, 'figure_hd.png')
+        fig.savefig(fn, dpi=192)
+        self.assertEqual(QImage(fn).size(), 2 * fig.size())
+        with self.assertRaises(ValueError):
+            fig.savefig(os.path.join(self.tmpdir.name, 'figure.xyz'))
+        fig.close()
+
+    def test_vector_export_size(self):
+        rng = np.random.default_rng(0)
+        sizes = {}
+        for n in [20000, 200000]:
+            fig, axs = subplots(1, 2)
+            axs[0, 0].plot(np.cumsum(rng.normal(size=n)))
+            axs[0, 1].scatter(rng.normal(size=n), rng.normal(size=n))
+            for ext in ['pdf', 'svg']:
+                fn = os.path.join(self.tmpdir.name, f'{n}.{ext}')
+                fig.savefig(fn)
+                sizes[n, ext] = os.path.getsize(fn)
+            # the full data is shown again after the export
+            self.assertEqual(len(axs[0, 0].getPlotItem().listDataItems()[0].curve.xData), n)
+            self.assertTrue(axs[0, 1].getPlotItem().listDataItems()[0].data['visible'].all())
+            fig.close()
+        for ext in ['pdf', 'svg']:
+            self.assertLess(sizes[200000, ext], 2 * sizes[20000, ext])
+            self.assertLess(sizes[200000, ext], 2e6)
+
+        # a bulk scatter goes back to its bulk path after the export
+        fig, ax = subplots(1, 1)
+        scatter = ax.scatter([0], [0])
+        scatter.bulk_threshold = 1000
+        scatter.setArrayData(rng.normal(size=20000), rng.normal(size=20000))
+        bulk = scatter._bulk
+        fig.savefig(os.path.join(self.tmpdir.name, 'bulk.svg'))
+        self.assertIs(scatter._bulk, bulk)
+        self.assertEqual(len(scatter._data), 0)
+        fig.close()
+
+    def test_export_figures(self):
+        specs = [dict(filename=os.path.join(self.tmpdir.name, f'{i}.png'), freq=i) for i in range(4)]
+        specs.append(dict(filename=os.path.join(self.tmpdir.name, 'bad.png'), freq=1, color='r'))
+        for processes in [0, 2]:
+            report = export_figures(build_figure, specs, processes=processes)
+            self.assertEqual(report['figures'], 5)
+            self.assertGreater(report['figures_per_second'], 0)
+            self.assertEqual([fn for fn, _ in report['errors']], [specs[-1]['filename']])
+            for spec in specs[:-1]:
+                self.assertFalse(QImage(spec['filename']).isNull())
+                os.remove(spec['filename'])
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+
+if __name__ == '__main__':
+    unittest.main()
+# %%
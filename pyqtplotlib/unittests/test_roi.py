@@ -0,0 +1,99 @@
+#%%
+import sys
+import unittest
+import numpy as np
+from PyQt5.QtWidgets import QApplication
+
+app = QApplication(sys.argv) if QApplication.instance() is None else QApplication.instance()
+
+from pyqtplotlib.interaction.integral_image import IntegralImage
+from pyqtplotlib.interaction.roi import ExcludeSelectionPlot, ImageStatsPlot
+from pyqtplotlib.pltwrapper.datasource import MemmapImageSource
+from pyqtplotlib.interaction.spatial_index import GridIndex, SortedIndex
+
+
+class TestSpatialIndex(unittest.TestCase):
+
+    def test_queries(self):
+        rng = np.random.default_rng(0)
+        x, y = rng.normal(size=(2, 20000))
+        x[::97] = np.nan
+        y[::89] = np.inf
+        sorted_index, grid_index = SortedIndex(x), GridIndex(x, y)
+        for x1, x2, y1, y2 in [(-0.5, 0.3, -1, 2), (1.9, 5, -5, -1.2), (-10, 10, -10, 10), (0.1, 0.1, 0, 1), (5, 6, 0, 1)]:
+            inside_x = (x > x1) & (x < x2)
+            np.testing.assert_array_equal(np.sort(sorted_index.query(x1, x2)), np.flatnonzero(inside_x))
+            np.testing.assert_array_equal(np.sort(grid_index.query(x1, x2, y1, y2)),
+                                          np.flatnonzero(inside_x & (y > y1) & (y < y2)))
+
+
+class TestExcludeSelectionPlot(unittest.TestCase):
+
+    def select(self, ax, x1, x2, y1, y2, inverted=False):
+        # what dragging with "e" (and Shift) held does
+        ax.shiftPressed = inverted
+        ax.roiStart = (x1, y1)
+        ax.roi.setPos((x1, y1), update=False)
+        ax.roi.setSize((x2 - x1, y2 - y1), finish=False)
+        ax._show_preview()
+        preview = ax.roi_data.xData.copy()
+        ax.onROIChanged()
+        ax.roiStart = None
+        np.testing.assert_array_equal(np.sort(ax.roi_data.xData), np.sort(preview))
+
+    def test_exclude_and_undo(self):
+        ax = ExcludeSelectionPlot(roi_type='rect')
+        x, y = np.random.default_rng(1).uniform(0, 10, size=(2, 10000))
+        ax.set_data(x, y)
+        self.select(ax, 1, 5, 1, 5)
+        np.testing.assert_array_equal(ax.mask, (x > 1) & (x < 5) & (y > 1) & (y < 5))
+        self.select(ax, 2, 3, 0, 10, inverted=True)
+        expected = (x > 1) & (x < 5) & (y > 1) & (y < 5) & ~((x > 2) & (x < 3))
+        np.testing.assert_array_equal(ax.mask, expected)
+        # the history holds only the points that changed
+        self.assertEqual(len(ax._history[-1][0]), np.count_nonzero((x > 2) & (x < 3) & (y > 1) & (y < 5)))
+        self.assertTrue(ax.undo())
+        np.testing.assert_array_equal(ax.mask, (x > 1) & (x < 5) & (y > 1) & (y < 5))
+        self.assertTrue(ax.undo())
+        self.assertFalse(ax.mask.any())
+        self.assertEqual(len(ax._excluded), 0)
+        self.assertFalse(ax.undo())
+
+
+
+class TestImageStats(unittest.TestCase):
+
+    def test_integral_image(self):
+        rng = np.random.default_rng(2)
+        image = 1e4 + rng.normal(size=(103, 211))
+        image[5, 7] = image[60, 100] = np.nan
+        for integral in [IntegralImage(image), IntegralImage(image, block=8),
+                         IntegralImage(MemmapImageSource(image.astype(np.float32)), block=5),
+                         IntegralImage(np.arange(103 * 211, dtype=np.uint16).reshape(103, 211), block=4)]:
+            data = np.asarray(integral.data.data if hasattr(integral.data, 'read') else integral.data, dtype=float)
+            for r0, r1, c0, c1 in [(0, 103, 0, 211), (3, 70, 5, 190), (50, 52, 0, 211), (-5, 9, 200, 300), (10, 10, 0, 5)]:
+                stats = integral.stats(r0, r1, c0, c1)
+                region = data[max(r0, 0):r1, max(c0, 0):c1]
+                self.assertEqual(stats['count'], np.count_nonzero(np.isfinite(region)))
+                if stats['count']:
+                    np.testing.assert_allclose([stats['sum'], stats['mean'], stats['std']],
+                                               [np.nansum(region), np.nanmean(region), np.nanstd(region)], rtol=1e-7)
+
+    def test_image_stats_plot(self):
+        ax = ImageStatsPlot()
+        image = np.random.default_rng(3).uniform(size=(64, 128))
+        ax.set_image(image, extent=(0, 12.8, -3.2, 3.2))
+        readouts = []
+        ax.sigStatsChanged.connect(readouts.append)
+        # what dragging with "e" held does
+        ax.roi.show()
+        ax.roi.setPos((1.0, -1.0), update=False)
+        ax.roi.setSize((2.0, 2.5))
+        # pixels are 0.1 x 0.1, rows along y from -3.2
+        np.testing.assert_allclose(ax.stats['mean'], image[22:47, 10:30].mean())
+        self.assertEqual(ax.stats['count'], 25 * 20)
+        self.assertIs(readouts[-1], ax.stats)
+
+
+if __name__ == '__main__':
+    unittest.main()
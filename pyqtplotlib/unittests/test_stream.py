@@ -0,0 +1,116 @@
+#%%
+import sys
+import threading
+import time
+import unittest
+import numpy as np
+from PyQt5.QtWidgets import QApplication
+
+app = QApplication(sys.argv) if QApplication.instance() is None else QApplication.instance()
+
+from pyqtplotlib.pltwrapper import AxesWidget
+from pyqtplotlib.pltwrapper.stream import RingBuffer
+
+
+class TestRingBuffer(unittest.TestCase):
+
+    def test_wraparound(self):
+        buf = RingBuffer(5)
+        buf.extend([0, 1, 2])
+        np.testing.assert_array_equal(buf.view(), [0, 1, 2])
+        buf.extend([3, 4, 5, 6])
+        buf.append(7)
+        np.testing.assert_array_equal(buf.view(), [3, 4, 5, 6, 7])
+        buf.extend(np.arange(100, 112))
+        np.testing.assert_array_equal(buf.view(), np.arange(107, 112))
+        # the view is contiguous and shares memory with the buffer
+        self.assertTrue(buf.view().flags['C_CONTIGUOUS'])
+        self.assertTrue(np.shares_memory(buf.view(), buf._buffer))
+
+
+class TestStreamLine(unittest.TestCase):
+
+    def setUp(self):
+        self.ax = AxesWidget()
+
+    def test_stream(self):
+        stream = self.ax.stream(maxlen=100, color='r')
+        for i in range(50):
+            stream.append(i, i**2)
+        stream.extend(np.arange(50, 150), np.arange(50, 150)**2)
+        self.assertEqual(len(stream), 100)
+        # redraws are deferred until the next frame
+        self.assertIsNone(stream.line.xData)
+        stream.flush()
+        np.testing.assert_array_equal(stream.line.xData, np.arange(50, 150))
+        np.testing.assert_array_equal(stream.line.yData, np.arange(50, 150)**2)
+
+    def test_feed(self):
+        feed = self.ax.feed(maxlen=1000, max_pending=10000)
+        setdata_calls = []
+        feed.stream.line.setData = lambda *args: (setdata_calls.append(len(args[0])),
+                                                  type(feed.stream.line).setData(feed.stream.line, *args))
+
+        def produce(offset):
+            for i in range(100):
+                x = offset + 10 * i + np.arange(10)
+                feed.put(x, -x)
+        threads = [threading.Thread(target=produce, args=(k * 1000,)) for k in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(feed.queue_depth, 4000)
+        self.assertEqual(setdata_calls, [])  # nothing is drawn before the GUI thread runs
+
+        deadline = time.time() + 5
+        while feed.queue_depth and time.time() < deadline:
+            app.processEvents()
+        # all pending chunks are merged into one update
+        self.assertEqual(setdata_calls, [1000])
+        x, y = feed.stream.get_data()
+        np.testing.assert_array_equal(y, -x)
+        stats = feed.stats()
+        self.assertEqual((stats['received_samples'], stats['dropped_samples'], stats['flushes']), (4000, 0, 1))
+        self.assertEqual(stats['max_pending_seen'], 4000)
+
+    def test_feed_policies(self):
+        chunks = [np.arange(10 * i, 10 * i + 10) for i in range(10)]
+        for policy in ['drop_oldest', 'drop_newest']:
+            feed = self.ax.feed(maxlen=100, max_pending=50, policy=policy)
+            accepted = [feed.put(c, c) for c in chunks]
+            self.assertEqual(feed.queue_depth, 50)
+            self.assertEqual(feed.dropped_samples, 50)
+            feed.flush()
+            x, _ = feed.stream.get_data()
+            if policy == 'drop_oldest':
+                self.assertTrue(all(accepted))
+                np.testing.assert_array_equal(x, np.arange(50, 100))
+            else:
+                self.assertEqual(accepted, [True] * 5 + [False] * 5)
+                np.testing.assert_array_equal(x, np.arange(50))
+
+        # backpressure: the producer waits for the GUI thread, nothing is lost
+        feed = self.ax.feed(maxlen=1000, max_pending=20, policy='block')
+        producer = threading.Thread(target=lambda: [feed.put(c, c) for c in chunks])
+        producer.start()
+        deadline = time.time() + 5
+        while (producer.is_alive() or feed.queue_depth) and time.time() < deadline:
+            app.processEvents()
+        producer.join()
+        self.assertLessEqual(feed.stats()['max_pending_seen'], 20)
+        self.assertEqual(feed.dropped_samples, 0)
+        np.testing.assert_array_equal(feed.stream.get_data()[0], np.arange(100))
+
+        feed.close()
+        self.assertFalse(feed.put(0, 0))
+        with self.assertRaises(ValueError):
+            self.ax.feed(policy='wait')
+
+    def tearDown(self):
+        self.ax.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
+# %%
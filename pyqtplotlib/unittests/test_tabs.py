@@ -0,0 +1,63 @@
+#%%
+import gc
+import sys
+import unittest
+import weakref
+import numpy as np
+from PyQt5.QtCore import QCoreApplication, QEvent
+from PyQt5.QtWidgets import QApplication
+
+app = QApplication(sys.argv) if QApplication.instance() is None else QApplication.instance()
+
+from pyqtplotlib.pltwrapper import AxesWidget
+from pyqtplotlib.windows import TabsWindow
+
+
+class TestTabsWindow(unittest.TestCase):
+
+    def test_lazy_tabs(self):
+        built = []
+
+        def factory(i):
+            def build():
+                built.append(i)
+                ax = AxesWidget()
+                ax.stream_line = ax.stream(maxlen=100)
+                return ax
+            return build
+
+        window = TabsWindow([factory(i) for i in range(5)])
+        # only the current tab is built
+        self.assertEqual(built, [0])
+        self.assertIsNone(window.module_widget(3))
+        window.tab_widget.setCurrentIndex(3)
+        self.assertEqual(built, [0, 3])
+        ax0, ax3 = window.module_widget(0), window.module_widget(3)
+
+        # the hidden tab buffers its samples without redrawing and catches up when shown
+        stream = ax0.stream_line
+        setdata_calls = []
+        stream.line.setData = lambda *args: (setdata_calls.append(len(args[0])),
+                                             type(stream.line).setData(stream.line, *args))
+        for i in range(10):
+            stream.extend(np.arange(10 * i, 10 * i + 10), np.zeros(10))
+        self.assertTrue(stream.suspended)
+        self.assertFalse(stream._redraw_throttle.pending())
+        self.assertFalse(ax3.stream_line.suspended)
+        window.tab_widget.setCurrentIndex(0)
+        self.assertEqual(setdata_calls, [100])
+        self.assertTrue(ax3.stream_line.suspended)
+
+        # closing a tab frees its widget and its plot data
+        line = weakref.ref(ax3.stream_line.line)
+        ax3 = None
+        window.close_tab(3)
+        self.assertEqual(window.tab_widget.count(), 4)
+        QCoreApplication.sendPostedEvents(None, QEvent.DeferredDelete)
+        gc.collect()
+        self.assertIsNone(line())
+        window.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,38 @@
+#%%
+import sys
+import time
+import unittest
+from PyQt5.QtWidgets import QApplication
+
+app = QApplication(sys.argv) if QApplication.instance() is None else QApplication.instance()
+
+from pyqtplotlib.pltwrapper.timing import FrameThrottle
+
+
+class TestFrameThrottle(unittest.TestCase):
+
+    def test_throttle(self):
+        calls = []
+        throttle = FrameThrottle(lambda: calls.append(time.perf_counter()), max_fps=20)
+        # the first request is served at once, the next ones are coalesced into one call a frame later
+        for _ in range(10):
+            throttle.request()
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(throttle.pending())
+        deadline = time.perf_counter() + 1
+        while len(calls) < 2 and time.perf_counter() < deadline:
+            app.processEvents()
+        self.assertEqual(len(calls), 2)
+        self.assertGreaterEqual(calls[1] - calls[0], 0.05 - 1e-3)
+        # a deferred throttle never calls from within `request`
+        throttle = FrameThrottle(lambda: calls.append(time.perf_counter()), defer=True)
+        throttle.request()
+        self.assertEqual(len(calls), 2)
+        self.assertTrue(throttle.pending())
+        throttle.mark()
+        self.assertFalse(throttle.pending())
+
+
+if __name__ == '__main__':
+    unittest.main()
+# %%
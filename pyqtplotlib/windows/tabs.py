@@ -1,17 +1,55 @@
-from PyQt5 import QtWidgets
+from PyQt5 import QtCore, QtWidgets
+
+
+class _LazyTab(QtWidgets.QWidget):
+    """Page of a tab whose module widget is created by `factory` when the tab is first shown."""
+
+    def __init__(self, factory, parent=None):
+        super().__init__(parent)
+        self.factory = factory
+        self.module_widget = None
+        layout = QtWidgets.QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+    def build(self):
+        if self.module_widget is None:
+            factory, self.factory = self.factory, None
+            self.module_widget = factory()
+            self.layout().addWidget(self.module_widget)
+        return self.module_widget
 
 
 class TabsWindow(QtWidgets.QMainWindow):
+    """
+    Main window with one closable tab per module.
+
+    A module is given either as a widget or as a factory (a callable, e.g. the widget
+    class) that returns the widget; factories are only called when their tab is shown
+    for the first time, so that a window with many tabs starts quickly.
+
+    Tabs that are not shown suspend their updates: the live lines of their axes are not
+    redrawn (see `Axes.suspend_updates`) and are brought up to date in one step when the
+    tab is shown again. Widgets of a module that define `suspend_updates` and
+    `resume_updates` methods (e.g. to stop their own timers) are notified as well.
+    Closing a tab frees the plot data of its axes (`Axes.dispose`) and deletes its widget.
+
+    Parameters:
+    - module_widgets: list of widgets or factories
+    - module_names: list of tab titles (default: "Module 1", "Module 2", ...)
+    """
+
     def __init__(self, module_widgets=None, module_names=None, parent=None):
         super().__init__(parent)
 
         self.tab_widget = QtWidgets.QTabWidget()
         self.tab_widget.setTabsClosable(True)
-        self.tab_widget.tabCloseRequested.connect(self.tab_widget.removeTab)
+        self.tab_widget.tabCloseRequested.connect(self.close_tab)
+        self.tab_widget.currentChanged.connect(self._current_changed)
+        self._current_page = None
 
-        for i, widget in enumerate(module_widgets):
+        for i, widget in enumerate(module_widgets or []):
             name = module_names[i] if module_names is not None else f"Module {i+1}"
-            self.tab_widget.addTab(widget, name)
+            self.add_tab(widget, name)
 
         self.setCentralWidget(self.tab_widget)
 
@@ -21,6 +59,44 @@ class TabsWindow(QtWidgets.QMainWindow):
         self.shortcut_prev_tab = QtWidgets.QShortcut("Alt+Left", self)
         self.shortcut_prev_tab.activated.connect(self.prevTab)
 
+    def add_tab(self, widget, name):
+        """Add a tab for a module widget or factory; return its index."""
+        page = widget if isinstance(widget, QtWidgets.QWidget) else _LazyTab(widget)
+        index = self.tab_widget.addTab(page, name)
+        if page is not self._current_page:
+            _set_updates_suspended(page, True)
+        return index
+
+    def module_widget(self, index):
+        """The widget of the module in tab `index`, or None if its factory has not been called yet."""
+        page = self.tab_widget.widget(index)
+        return page.module_widget if isinstance(page, _LazyTab) else page
+
+    def close_tab(self, index):
+        """Close the tab `index`, free the plot data of its axes and delete its widget."""
+        from pyqtplotlib.pltwrapper.axes import Axes
+
+        page = self.tab_widget.widget(index)
+        if page is None:
+            return
+        self.tab_widget.removeTab(index)
+        if page is self._current_page:
+            self._current_page = None
+        for obj in page.findChildren(QtCore.QObject) + [page]:
+            if isinstance(obj, Axes):
+                obj.dispose()
+        page.deleteLater()
+
+    def _current_changed(self, index):
+        page = self.tab_widget.widget(index)
+        previous, self._current_page = self._current_page, page
+        if previous is not None and previous is not page:
+            _set_updates_suspended(previous, True)
+        if page is not None:
+            if isinstance(page, _LazyTab):
+                page.build()
+            _set_updates_suspended(page, False)
+
     def nextTab(self):
         current_index = self.tab_widget.currentIndex()
         total_tabs = self.tab_widget.count()
@@ -37,6 +113,14 @@ class TabsWindow(QtWidgets.QMainWindow):
     import signal
     signal.signal(signal.SIGINT, signal.SIG_DFL)
 
+
+def _set_updates_suspended(page, suspended):
+    for obj in [page] + page.findChildren(QtCore.QObject):
+        method = getattr(obj, 'suspend_updates' if suspended else 'resume_updates', None)
+        if callable(method):
+            method()
+
+
 if __name__ == "__main__":
 
     class Module1(QtWidgets.QWidget):
@@ -54,8 +138,9 @@ if __name__ == "__main__":
 
     app = QtWidgets.QApplication([])
 
-    # Create instances of your module widgets and add them to the tab widget
-    modules = [Module1(), Module2(), QtWidgets.QLabel("This is Module 3")]
+    # Create instances of your module widgets, or pass factories that create them when
+    # their tab is first shown
+    modules = [Module1(), Module2, lambda: QtWidgets.QLabel("This is Module 3")]
     module_names = ["Module 1", "Module 2", "Module 3"]
 
     window = TabsWindow(modules, module_names=module_names)